@@ -0,0 +1,65 @@
+# benchmarks/bench_busqueda.py
+"""
+Compara el buscador viejo (concat + dos str.contains por consulta) contra el
+índice de trigramas de logic.search_index, sobre catálogos sintéticos.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_busqueda [filas ...]      (por defecto 10000 100000)
+"""
+import sys
+import time
+import random
+
+import pandas as pd
+
+from logic.search_index import IndiceBusqueda
+
+PALABRAS = ["Colchón", "Sommier", "Resortes", "Espuma", "Pocket", "Premium", "Queen",
+            "King", "Plaza", "Ortopédico", "Gani", "Piero", "Cannon", "Suavestar", "Doral"]
+CONSULTAS = ["pocket", "ortop", "12345", "king plaza", "zzz", "ga"]
+
+
+def _catalogo_sintetico(filas: int, semilla: int = 7) -> pd.DataFrame:
+    rnd = random.Random(semilla)
+    modelos = [" ".join(rnd.sample(PALABRAS, 3)) + f" {rnd.randint(1, 999)}" for _ in range(filas)]
+    codigos = [float(rnd.randint(1000, 999999)) for _ in range(filas)]
+    return pd.DataFrame({"MODELO": modelos, "CÓDIGO": codigos})
+
+
+def _scan_pandas(frames, termino):
+    df = pd.concat(frames, ignore_index=True)
+    mask = df['MODELO'].astype(str).str.contains(termino, case=False, na=False)
+    mask |= df['CÓDIGO'].astype(str).str.contains(termino, case=False, na=False)
+    return df[mask]
+
+
+def _medir_ms(funcion, repeticiones=5) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    for filas in tamanos:
+        general = _catalogo_sintetico(filas // 2, 1)
+        otros = _catalogo_sintetico(filas - filas // 2, 2)
+        indice = IndiceBusqueda()
+
+        t0 = time.perf_counter()
+        indice.actualizar({"GENERAL": general, "OTROS": otros})
+        t_build = (time.perf_counter() - t0) * 1000
+
+        print(f"\n=== {filas} filas (construcción del índice: {t_build:.0f} ms) ===")
+        print(f"{'consulta':<12}{'pandas ms':>12}{'índice ms':>12}{'resultados':>12}")
+        for termino in CONSULTAS:
+            t_scan = _medir_ms(lambda: _scan_pandas([general, otros], termino))
+            t_idx = _medir_ms(lambda: indice.contar(termino))
+            print(f"{termino:<12}{t_scan:>12.2f}{t_idx:>12.3f}{indice.contar(termino):>12}")
+
+
+if __name__ == "__main__":
+    main()
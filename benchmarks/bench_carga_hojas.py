@@ -0,0 +1,58 @@
+# benchmarks/bench_carga_hojas.py
+"""
+Compara el arranque en frío (parseo del .xlsx con openpyxl) contra el arranque
+en caliente (lectura de la caché binaria en data/cache/hojas/).
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_carga_hojas [ruta.xlsx] [repeticiones]
+"""
+import sys
+import time
+
+from logic.data_loader import cargar_hojas, get_local_file_path, calcular_hash_archivo
+from logic import hojas_cache
+
+
+def _medir(funcion, repeticiones: int) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+
+def main():
+    ruta = sys.argv[1] if len(sys.argv) > 1 else get_local_file_path()
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    hash_xlsx = calcular_hash_archivo(ruta)
+
+    def frio():
+        hojas_cache.invalidar_cache(hash_xlsx)
+        cargar_hojas(ruta).precargar()
+
+    def caliente():
+        cargar_hojas(ruta).precargar()
+
+    def perezoso():
+        # Lo que realmente se paga al arrancar: abrir el índice y una sola hoja
+        hojas = cargar_hojas(ruta)
+        primera = next(iter(hojas), None)
+        if primera is not None:
+            hojas[primera]
+
+    t_frio = _medir(frio, repeticiones)
+    caliente()  # Garantiza que la caché exista antes de medir
+    t_caliente = _medir(caliente, repeticiones)
+    t_perezoso = _medir(perezoso, repeticiones)
+
+    print(f"Archivo:  {ruta}")
+    print(f"Frío:     {t_frio * 1000:8.1f} ms  (parseo del Excel + escritura de caché)")
+    print(f"Caliente: {t_caliente * 1000:8.1f} ms  (todas las hojas desde la caché binaria)")
+    print(f"Perezoso: {t_perezoso * 1000:8.1f} ms  (índice + primera hoja)")
+    if t_caliente > 0:
+        print(f"Mejora:   x{t_frio / t_caliente:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_indices.py
+"""
+Mide un rango de fechas sobre facturas con y sin idx_facturas_fecha, en una
+base sintética en memoria. (Que las consultas calientes usen sus índices lo
+verifica tests/test_indices.py.)
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_indices [facturas]        (por defecto 200000)
+"""
+import sqlite3
+import sys
+import time
+import random
+import datetime
+
+
+def _medir_ms(con, sql, params, repeticiones=5) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        con.execute(sql, params).fetchall()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000
+
+
+def _comparar_rango(filas: int):
+    rnd = random.Random(7)
+    inicio = datetime.datetime(2020, 1, 1)
+    con = sqlite3.connect(":memory:")
+    con.execute("CREATE TABLE facturas (id INTEGER PRIMARY KEY, fecha TEXT NOT NULL, total REAL)")
+    con.executemany(
+        "INSERT INTO facturas (fecha, total) VALUES (?, ?)",
+        sorted(((inicio + datetime.timedelta(minutes=rnd.randint(0, 60 * 24 * 365 * 6))).isoformat(), 1.0)
+               for _ in range(filas))
+    )
+    sql = "SELECT * FROM facturas WHERE fecha >= ? AND fecha < ?"
+    params = ("2025-10-01", "2025-11-01")
+    sin_indice = _medir_ms(con, sql, params)
+    con.execute("CREATE INDEX idx_facturas_fecha ON facturas(fecha)")
+    con_indice = _medir_ms(con, sql, params)
+    print(f"Rango de un mes sobre {filas} facturas: "
+          f"scan {sin_indice:.2f} ms -> índice {con_indice:.2f} ms")
+
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    _comparar_rango(filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_wrap.py
+"""
+Compara el corte de líneas viejo de draw_text_wrapped (un textbbox por palabra
+candidata + words.pop(0)) contra logic.image_service.partir_lineas, sobre
+textos tipo CARACTERISTICAS de distinto largo.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_wrap [palabras ...]      (por defecto 20 200 2000)
+"""
+import sys
+import time
+import random
+
+from PIL import Image, ImageDraw, ImageFont
+
+from logic.image_service import partir_lineas, _anchos_por_fuente
+
+PALABRAS = ["colchón", "de", "resortes", "pocket", "individuales", "con", "pillow", "top",
+            "espuma", "alta", "densidad", "tela", "jacquard", "antiácaros", "bordes",
+            "reforzados", "y", "doble", "faz", "ortopédico", "king", "size"]
+
+
+def _partir_viejo(draw, text, font, max_width):
+    # Copia textual del algoritmo anterior (sólo el armado de líneas)
+    lines = []
+    words = text.split()
+    while words:
+        line = ''
+        while words and draw.textbbox((0, 0), line + words[0], font=font)[2] <= max_width:
+            line += (words.pop(0) + ' ')
+        lines.append(line.strip())
+    return lines
+
+
+def _texto(palabras: int, semilla: int = 3) -> str:
+    rnd = random.Random(semilla)
+    return " ".join(rnd.choice(PALABRAS) for _ in range(palabras))
+
+
+def _fuente():
+    try:
+        return ImageFont.truetype("arial.ttf", 32)
+    except Exception:
+        return ImageFont.load_default()
+
+
+def _medir_ms(funcion, repeticiones=5) -> float:
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor * 1000
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or [20, 200, 2000]
+    font = _fuente()
+    draw = ImageDraw.Draw(Image.new('RGB', (10, 10)))
+    max_width = 400
+
+    print(f"{'palabras':<10}{'viejo ms':>12}{'nuevo frío':>12}{'nuevo ms':>12}{'líneas':>10}")
+    for palabras in tamanos:
+        texto = _texto(palabras)
+        t_viejo = _medir_ms(lambda: _partir_viejo(draw, texto, font, max_width), repeticiones=3)
+
+        _anchos_por_fuente.clear()  # Primera vez: sin anchos memorizados
+        t0 = time.perf_counter()
+        lineas = partir_lineas(texto, font, max_width)
+        t_frio = (time.perf_counter() - t0) * 1000
+
+        t_nuevo = _medir_ms(lambda: partir_lineas(texto, font, max_width))
+        print(f"{palabras:<10}{t_viejo:>12.2f}{t_frio:>12.2f}{t_nuevo:>12.3f}{len(lineas):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from typing import List, Dict, Any
 from PySide6.QtCore import QObject, Signal
 from logic.constants import METODOS_PAGO
 from logic.financiero import calcular_plan_credito
+from logic.codigos import COL_CODIGO_NORM, normalizar_codigo
 
 class CartService(QObject):
     cart_updated = Signal()
@@ -22,7 +23,8 @@ class CartService(QObject):
     def agregar_producto(self, producto: Dict[str, Any], cantidad: int = 1):
         raw_codigo = producto.get("CÓDIGO")
         if raw_codigo is None: return
-        codigo = str(raw_codigo)
+        # Mismo código canónico que usa el stock ('1000', no '1000.0')
+        codigo = producto.get(COL_CODIGO_NORM) or normalizar_codigo(raw_codigo)
 
         if codigo in self._items:
             self._items[codigo]["cantidad"] += cantidad
@@ -1,8 +1,47 @@
 # logic/catalogo_service.py
 
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from logic.stock_service import inyectar_stock_a_df
+from logic.search_index import IndiceBusqueda
+from logic.codigos import COL_CODIGO_NORM, columna_codigo, normalizar_codigos
+
+# --- Caché de hojas normalizadas ---
+# {(id(sheets), hoja): (df_crudo, df_normalizado)}. Guardamos la referencia al
+# DataFrame crudo para detectar cuándo cambió el catálogo (hot-swap / nueva
+# descarga): si la hoja cruda ya no es el mismo objeto, la entrada está vencida.
+# El df normalizado NO lleva stock y nunca se entrega sin copiar.
+_cache_normalizado: Dict[Tuple[int, str], Tuple[pd.DataFrame, pd.DataFrame]] = {}
+
+def invalidar_cache_normalizado():
+    """Descarta todas las hojas normalizadas memorizadas."""
+    _cache_normalizado.clear()
+
+def _obtener_hoja_normalizada(sheets: Dict[str, pd.DataFrame], hoja_nombre: str) -> pd.DataFrame:
+    """
+    Devuelve la hoja con columnas normalizadas y sin filas vacías, SIN stock.
+    Se calcula una vez por versión del catálogo; las siguientes llamadas son un lookup.
+    """
+    df_crudo = sheets.get(hoja_nombre)
+    if df_crudo is None or df_crudo.empty:
+        return pd.DataFrame()
+
+    clave = (id(sheets), hoja_nombre)
+    entrada = _cache_normalizado.get(clave)
+    if entrada is not None and entrada[0] is df_crudo:
+        return entrada[1]
+
+    df = df_crudo.copy()
+    df.columns = df.columns.str.strip().str.upper()
+    df.dropna(how='all', inplace=True)
+
+    # Código canónico (una vez por carga de la hoja): lo reusan stock, imágenes, carrito y búsqueda
+    col_codigo = columna_codigo(df)
+    if col_codigo is not None:
+        df[COL_CODIGO_NORM] = normalizar_codigos(df[col_codigo])
+
+    _cache_normalizado[clave] = (df_crudo, df)
+    return df
 
 # --- Lógica de Acceso a Datos (Data Access) ---
 
@@ -10,15 +49,14 @@ def obtener_df_por_hoja(sheets: Dict[str, pd.DataFrame], hoja_nombre: str) -> pd
     """
     Obtiene y normaliza una hoja del diccionario de DataFrames.
     AHORA CON STOCK INYECTADO.
+    La normalización sale de la caché; sólo el stock se cruza en cada llamada.
     """
-    df = sheets.get(hoja_nombre, pd.DataFrame()).copy()
+    df = _obtener_hoja_normalizada(sheets, hoja_nombre)
     if df.empty:
         return pd.DataFrame()
-        
-    df.columns = df.columns.str.strip().str.upper()
-    df.dropna(how='all', inplace=True)
     
     # Inyectamos el stock antes de devolvérselo a la interfaz
+    # (inyectar_stock_a_df trabaja sobre una copia: la caché queda intacta)
     df = inyectar_stock_a_df(df)
     
     return df
@@ -37,43 +75,40 @@ def obtener_proveedores_unicos(df: pd.DataFrame) -> List[str]:
 
 # --- Lógica de Búsqueda (Search Service) ---
 
-def buscar_producto_por_modelo(sheets: Dict[str, pd.DataFrame], termino: str) -> pd.DataFrame:
+# Hojas que recorre el buscador, en el orden en que se muestran los resultados
+HOJAS_BUSQUEDA = ['GENERAL', 'OTROS']
+
+# Índice único del buscador. Se refresca (incrementalmente) en cada búsqueda:
+# si las hojas normalizadas no cambiaron, actualizar() no reconstruye nada.
+_indice_busqueda = IndiceBusqueda()
+
+def actualizar_indice_busqueda(sheets: Dict[str, pd.DataFrame]) -> IndiceBusqueda:
+    """Sincroniza el índice con la versión actual del catálogo y lo devuelve."""
+    frames = {h: _obtener_hoja_normalizada(sheets, h) for h in HOJAS_BUSQUEDA}
+    _indice_busqueda.actualizar(frames)
+    return _indice_busqueda
+
+def buscar_producto_por_modelo(sheets: Dict[str, pd.DataFrame], termino: str, limite: Optional[int] = None) -> pd.DataFrame:
     """
-    Busca productos cuyo MODELO coincida parcialmente con el término dado.
+    Busca productos cuyo MODELO o CÓDIGO contenga el término (sin distinguir
+    mayúsculas ni tildes). Con 1-2 caracteres busca por inicio de palabra.
+    - limite: opcional, corta la cantidad de filas devueltas.
     """
     if not termino:
         return pd.DataFrame()
 
-    dfs_a_concatenar = []
-    
-    for nombre_hoja in ['GENERAL', 'OTROS']:
-        # NOTA: obtener_df_por_hoja ya nos devuelve el DF con la columna STOCK_ACTUAL inyectada.
-        df_temp = obtener_df_por_hoja(sheets, nombre_hoja) 
-        if not df_temp.empty:
-            dfs_a_concatenar.append(df_temp)
-
-    if not dfs_a_concatenar:
-        return pd.DataFrame()
-
     try:
-        df_completo = pd.concat(dfs_a_concatenar, ignore_index=True)
+        indice = actualizar_indice_busqueda(sheets)
+        df_resultados = indice.buscar(termino, limite)
     except Exception as e:
-        print(f"[ERROR] Fallo al concatenar hojas para búsqueda: {e}")
+        print(f"[ERROR] Fallo en la búsqueda: {e}")
         return pd.DataFrame()
 
-    mask = None
-    if 'MODELO' in df_completo.columns:
-        mask = df_completo['MODELO'].astype(str).str.contains(termino, case=False, na=False)
-        
-    col_codigo = 'CÓDIGO' if 'CÓDIGO' in df_completo.columns else 'CODIGO'
-    if col_codigo in df_completo.columns:
-        m_cod = df_completo[col_codigo].astype(str).str.contains(termino, case=False, na=False)
-        mask = m_cod if mask is None else (mask | m_cod)
-        
-    if mask is None:
-        return pd.DataFrame()
+    if df_resultados.empty:
+        return df_resultados
 
-    return df_completo[mask]
+    # El stock se cruza sólo sobre las filas encontradas
+    return inyectar_stock_a_df(df_resultados)
 
 def formatear_producto_para_clipboard(row: dict) -> str:
     """
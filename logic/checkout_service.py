@@ -0,0 +1,89 @@
+# logic/checkout_service.py
+"""
+Cierre de venta en una sola unidad de trabajo: factura + descuento de stock
++ (opcional) plan de crédito, con UN solo commit.
+
+ventas.db (facturas, clientes, créditos, cuotas) es la base principal y
+inventario.db se ATTACH-ea como 'inv' sobre la misma conexión, así todo corre
+en la misma transacción: si algo falla, no queda nada a medias.
+
+Nota: con journal_mode=WAL SQLite garantiza que el rollback ante un error
+abarca ambas bases, pero ante un corte de luz JUSTO durante el commit cada
+archivo es atómico por separado (ver "ATTACH" + WAL en la doc de SQLite).
+"""
+import time
+from typing import Any, Dict, List, Optional
+
+from logic.db_manager import get_connection, transaccion
+from logic.facturas_db_handler import DB_PATH as VENTAS_DB_PATH, _insertar_factura
+from logic.credits_service import _insertar_plan_credito
+from logic.stock_db_handler import DB_PATH as INVENTARIO_DB_PATH, _aplicar_movimientos, _stock_de_codigos
+from logic.stock_service import movimientos_de_venta
+from logic.stock_repository import get_stock_repository
+
+ESQUEMA_INVENTARIO = "inv"
+METODO_CREDITO_CASA = "Crédito de la Casa"
+
+
+def _adjuntar_inventario(con):
+    """ATTACH de inventario.db (una vez por conexión; ATTACH no se permite dentro de una transacción)."""
+    adjuntas = {row[1] for row in con.execute("PRAGMA database_list")}
+    if ESQUEMA_INVENTARIO in adjuntas:
+        return
+    if con.in_transaction:
+        con.commit()
+    con.execute(f"ATTACH DATABASE ? AS {ESQUEMA_INVENTARIO}", (str(INVENTARIO_DB_PATH),))
+    con.execute(f"PRAGMA {ESQUEMA_INVENTARIO}.journal_mode = WAL")
+    con.execute(f"PRAGMA {ESQUEMA_INVENTARIO}.synchronous = NORMAL")
+
+
+def confirmar_venta(items_carrito: List[Dict[str, Any]], metodo_pago: str, total_venta: float,
+                    cliente_data: Optional[dict] = None, plan_credito: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Registra la venta completa de forma atómica.
+    - Si se pasan cliente_data y plan_credito, se crea también el crédito con sus cuotas.
+    - Con metodo_pago == "Crédito de la Casa" ambos son obligatorios: si falta alguno
+      se lanza ValueError y no se registra nada.
+    Retorna:
+      {"factura_id", "credito_id" (o None), "stock": {codigo: stock_resultante},
+       "tiempos_ms": {"adjuntar", "factura", "stock", "credito", "commit", "total"}}
+    """
+    tiempos = {}
+    t_inicio = marca = time.perf_counter()
+
+    def _etapa(nombre):
+        nonlocal marca
+        ahora = time.perf_counter()
+        tiempos[nombre] = round((ahora - marca) * 1000, 2)
+        marca = ahora
+
+    con = get_connection(VENTAS_DB_PATH)
+    _adjuntar_inventario(con)
+    _etapa("adjuntar")
+
+    credito_id = None
+    with transaccion(VENTAS_DB_PATH) as con:
+        factura_id = _insertar_factura(con, items_carrito, metodo_pago, total_venta)
+        _etapa("factura")
+
+        movimientos = movimientos_de_venta(items_carrito, factura_id)
+        _aplicar_movimientos(con, movimientos, esquema=ESQUEMA_INVENTARIO)
+        stock = _stock_de_codigos(con, list(dict.fromkeys(m[0] for m in movimientos)), esquema=ESQUEMA_INVENTARIO)
+        _etapa("stock")
+
+        if metodo_pago == METODO_CREDITO_CASA:
+            # Sin plan o sin cliente no hay crédito: se deshace también la factura y el stock
+            if plan_credito is None or not cliente_data:
+                raise ValueError("Venta a Crédito de la Casa sin plan de cuotas o sin datos del cliente.")
+            credito_id = _insertar_plan_credito(con, factura_id, cliente_data, plan_credito)
+        elif plan_credito is not None and cliente_data is not None:
+            credito_id = _insertar_plan_credito(con, factura_id, cliente_data, plan_credito)
+        _etapa("credito")
+    _etapa("commit")
+
+    # Recién confirmada la transacción: caché de stock + aviso a las vistas abiertas
+    get_stock_repository().aplicar_cambios(stock)
+
+    tiempos["total"] = round((time.perf_counter() - t_inicio) * 1000, 2)
+    print(f"[CHECKOUT] Factura #{factura_id} en {tiempos['total']} ms {tiempos}")
+    return {"factura_id": factura_id, "credito_id": credito_id, "stock": stock, "tiempos_ms": tiempos}
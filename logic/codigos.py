@@ -0,0 +1,97 @@
+# logic/codigos.py
+
+import math
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Valor canónico para productos sin código (no comparten stock, ver stock_service)
+SIN_CODIGO = "S/C"
+
+# Columna que agrega catalogo_service a cada hoja normalizada
+COL_CODIGO_NORM = "CODIGO_NORM"
+
+
+def columna_codigo(df: pd.DataFrame) -> Optional[str]:
+    """CÓDIGO (o CODIGO, o MODELO como fallback) — la que identifica al producto."""
+    for col in ('CÓDIGO', 'CODIGO', 'MODELO'):
+        if col in df.columns:
+            return col
+    return None
+
+
+def normalizar_codigo(val) -> str:
+    """
+    Versión escalar: 1000.0 -> '1000', ' GANI-100 ' -> 'GANI-100', NaN/''/'-' -> 'S/C'.
+    Mismo resultado que normalizar_codigos() elemento a elemento.
+    """
+    if val is None or (isinstance(val, float) and math.isnan(val)) or val is pd.NA:
+        return SIN_CODIGO
+    if isinstance(val, (int, float, np.integer, np.floating)) and not isinstance(val, bool):
+        if math.isfinite(val):
+            return str(int(val))
+        return str(val).strip()
+    texto = str(val).strip()
+    return texto if texto not in ('', '-') else SIN_CODIGO
+
+
+_FLOAT_ENTERO_TEXTO = re.compile(r"-?\d+\.0+")
+
+
+def normalizar_codigo_guardado(val) -> str:
+    """
+    Como normalizar_codigo(), pero para códigos ya guardados como texto por
+    versiones viejas (str() de un float de pandas): '1000.0' -> '1000', 'nan' -> 'S/C'.
+    """
+    codigo = normalizar_codigo(val)
+    if codigo.casefold() in ('nan', 'none'):
+        return SIN_CODIGO
+    if _FLOAT_ENTERO_TEXTO.fullmatch(codigo):
+        return codigo.split('.')[0]
+    return codigo
+
+
+def normalizar_codigos(serie: pd.Series) -> pd.Series:
+    """
+    Normalización vectorizada de una columna de códigos (ver normalizar_codigo):
+    - números (1000.0, 1000) -> '1000' (se trunca como int(float(x)))
+    - texto -> sin espacios extremos
+    - NaN / '' / '-' -> 'S/C'
+    """
+    if serie.empty:
+        return pd.Series([], index=serie.index, dtype=object)
+
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        numeros = pd.to_numeric(serie, errors='coerce').astype(float)
+        resultado = pd.Series(SIN_CODIGO, index=serie.index, dtype=object)
+        finitos = np.isfinite(numeros)
+        resultado[finitos] = np.trunc(numeros[finitos]).astype(np.int64).astype(str)
+        otros = numeros.notna() & ~finitos  # inf / -inf: como texto, igual que la versión escalar
+        resultado[otros] = numeros[otros].astype(str)
+        return resultado
+
+    # Columna mixta (object / string): el texto se limpia con .str, los números sueltos aparte
+    serie_obj = serie.astype(object)
+    es_texto = serie_obj.map(type, na_action='ignore').isin([str]).fillna(False).astype(bool)
+    resultado = pd.Series(SIN_CODIGO, index=serie.index, dtype=object)
+    resultado[es_texto] = serie_obj[es_texto].str.strip()
+
+    # Números sueltos dentro de una columna de texto (pocos): versión escalar
+    resto = serie_obj.notna() & ~es_texto
+    if resto.any():
+        resultado[resto] = serie_obj[resto].map(normalizar_codigo)
+
+    resultado[resultado.isin(['', '-'])] = SIN_CODIGO
+    return resultado
+
+
+def codigos_de_df(df: pd.DataFrame) -> pd.Series:
+    """CODIGO_NORM si la hoja ya lo trae (catalogo_service), si no se calcula al vuelo."""
+    if COL_CODIGO_NORM in df.columns:
+        return df[COL_CODIGO_NORM]
+    col = columna_codigo(df)
+    if col is None:
+        return pd.Series(SIN_CODIGO, index=df.index, dtype=object)
+    return normalizar_codigos(df[col])
@@ -16,6 +16,7 @@ from pathlib import Path
 # 📁 CONFIGURACIÓN DE RUTAS
 # ============================
 LOCAL_FILENAME = "colchonería.xlsx"
+BACKUPS_CATALOGO_MAX = 5 # Versiones anteriores del catálogo que se conservan en data/backups/
 
 # --- RESOLUCIÓN DE RUTAS (Compatible con PyInstaller) ---
 if getattr(sys, 'frozen', False):
@@ -52,7 +53,12 @@ messages = {
         "descargando": "Descargando archivo desde Google Sheets...",
         "descarga_exitosa": "✅ Archivo descargado exitosamente.",
         "usando_local": "📄 Usando archivo local existente.",
-        "inicio_aplicacion": "Iniciando aplicación..."
+        "inicio_aplicacion": "Iniciando aplicación...",
+        "splash_descargando": "Descargando catálogo...",
+        "sync_en_curso": "🔄 Sincronizando catálogo en segundo plano...",
+        "sync_actualizado": "✅ Catálogo actualizado desde Google Sheets.",
+        "sync_sin_cambios": "✔️ El catálogo ya estaba al día (sin cambios).",
+        "sync_offline": "📄 Sin conexión: se está usando la copia local del catálogo."
     }
 }
 
@@ -157,6 +163,20 @@ MENU_CONFIG = {
     }
 }
 
+# === BÚSQUEDA MIENTRAS SE ESCRIBE ===
+BUSQUEDA_CONFIG = {
+    "debounce_ms": 250,          # Espera desde la última tecla antes de buscar
+    "min_caracteres": 2,         # Menos que esto sólo busca con Enter / botón
+    "resultados_iniciales": 50   # Filas que se dibujan primero (el resto, a pedido)
+}
+
+# --- MINIATURAS (data/cache/thumbs/) ---
+MINIATURAS_CONFIG = {
+    "lado_tooltip": 320,     # Vista previa al pasar el mouse por la columna 👁️
+    "lado_preview": 1600,    # Lo que abre el visor (suficiente para pantalla completa)
+    "workers": 2             # Hilos de fondo que generan miniaturas
+}
+
 # Definición del Mapeo para el Portapapeles (Constante)
 MAPEO_CLIPBOARD = [
     ("PROVEEDOR", "Marca"),
@@ -2,12 +2,26 @@
 
 import os
 import sys
+import json
+import shutil
+import hashlib
+import zipfile
+import datetime
 import requests
 import pandas as pd
-from logic.constants import LOCAL_FILENAME, messages
+from logic.constants import LOCAL_FILENAME, BACKUPS_CATALOGO_MAX, messages
 
 GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1gBXFjr48AqRrzTAl-47fY5aq05NcpDZZpR9nEYsQI4U/export?format=xlsx"
 
+# Resultados posibles de una sincronización (se informan a la UI)
+SYNC_SIN_CAMBIOS = "sin_cambios"
+SYNC_ACTUALIZADO = "actualizado"
+SYNC_OFFLINE = "offline"
+
+
+class SincronizacionCancelada(Exception):
+    """La descarga se cortó a pedido (ej: se cerró la app). El .part queda para reanudar."""
+
 def get_base_dir():
     """
     Obtiene la carpeta base donde guardar el archivo descargado.
@@ -37,34 +51,298 @@ def get_local_file_path():
     """
     return os.path.join(get_data_dir(), LOCAL_FILENAME)
 
-def descargar_archivo():
+def get_meta_file_path():
     """
-    Intenta descargar el archivo desde Google Sheets y guardarlo en data/.
-    Si falla, usa la última versión local persistente.
+    Ruta del archivo de metadatos de sincronización (validadores HTTP + hash),
+    guardado al lado del .xlsx local.
+    """
+    return get_local_file_path() + ".meta.json"
+
+def _leer_meta() -> dict:
+    try:
+        with open(get_meta_file_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _guardar_meta(meta: dict):
+    try:
+        with open(get_meta_file_path(), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"[WARNING] No se pudieron guardar los metadatos de sincronización: {e}")
+
+def calcular_hash_archivo(path) -> str:
+    """SHA-256 del contenido de un archivo (leído por bloques)."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+def obtener_hash_local():
+    """
+    Hash del .xlsx local. Usa el valor guardado en los metadatos si sigue siendo
+    válido (mismo tamaño y mtime); si no, lo recalcula. None si no hay archivo.
+    """
+    local_file = get_local_file_path()
+    if not os.path.exists(local_file):
+        return None
+    meta = _leer_meta()
+    st = os.stat(local_file)
+    if meta.get("sha256") and meta.get("size") == st.st_size and meta.get("mtime") == st.st_mtime:
+        return meta["sha256"]
+    return calcular_hash_archivo(local_file)
+
+def get_backups_dir():
+    """Carpeta data/backups/ con versiones anteriores del catálogo (para rollback)."""
+    backups_dir = os.path.join(get_data_dir(), "backups")
+    os.makedirs(backups_dir, exist_ok=True)
+    return backups_dir
+
+def _leer_json(path) -> dict:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _borrar_silencioso(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def validar_xlsx(path) -> bool:
+    """True si el archivo es un .xlsx legible con al menos una hoja."""
+    if not zipfile.is_zipfile(path):
+        return False
+    try:
+        with pd.ExcelFile(path) as xls:
+            return len(xls.sheet_names) > 0
+    except Exception as e:
+        print(f"[WARNING] El archivo descargado no es un Excel válido: {e}")
+        return False
+
+def _respaldar_version_actual():
+    """Copia el .xlsx vigente a data/backups/ y conserva sólo los BACKUPS_CATALOGO_MAX más nuevos."""
+    local_file = get_local_file_path()
+    if not os.path.exists(local_file):
+        return
+    base, ext = os.path.splitext(LOCAL_FILENAME)
+    sello = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    try:
+        shutil.copy2(local_file, os.path.join(get_backups_dir(), f"{base}_{sello}{ext}"))
+    except OSError as e:
+        print(f"[WARNING] No se pudo respaldar el catálogo anterior: {e}")
+        return
+    for viejo in listar_backups()[BACKUPS_CATALOGO_MAX:]:
+        _borrar_silencioso(viejo)
+
+def listar_backups() -> list:
+    """Rutas de los respaldos del catálogo, del más nuevo al más viejo."""
+    base, ext = os.path.splitext(LOCAL_FILENAME)
+    carpeta = get_backups_dir()
+    archivos = [os.path.join(carpeta, n) for n in os.listdir(carpeta)
+                if n.startswith(base + "_") and n.endswith(ext)]
+    return sorted(archivos, reverse=True)  # El sello de fecha ordena cronológicamente
+
+def _fijar_catalogos_abiertos(local_file: str):
+    # Import local: hojas_cache depende de este módulo para resolver data/
+    from logic.hojas_cache import fijar_catalogos_abiertos
+    fijar_catalogos_abiertos(local_file)
+
+def restaurar_backup(ruta_backup: str = None) -> str:
     """
+    Rollback: vuelve a poner en data/ un respaldo (por defecto, el más reciente).
+    Se copia a un temporal y se renombra, así nunca queda un .xlsx a medio escribir.
+    Los validadores HTTP se descartan para que la próxima sincronización sea completa.
+    """
+    if ruta_backup is None:
+        backups = listar_backups()
+        if not backups:
+            raise FileNotFoundError("No hay respaldos del catálogo disponibles.")
+        ruta_backup = backups[0]
+
     local_file = get_local_file_path()
+    temporal = local_file + ".restore"
+    shutil.copy2(ruta_backup, temporal)
+    _fijar_catalogos_abiertos(local_file)
+    os.replace(temporal, local_file)
+
+    st = os.stat(local_file)
+    _guardar_meta({"sha256": calcular_hash_archivo(local_file), "size": st.st_size, "mtime": st.st_mtime})
+    print(f"[INFO] Catálogo restaurado desde {ruta_backup}")
+    return local_file
+
+def _cabeceras_reanudacion(parcial: str, parcial_meta_path: str):
+    """
+    (headers, offset) para continuar un .part con Range / If-Range.
+    Sólo se reanuda si sabemos contra qué versión se bajó el pedazo y si todavía
+    le falta algo: un .part ya completo se descarta (pedir desde su final da 416).
+    """
+    offset = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+    parcial_meta = _leer_json(parcial_meta_path)
+    validador_parcial = parcial_meta.get("etag") or parcial_meta.get("last_modified")
+    total_esperado = parcial_meta.get("total") or 0
+    if offset > 0 and total_esperado and offset >= total_esperado:
+        _borrar_silencioso(parcial)
+        _borrar_silencioso(parcial_meta_path)
+        return {}, 0
+    if offset > 0 and validador_parcial:
+        return {"Range": f"bytes={offset}-", "If-Range": validador_parcial}, offset
+    return {}, 0
+
+def sincronizar_archivo(progreso_callback=None, cancelado=None) -> dict:
+    """
+    Sincroniza data/colchonería.xlsx con Google Sheets usando peticiones condicionales.
+    - Envía If-None-Match / If-Modified-Since con los validadores guardados.
+    - La descarga va por streaming a un .part (reanudable con Range si se cortó),
+      se valida que sea un Excel legible y recién ahí se reemplaza el archivo
+      local con un rename atómico, guardando antes un respaldo en data/backups/.
+    - Si el servidor responde 304, o el contenido descargado tiene el mismo hash
+      que el local, NO se reescribe el archivo.
+    - progreso_callback: opcional, se invoca como (bytes_recibidos, bytes_totales).
+    - cancelado: opcional, función sin argumentos que se consulta entre bloques;
+      si devuelve True se corta la descarga y se sigue como offline.
+
+    Retorna {"estado": SYNC_*, "ruta": str | None, "sha256": str | None}.
+    "ruta" es None sólo si no hay descarga ni copia local.
+    """
+    local_file = get_local_file_path()
+    parcial = local_file + ".part"
+    parcial_meta_path = parcial + ".json"
+    meta = _leer_meta()
+    hash_local = obtener_hash_local()
+
+    headers = {}
+    # Los validadores sólo sirven si el archivo local es el que los originó
+    if hash_local and hash_local == meta.get("sha256"):
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    headers_rango, offset = _cabeceras_reanudacion(parcial, parcial_meta_path)
 
     try:
         print(f"[INFO] {messages['logs']['descargando']}")
-        r = requests.get(GOOGLE_SHEET_URL, timeout=100)
-        r.raise_for_status()
-        with open(local_file, 'wb') as f:
-            f.write(r.content)
-        print(f"[INFO] {messages['logs']['descarga_exitosa']}")
-        return local_file, False  # archivo descargado exitosamente
+        r = requests.get(GOOGLE_SHEET_URL, headers={**headers, **headers_rango}, timeout=(10, 100), stream=True)
+        if r.status_code == 416 and headers_rango:
+            # Rango no satisfacible: el .part ya estaba completo (o es de otra versión).
+            # Lo descartamos y pedimos el archivo entero UNA vez; si no, quedaríamos
+            # offline para siempre repitiendo el mismo Range.
+            r.close()
+            print("[WARNING] El servidor rechazó la reanudación; se descarga el catálogo completo.")
+            _borrar_silencioso(parcial)
+            _borrar_silencioso(parcial_meta_path)
+            offset = 0
+            r = requests.get(GOOGLE_SHEET_URL, headers=headers, timeout=(10, 100), stream=True)
+        with r:
+            if r.status_code == 304:
+                _borrar_silencioso(parcial)
+                _borrar_silencioso(parcial_meta_path)
+                print(f"[INFO] {messages['logs']['sync_sin_cambios']}")
+                return {"estado": SYNC_SIN_CAMBIOS, "ruta": local_file, "sha256": hash_local}
+
+            r.raise_for_status()
+            etag = r.headers.get('ETag')
+            last_modified = r.headers.get('Last-Modified')
+
+            total = int(r.headers.get('Content-Length', 0) or 0)
+            if r.status_code == 206:
+                modo = 'ab'  # El servidor aceptó continuar donde quedamos
+            else:
+                modo, offset = 'wb', 0
+                # "total" sirve para no pedir un Range más allá del final la próxima vez
+                with open(parcial_meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({"etag": etag, "last_modified": last_modified, "total": total}, f)
+
+            total = offset + total if total else 0
+            recibido = offset
+            with open(parcial, modo) as f:
+                for chunk in r.iter_content(chunk_size=64 * 1024):
+                    if cancelado and cancelado():
+                        raise SincronizacionCancelada("Descarga cancelada.")
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    recibido += len(chunk)
+                    if progreso_callback:
+                        progreso_callback(recibido, total)
+                f.flush()
+                os.fsync(f.fileno())
+
+        hash_nuevo = calcular_hash_archivo(parcial)
+        if hash_nuevo == hash_local:
+            _borrar_silencioso(parcial)
+            estado = SYNC_SIN_CAMBIOS
+            print(f"[INFO] {messages['logs']['sync_sin_cambios']}")
+        else:
+            if not validar_xlsx(parcial):
+                _borrar_silencioso(parcial)
+                raise ValueError("El archivo descargado está incompleto o no es un .xlsx válido.")
+            _respaldar_version_actual()
+            _fijar_catalogos_abiertos(local_file)
+            os.replace(parcial, local_file)
+            estado = SYNC_ACTUALIZADO
+            print(f"[INFO] {messages['logs']['descarga_exitosa']}")
+        _borrar_silencioso(parcial_meta_path)
+
+        st = os.stat(local_file)
+        _guardar_meta({
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha256": hash_nuevo,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+        })
+        return {"estado": estado, "ruta": local_file, "sha256": hash_nuevo}
+
     except Exception as e:
+        # El .part (si quedó) se conserva para reanudar en el próximo intento
         print(f"[WARNING] {messages['errors']['fallo_descarga']} {e}")
         if os.path.exists(local_file):
             print(f"[INFO] {messages['logs']['usando_local']}")
-            return local_file, True  # se usa archivo local
+            return {"estado": SYNC_OFFLINE, "ruta": local_file, "sha256": hash_local}
         else:
             print(f"[ERROR] {messages['errors']['fallo_total']}")
-            return None, False  # no hay archivo local disponible
+            return {"estado": SYNC_OFFLINE, "ruta": None, "sha256": None}
+
+def descargar_archivo(progreso_callback=None):
+    """
+    Intenta descargar el archivo desde Google Sheets y guardarlo en data/.
+    Si falla, usa la última versión local persistente.
+    Retorna (ruta | None, usando_local). Ver sincronizar_archivo() para el detalle.
+    """
+    resultado = sincronizar_archivo(progreso_callback)
+    return resultado["ruta"], resultado["estado"] == SYNC_OFFLINE
+
+def existe_archivo_local() -> bool:
+    """True si ya hay una copia local del catálogo para arrancar sin red."""
+    return os.path.exists(get_local_file_path())
 
-def cargar_hojas(path=None):
+def cargar_hojas(path=None, usar_cache=True):
     """
     Carga las hojas del archivo Excel especificado o usa el archivo local persistente.
+    Devuelve un HojasCatalogo: un mapping perezoso que parsea cada hoja recién al
+    primer acceso (desde la caché binaria en data/cache/hojas/<hash>/ si existe,
+    si no desde el Excel) y la memoriza.
+    Con usar_cache=False se parsea todo el libro de una vez (dict común).
     """
+    # Import local: hojas_cache depende de este módulo para resolver data/
+    from logic import hojas_cache
+
     if path is None:
         path = get_local_file_path()
-    return pd.read_excel(path, sheet_name=None)
+    if not usar_cache:
+        return pd.read_excel(path, sheet_name=None)
+
+    es_local = os.path.abspath(path) == os.path.abspath(get_local_file_path())
+    hash_xlsx = obtener_hash_local() if es_local else calcular_hash_archivo(path)
+
+    hojas = hojas_cache.HojasCatalogo(path, hash_xlsx)
+    if es_local:
+        # Sólo el catálogo vigente merece caché: borramos las de versiones anteriores
+        hojas_cache.limpiar_caches_viejas(hash_xlsx)
+    return hojas
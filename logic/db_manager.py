@@ -0,0 +1,128 @@
+# logic/db_manager.py
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+# Pragmas que se aplican a cada conexión nueva.
+# - WAL: lectores y escritor no se bloquean entre sí (y queda grabado en el archivo).
+# - synchronous=NORMAL: en WAL es seguro ante cortes de la app; sólo un corte de luz
+#   puede perder la(s) última(s) transacción(es), nunca corromper la base.
+# - cache_size negativo = KiB (8 MB por conexión).
+# - busy_timeout: espera en vez de fallar con "database is locked".
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+_local = threading.local()
+
+
+class ConexionCompartida(sqlite3.Connection):
+    """
+    Conexión que sabe si está dentro de un transaccion(). Mientras lo esté, el
+    `with con:` y los con.commit() de las funciones de siempre NO confirman nada:
+    la transacción externa decide (así una venta + stock + crédito es una sola).
+    """
+    transacciones_abiertas = 0
+
+    def commit(self):
+        if self.transacciones_abiertas:
+            return
+        super().commit()
+
+    def __exit__(self, tipo, valor, traza):
+        if self.transacciones_abiertas:
+            return False
+        return super().__exit__(tipo, valor, traza)
+
+
+def _conexiones_del_hilo() -> Dict[str, sqlite3.Connection]:
+    conexiones = getattr(_local, "conexiones", None)
+    if conexiones is None:
+        conexiones = _local.conexiones = {}
+    return conexiones
+
+
+def _abrir(db_path: Path) -> sqlite3.Connection:
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(db_path, timeout=5.0, factory=ConexionCompartida)
+    con.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        con.execute(pragma)
+    return con
+
+
+def get_connection(db_path) -> sqlite3.Connection:
+    """
+    Conexión compartida a db_path para el hilo actual (una por base y por hilo).
+    Se abre (con mkdir y pragmas) sólo la primera vez; las siguientes llamadas
+    son un lookup. Sigue sirviendo el patrón de siempre `with con:` (commit /
+    rollback), pero NO hay que cerrarla.
+    """
+    clave = str(Path(db_path).resolve())
+    conexiones = _conexiones_del_hilo()
+    con = conexiones.get(clave)
+    if con is None:
+        con = conexiones[clave] = _abrir(Path(clave))
+    return con
+
+
+@contextmanager
+def transaccion(db_path):
+    """
+    Transacción explícita sobre la conexión compartida:
+
+        with transaccion(DB_PATH) as con:
+            con.execute(...)
+            con.execute(...)
+
+    Toma el lock de escritura al empezar (BEGIN IMMEDIATE) y hace commit al salir,
+    o rollback si hubo una excepción. Si ya hay una transacción abierta en esa
+    conexión, se anida con un SAVEPOINT (sólo se deshace el bloque interno).
+    """
+    con = get_connection(db_path)
+    if con.transacciones_abiertas:
+        nombre = f"sp_{con.transacciones_abiertas}"
+        con.execute(f"SAVEPOINT {nombre}")
+        con.transacciones_abiertas += 1
+        try:
+            yield con
+        except BaseException:
+            con.execute(f"ROLLBACK TO {nombre}")
+            raise
+        finally:
+            con.transacciones_abiertas -= 1
+            con.execute(f"RELEASE {nombre}")
+        return
+
+    if con.in_transaction:
+        # Quedó algo pendiente de un uso sin `with`: lo confirmamos antes de empezar
+        con.commit()
+    con.execute("BEGIN IMMEDIATE")
+    con.transacciones_abiertas = 1
+    try:
+        yield con
+    except BaseException:
+        con.transacciones_abiertas = 0
+        con.rollback()
+        raise
+    else:
+        con.transacciones_abiertas = 0
+        con.commit()
+
+
+def cerrar_conexiones():
+    """Cierra las conexiones abiertas por el hilo actual (p.ej. antes de restaurar una base)."""
+    conexiones = _conexiones_del_hilo()
+    for con in conexiones.values():
+        try:
+            con.close()
+        except sqlite3.Error:
+            pass
+    conexiones.clear()
@@ -0,0 +1,131 @@
+# logic/db_migrations.py
+"""
+Migraciones versionadas del esquema (ventas.db e inventario.db).
+
+Cada módulo que maneja tablas (facturas, creditos, stock) tiene su lista
+ordenada de migraciones en logic/db_schema.py y la aplica al arrancar con
+aplicar_migraciones().
+La versión alcanzada queda en la tabla schema_version (una fila por módulo),
+así cada migración corre UNA sola vez por base, en orden y dentro de una
+transacción: si una falla, no queda el esquema a medias.
+
+Una migración es (version, descripcion, paso), donde paso es:
+- una lista de sentencias SQL, o
+- una función que recibe la conexión (para lo que depende del estado actual).
+"""
+import datetime
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+from logic.db_manager import get_connection, transaccion
+
+Paso = Union[Sequence[str], Callable[[sqlite3.Connection], None]]
+Migracion = Tuple[int, str, Paso]
+
+SCHEMA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    modulo TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    actualizado TEXT NOT NULL
+)
+"""
+
+
+def version_actual(con: sqlite3.Connection, modulo: str) -> int:
+    row = con.execute("SELECT version FROM schema_version WHERE modulo = ?", (modulo,)).fetchone()
+    return row['version'] if row else 0
+
+
+def columnas_de(con: sqlite3.Connection, tabla: str) -> List[str]:
+    return [row['name'] for row in con.execute(f"PRAGMA table_info({tabla})")]
+
+
+def aplicar_migraciones(db_path, modulo: str, migraciones: Iterable[Migracion]) -> int:
+    """
+    Lleva el esquema de `modulo` en db_path a la última versión de `migraciones`.
+    Retorna la versión final. Las versiones deben ser crecientes (1, 2, 3...).
+    """
+    migraciones = sorted(migraciones, key=lambda m: m[0])
+    with transaccion(db_path) as con:
+        con.execute(SCHEMA_VERSION)
+        version = version_actual(con, modulo)
+        pendientes = [m for m in migraciones if m[0] > version]
+
+        for numero, descripcion, paso in pendientes:
+            if callable(paso):
+                paso(con)
+            else:
+                for sentencia in paso:
+                    con.execute(sentencia)
+            version = numero
+            print(f"🛠️ Migración {modulo} v{numero}: {descripcion}")
+
+        if pendientes:
+            con.execute(
+                """
+                INSERT INTO schema_version (modulo, version, actualizado) VALUES (?, ?, ?)
+                ON CONFLICT(modulo) DO UPDATE SET version = excluded.version, actualizado = excluded.actualizado
+                """,
+                (modulo, version, datetime.datetime.now().replace(microsecond=0).isoformat())
+            )
+    return version
+
+
+# --- Verificación de índices (EXPLAIN QUERY PLAN) ---
+
+def plan_de_consulta(con: sqlite3.Connection, sql: str, params: Sequence = ()) -> List[str]:
+    """Las líneas 'detail' de EXPLAIN QUERY PLAN (ej: 'SEARCH facturas USING INDEX ...')."""
+    return [row[3] for row in con.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params))]
+
+
+def usa_indice(con: sqlite3.Connection, sql: str, params: Sequence = (), indice: str = "") -> bool:
+    """
+    True si el plan busca por índice (SEARCH ... USING [COVERING] INDEX / PRIMARY KEY)
+    en vez de recorrer la tabla. Con `indice`, además exige que sea ese índice.
+    """
+    for detalle in plan_de_consulta(con, sql, params):
+        if not detalle.startswith("SEARCH"):
+            continue
+        if indice:
+            if f"INDEX {indice} " in f"{detalle} ":
+                return True
+        elif "INDEX" in detalle or "PRIMARY KEY" in detalle:
+            return True
+    return False
+
+
+# Consultas calientes de la app y el índice que deberían usar: (base, sql, params, indice)
+CONSULTAS_CALIENTES = (
+    # Historial paginado (facturas_db_handler.obtener_pagina_historial): página siguiente y por rango
+    ("ventas", "SELECT * FROM facturas WHERE (fecha, id) < (?, ?) ORDER BY fecha DESC, id DESC LIMIT ?",
+     ("2026-10-18T12:00:00", 500, 200), "idx_facturas_fecha_id"),
+    ("ventas", "SELECT * FROM facturas WHERE fecha >= ? AND fecha < ? ORDER BY fecha DESC, id DESC LIMIT ?",
+     ("2026-10-01", "2026-11-01", 200), "idx_facturas_fecha_id"),
+    ("ventas", "SELECT * FROM facturas WHERE fecha >= ? AND fecha < ? AND (fecha, id) < (?, ?) "
+               "ORDER BY fecha DESC, id DESC LIMIT ?",
+     ("2026-10-01", "2026-11-01", "2026-10-18T12:00:00", 500, 200), "idx_facturas_fecha_id"),
+    ("ventas", "SELECT id FROM creditos WHERE factura_id = ?",
+     (1,), "idx_creditos_factura"),
+    ("ventas", "SELECT * FROM cuotas WHERE credito_id = ?",
+     (1,), "idx_cuotas_credito"),
+    ("ventas", "SELECT count(*) FROM cuotas WHERE credito_id = ? AND estado != 'PAGADO'",
+     (1,), "idx_cuotas_credito"),
+    ("ventas", "SELECT * FROM cuotas WHERE estado = 'PAGADO' AND fecha_pago >= ? AND fecha_pago < ?",
+     ("2026-10-01", "2026-11-01"), "idx_cuotas_estado_pago"),
+    ("inventario", "SELECT * FROM movimientos_stock WHERE codigo = ? ORDER BY id DESC",
+     ("1000",), "idx_movimientos_codigo"),
+)
+
+
+def verificar_indices(bases: Dict[str, object]) -> List[Tuple[str, List[str], bool]]:
+    """
+    Corre EXPLAIN QUERY PLAN sobre CONSULTAS_CALIENTES.
+    - bases: {"ventas": ruta, "inventario": ruta}, con el esquema ya aplicado
+      (ver logic/db_schema.py; tests/test_indices.py lo arma sobre bases temporales).
+    Retorna [(sql, plan, usa_el_indice), ...]
+    """
+    resultado = []
+    for base, sql, params, indice in CONSULTAS_CALIENTES:
+        con = get_connection(bases[base])
+        resultado.append((sql, plan_de_consulta(con, sql, params), usa_indice(con, sql, params, indice)))
+    return resultado
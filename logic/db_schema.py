@@ -0,0 +1,231 @@
+# logic/db_schema.py
+"""
+Esquema de ventas.db (facturas, créditos) e inventario.db (stock): tablas base
+más las migraciones versionadas de cada módulo (ver logic/db_migrations.py).
+
+No tiene efectos al importarse y todo recibe la ruta de la base, así el mismo
+esquema se puede armar sobre una base temporal (tests, benchmarks). Los módulos
+de siempre (facturas_db_handler, credits_service, stock_db_handler) lo aplican
+sobre data/ al arrancar.
+"""
+import json
+import sqlite3
+from typing import Any, Dict, List
+
+from logic.codigos import normalizar_codigo_guardado
+from logic.db_manager import get_connection
+from logic.db_migrations import aplicar_migraciones, columnas_de
+
+
+# --- Facturas (ventas.db) ---
+
+SCHEMA_FACTURAS = """
+CREATE TABLE IF NOT EXISTS facturas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT NOT NULL,
+    metodo_pago TEXT NOT NULL,
+    total REAL NOT NULL,
+    ganancia REAL DEFAULT 0,
+    items_json TEXT NOT NULL
+)
+"""
+
+
+# Columnas de factura_items, en el mismo orden que _valores_renglon()
+COLUMNAS_ITEM = ("codigo", "modelo", "descripcion", "cantidad",
+                 "precio_unitario", "costo_historico", "precio_lista_base")
+
+
+def _valores_renglon(item: Dict[str, Any]) -> tuple:
+    """
+    Renglón (tal como queda en items_json) -> valores de factura_items.
+    Resuelve los mismos fallbacks que usaban los reportes al leer el JSON viejo:
+    base = precio_lista_base -> EFECTIVO/TRANSF -> precio_unitario; costo = costo_historico -> COSTO.
+    """
+    def _num(valor) -> float:
+        try:
+            return float(valor or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    precio_unitario = _num(item.get("precio_unitario"))
+    base = _num(item.get("precio_lista_base")) or _num(item.get("EFECTIVO/TRANSF")) or precio_unitario
+    costo = _num(item.get("costo_historico", item.get("COSTO")))
+    try:
+        cantidad = int(item.get("cantidad", 1))
+    except (TypeError, ValueError):
+        cantidad = 1
+    return (
+        # Código canónico: las facturas viejas guardaban '1000.0' o 'nan' (ver logic/codigos.py)
+        normalizar_codigo_guardado(item.get("codigo", item.get("CÓDIGO"))),
+        item.get("modelo", item.get("MODELO", "")),
+        item.get("descripcion", ""),
+        cantidad, precio_unitario, costo, base,
+    )
+
+
+def _insertar_items(con: sqlite3.Connection, factura_id: int, items: List[Dict[str, Any]]):
+    con.executemany(
+        f"""
+        INSERT INTO factura_items (factura_id, renglon, {', '.join(COLUMNAS_ITEM)})
+        VALUES (?, ?, {', '.join('?' * len(COLUMNAS_ITEM))})
+        """,
+        [(factura_id, n, *_valores_renglon(item)) for n, item in enumerate(items, start=1)]
+    )
+
+
+def _backfill_factura_items(con: sqlite3.Connection):
+    # Una sola vez: pasa los renglones de items_json de las facturas viejas a factura_items
+    pendientes = con.execute("""
+        SELECT id, items_json FROM facturas f
+        WHERE NOT EXISTS (SELECT 1 FROM factura_items i WHERE i.factura_id = f.id)
+    """).fetchall()
+    migradas = 0
+    for row in pendientes:
+        try:
+            items = json.loads(row['items_json'] or "[]")
+        except json.JSONDecodeError:
+            items = None
+        if not isinstance(items, list):
+            print(f"[WARNING] Factura #{row['id']}: items_json ilegible, queda sin renglones")
+            continue
+        _insertar_items(con, row['id'], [i for i in items if isinstance(i, dict)])
+        migradas += 1
+    if migradas:
+        print(f"🛠️ factura_items: {migradas} facturas migradas desde items_json")
+
+
+# Migraciones versionadas (ver logic/db_migrations.py). Agregar siempre al final.
+MIGRACIONES_FACTURAS = [
+    (1, "índice por fecha (historial y reportes por rango)", [
+        "CREATE INDEX IF NOT EXISTS idx_facturas_fecha ON facturas(fecha)",
+    ]),
+    (2, "tabla factura_items (renglones de cada factura)", [
+        """
+        CREATE TABLE IF NOT EXISTS factura_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            factura_id INTEGER NOT NULL,
+            renglon INTEGER NOT NULL,
+            codigo TEXT NOT NULL,
+            modelo TEXT,
+            descripcion TEXT,
+            cantidad INTEGER NOT NULL,
+            precio_unitario REAL NOT NULL,
+            costo_historico REAL NOT NULL DEFAULT 0,
+            precio_lista_base REAL NOT NULL DEFAULT 0,
+            FOREIGN KEY(factura_id) REFERENCES facturas(id)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_factura_items_factura ON factura_items(factura_id)",
+        "CREATE INDEX IF NOT EXISTS idx_factura_items_codigo ON factura_items(codigo)",
+    ]),
+    (3, "backfill de factura_items desde items_json", _backfill_factura_items),
+    # El historial pagina por (fecha, id): con este índice el ORDER BY sale del
+    # índice (sin TEMP B-TREE) aunque haya rango de fechas. Reemplaza a idx_facturas_fecha.
+    (4, "índice (fecha, id) para el historial paginado", [
+        "CREATE INDEX IF NOT EXISTS idx_facturas_fecha_id ON facturas(fecha, id)",
+        "DROP INDEX IF EXISTS idx_facturas_fecha",
+    ]),
+]
+
+
+def init_facturas(db_path):
+    with get_connection(db_path) as con:
+        con.execute(SCHEMA_FACTURAS)
+    aplicar_migraciones(db_path, "facturas", MIGRACIONES_FACTURAS)
+
+
+# --- Créditos (ventas.db) ---
+
+SCHEMA_CREDITOS = """
+CREATE TABLE IF NOT EXISTS clientes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dni TEXT UNIQUE NOT NULL,
+    nombre TEXT NOT NULL,
+    telefono TEXT,
+    direccion TEXT,
+    notas TEXT
+);
+
+CREATE TABLE IF NOT EXISTS creditos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    factura_id INTEGER NOT NULL,
+    cliente_id INTEGER NOT NULL,
+    monto_financiado REAL NOT NULL, -- Total con interés
+    monto_base REAL DEFAULT 0,      -- Capital original (sin interés) [NUEVO]
+    cantidad_cuotas INTEGER NOT NULL,
+    fecha_otorgamiento TEXT NOT NULL,
+    estado TEXT DEFAULT 'ACTIVO',
+    FOREIGN KEY(cliente_id) REFERENCES clientes(id)
+);
+
+CREATE TABLE IF NOT EXISTS cuotas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    credito_id INTEGER NOT NULL,
+    numero_cuota INTEGER NOT NULL,
+    fecha_vencimiento TEXT NOT NULL,
+    monto REAL NOT NULL,
+    fecha_pago TEXT,
+    estado TEXT DEFAULT 'PENDIENTE',
+    FOREIGN KEY(credito_id) REFERENCES creditos(id)
+);
+"""
+
+
+def _agregar_monto_base(con: sqlite3.Connection):
+    # Bases creadas antes de guardar el capital original
+    if 'monto_base' not in columnas_de(con, 'creditos'):
+        con.execute("ALTER TABLE creditos ADD COLUMN monto_base REAL DEFAULT 0")
+
+
+# Migraciones versionadas (ver logic/db_migrations.py). Agregar siempre al final.
+MIGRACIONES_CREDITOS = [
+    (1, "columna creditos.monto_base", _agregar_monto_base),
+    (2, "índices de créditos y cuotas", [
+        "CREATE INDEX IF NOT EXISTS idx_creditos_factura ON creditos(factura_id)",
+        "CREATE INDEX IF NOT EXISTS idx_cuotas_credito ON cuotas(credito_id)",
+        "CREATE INDEX IF NOT EXISTS idx_cuotas_estado_pago ON cuotas(estado, fecha_pago)",
+    ]),
+]
+
+
+def init_creditos(db_path):
+    with get_connection(db_path) as con:
+        con.executescript(SCHEMA_CREDITOS)
+    aplicar_migraciones(db_path, "creditos", MIGRACIONES_CREDITOS)
+
+
+# --- Stock (inventario.db) ---
+
+SCHEMA_STOCK = """
+CREATE TABLE IF NOT EXISTS stock_actual (
+    codigo TEXT PRIMARY KEY,
+    cantidad INTEGER NOT NULL
+)
+"""
+
+SCHEMA_MOVIMIENTOS = """
+CREATE TABLE IF NOT EXISTS movimientos_stock (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha TEXT NOT NULL,
+    codigo TEXT NOT NULL,
+    cantidad_alterada INTEGER NOT NULL,
+    tipo_movimiento TEXT NOT NULL, 
+    detalle TEXT
+)
+"""
+
+
+# Migraciones versionadas (ver logic/db_migrations.py). Agregar siempre al final.
+MIGRACIONES_STOCK = [
+    (1, "índice de movimientos por código", [
+        "CREATE INDEX IF NOT EXISTS idx_movimientos_codigo ON movimientos_stock(codigo)",
+    ]),
+]
+
+
+def init_stock(db_path):
+    with get_connection(db_path) as con:
+        con.execute(SCHEMA_STOCK)
+        con.execute(SCHEMA_MOVIMIENTOS)
+    aplicar_migraciones(db_path, "stock", MIGRACIONES_STOCK)
@@ -1,8 +1,14 @@
 import sqlite3
+from logic.db_manager import get_connection
+from logic.db_schema import COLUMNAS_ITEM, _insertar_items, init_facturas
+from logic.periodos import Fecha, a_iso, rango_de_prefijo
+import copy
 import json
 import datetime
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 
 
 import sys
@@ -35,30 +41,28 @@ OUTPUT_DIR = BASE_DIR / "output_docs"
 # --------------------------------------
 
 def _get_connection() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
-    return con
+    # Conexión persistente (una por hilo, en WAL): ver logic/db_manager.py
+    return get_connection(DB_PATH)
 
 def init_db():
-    schema = """
-    CREATE TABLE IF NOT EXISTS facturas (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        fecha TEXT NOT NULL,
-        metodo_pago TEXT NOT NULL,
-        total REAL NOT NULL,
-        ganancia REAL DEFAULT 0,
-        items_json TEXT NOT NULL
-    )
-    """
-    with _get_connection() as con:
-        con.execute(schema)
+    # Tablas + migraciones: ver logic/db_schema.py
+    init_facturas(DB_PATH)
 
 def registrar_venta(items_carrito: List[Dict[str, Any]], metodo_pago: str, total_venta: float) -> int:
     """
     Registra una venta.
     items_carrito: Debe venir con 'precio_venta_final' y 'precio_lista_base'.
     """
+    with _get_connection() as con:
+        factura_id = _insertar_factura(con, items_carrito, metodo_pago, total_venta)
+        con.commit()
+        return factura_id
+
+def _insertar_factura(con: sqlite3.Connection, items_carrito: List[Dict[str, Any]], metodo_pago: str, total_venta: float) -> int:
+    """
+    Inserta la factura sobre una conexión dada SIN hacer commit (lo decide quien llama).
+    Lo usan registrar_venta() y el checkout atómico (logic/checkout_service.py).
+    """
     fecha_iso = datetime.datetime.now().replace(microsecond=0).isoformat()
     
     items_to_store = []
@@ -101,16 +105,18 @@ def registrar_venta(items_carrito: List[Dict[str, Any]], metodo_pago: str, total
 
     items_json = json.dumps(items_to_store, ensure_ascii=False)
 
-    with _get_connection() as con:
-        cursor = con.execute(
-            """
-            INSERT INTO facturas (fecha, metodo_pago, total, ganancia, items_json)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (fecha_iso, metodo_pago, total_venta, ganancia_total, items_json)
-        )
-        con.commit()
-        return cursor.lastrowid
+    cursor = con.execute(
+        """
+        INSERT INTO facturas (fecha, metodo_pago, total, ganancia, items_json)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        (fecha_iso, metodo_pago, total_venta, ganancia_total, items_json)
+    )
+    factura_id = cursor.lastrowid
+    # Renglones también en factura_items (misma transacción): los reportes agregan en SQL.
+    # items_json se sigue guardando para los comprobantes y el detalle.
+    _insertar_items(con, factura_id, items_to_store)
+    return factura_id
 
 def obtener_historial() -> List[Dict]:
     with _get_connection() as con:
@@ -118,22 +124,123 @@ def obtener_historial() -> List[Dict]:
     return [_parse_row(row) for row in rows]
 
 def buscar_por_fecha(fecha_str: str) -> List[Dict]:
+    """Facturas cuya fecha empieza con fecha_str ('2026-10', '2026-10-18'...)."""
+    return buscar_por_rango(*rango_de_prefijo(fecha_str))
+
+def buscar_por_rango(desde: Fecha, hasta: Fecha) -> List[Dict]:
+    """
+    Facturas con desde <= fecha < hasta (hasta EXCLUSIVO), más nuevas primero.
+    Acepta date/datetime o texto ISO; ver logic/periodos.py para armar el rango.
+    El filtro por rango usa idx_facturas_fecha_id (LIKE / strftime recorren toda la tabla).
+    """
     with _get_connection() as con:
         rows = con.execute(
-            "SELECT * FROM facturas WHERE fecha LIKE ? ORDER BY id DESC", 
-            (f"{fecha_str}%",)
+            "SELECT * FROM facturas WHERE fecha >= ? AND fecha < ? ORDER BY id DESC",
+            (a_iso(desde), a_iso(hasta))
         ).fetchall()
     return [_parse_row(row) for row in rows]
 
-def _parse_row(row: sqlite3.Row) -> Dict[str, Any]:
-    d = dict(row)
-    if "items_json" in d and d["items_json"]:
+# --- Facturas por ID (con caché LRU de las últimas abiertas) ---
+# Una factura no se modifica después de registrada, así que la caché no se invalida
+# por ventas nuevas; sólo hace falta limpiarla si se reemplaza la base entera.
+_MAX_FACTURAS_CACHE = 32
+_facturas_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+_facturas_lock = threading.Lock()
+
+def obtener_factura_por_id(factura_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Una factura por clave primaria (con 'items' parseados), o None si no existe.
+    Devuelve una copia profunda: quien la recibe puede modificarla (incluidos
+    los items) sin tocar la caché.
+    """
+    factura_id = int(factura_id)
+    with _facturas_lock:
+        factura = _facturas_cache.get(factura_id)
+        if factura is not None:
+            _facturas_cache.move_to_end(factura_id)
+    if factura is None:
+        with _get_connection() as con:
+            row = con.execute("SELECT * FROM facturas WHERE id = ?", (factura_id,)).fetchone()
+        if row is None:
+            return None
+        factura = _parse_row(row)
+        with _facturas_lock:
+            _facturas_cache[factura_id] = factura
+            while len(_facturas_cache) > _MAX_FACTURAS_CACHE:
+                _facturas_cache.popitem(last=False)
+    return copy.deepcopy(factura)
+
+def limpiar_cache_facturas():
+    with _facturas_lock:
+        _facturas_cache.clear()
+
+def obtener_items_factura(factura_id: int) -> List[Dict[str, Any]]:
+    """Renglones de una factura desde factura_items (mismas claves que items_json)."""
+    with _get_connection() as con:
+        rows = con.execute(
+            f"SELECT {', '.join(COLUMNAS_ITEM)} FROM factura_items WHERE factura_id = ? ORDER BY renglon",
+            (factura_id,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+# --- Historial paginado (keyset: "las N anteriores a tal (fecha, id)", sin OFFSET) ---
+
+TAMANIO_PAGINA_HISTORIAL = 200
+
+def _condiciones_rango(desde: Optional[Fecha], hasta: Optional[Fecha]):
+    condiciones, params = [], []
+    if desde is not None:
+        condiciones.append("fecha >= ?")
+        params.append(a_iso(desde))
+    if hasta is not None:
+        condiciones.append("fecha < ?")
+        params.append(a_iso(hasta))
+    return condiciones, params
+
+def obtener_pagina_historial(desde: Optional[Fecha] = None, hasta: Optional[Fecha] = None,
+                             antes_de: Optional[Tuple[str, int]] = None,
+                             limite: int = TAMANIO_PAGINA_HISTORIAL) -> List[Dict]:
+    """
+    Una página del historial, más nuevas primero (opcionalmente dentro de [desde, hasta)).
+    La página siguiente se pide con antes_de = (fecha, id) de la última fila recibida:
+    el costo es el mismo para la primera página que para la número mil.
+    Orden y cursor van por (fecha, id), que es idx_facturas_fecha_id: con o sin
+    rango de fechas, SQLite recorre el índice sin ordenar en un temporal.
+    Las filas vienen con items_json SIN parsear (ver cargar_items()).
+    """
+    condiciones, params = _condiciones_rango(desde, hasta)
+    if antes_de is not None:
+        condiciones.append("(fecha, id) < (?, ?)")
+        params.extend(antes_de)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    with _get_connection() as con:
+        rows = con.execute(
+            f"SELECT * FROM facturas {where} ORDER BY fecha DESC, id DESC LIMIT ?",
+            (*params, limite)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+def totales_historial(desde: Optional[Fecha] = None, hasta: Optional[Fecha] = None) -> Dict[str, float]:
+    """{"cantidad": n_facturas, "total": suma} calculado en SQL (sin traer las filas)."""
+    condiciones, params = _condiciones_rango(desde, hasta)
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+    with _get_connection() as con:
+        row = con.execute(
+            f"SELECT COUNT(*) AS cantidad, COALESCE(SUM(total), 0) AS total FROM facturas {where}",
+            params
+        ).fetchone()
+    return {"cantidad": row['cantidad'], "total": row['total']}
+
+def cargar_items(factura: Dict[str, Any]) -> Dict[str, Any]:
+    """Parsea items_json en factura['items'] (una sola vez, sobre el mismo dict) y lo devuelve."""
+    if "items" not in factura:
         try:
-            d["items"] = json.loads(d["items_json"])
+            factura["items"] = json.loads(factura.get("items_json") or "[]")
         except json.JSONDecodeError:
-            d["items"] = []
-    else:
-        d["items"] = []
-    return d
+            factura["items"] = []
+    return factura
+
+def _parse_row(row: sqlite3.Row) -> Dict[str, Any]:
+    return cargar_items(dict(row))
 
 init_db()
\ No newline at end of file
@@ -0,0 +1,165 @@
+# logic/flyer_batch.py
+"""
+Generación masiva de flyers (una hoja completa o un DataFrame filtrado).
+
+Los flyers se renderizan en paralelo con un ProcessPoolExecutor (PIL libera
+poco el GIL, así que procesos rinden bastante más que hilos). El proceso
+principal sólo resuelve las rutas de imagen y escribe los PNG a una carpeta
+o a un .zip, informando avance y fallos.
+
+Uso (desde la raíz del proyecto):
+    python -m logic.flyer_batch "2 PLAZAS" salida/           -> carpeta con PNGs
+    python -m logic.flyer_batch "2 PLAZAS" promo.zip --zip   -> un único ZIP
+"""
+import os
+import re
+import sys
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from logic.image_service import generar_flyer_producto, obtener_ruta_imagen, identificador_imagen
+
+ProgresoCallback = Callable[[int, int], None]
+
+
+def _renderizar_en_proceso(tarea: tuple):
+    """Corre en un proceso del pool: (nombre, row, ruta) -> (nombre, png | None, error | None)."""
+    nombre, row, ruta_imagen = tarea
+    try:
+        return nombre, generar_flyer_producto(row, ruta_imagen).getvalue(), None
+    except Exception as e:
+        return nombre, None, str(e)
+
+
+def _nombre_archivo(row: dict, usados: set) -> str:
+    # "1000 - Pocket Queen.png"; sin caracteres prohibidos en Windows y sin repetir
+    partes = [identificador_imagen(row), str(row.get('MODELO', '')).strip()]
+    base = " - ".join(p for p in partes if p and p not in ('nan', '-'))
+    base = re.sub(r'[\\/*?:"<>|]', "", base).strip() or "flyer"
+    nombre, n = base, 2
+    while nombre.casefold() in usados:
+        nombre = f"{base} ({n})"
+        n += 1
+    usados.add(nombre.casefold())
+    return nombre + ".png"
+
+
+def preparar_tareas(df: pd.DataFrame, incluir_sin_imagen: bool = False):
+    """Devuelve (tareas, sin_imagen): una tarea por fila con su ruta de imagen ya resuelta."""
+    tareas, sin_imagen, usados = [], [], set()
+    for row in df.to_dict('records'):
+        ruta = obtener_ruta_imagen(row)
+        nombre = _nombre_archivo(row, usados)
+        if ruta is None and not incluir_sin_imagen:
+            sin_imagen.append(nombre)
+            continue
+        tareas.append((nombre, row, str(ruta) if ruta is not None else None))
+    return tareas, sin_imagen
+
+
+def generar_flyers_lote(df: pd.DataFrame, destino: str, como_zip: bool = False,
+                        workers: Optional[int] = None, incluir_sin_imagen: bool = False,
+                        progreso_callback: Optional[ProgresoCallback] = None,
+                        debe_cancelar: Optional[Callable[[], bool]] = None) -> Dict:
+    """
+    Renderiza un flyer por fila de df y los guarda en la carpeta `destino`
+    (o en el archivo ZIP `destino` si como_zip=True).
+
+    - progreso_callback(hechos, total) se llama en el proceso principal.
+    - debe_cancelar() -> True corta el lote (lo ya generado queda escrito).
+    Retorna {"destino", "generados", "sin_imagen": [..], "fallidos": [(nombre, error)], "cancelado"}.
+    """
+    tareas, sin_imagen = preparar_tareas(df, incluir_sin_imagen)
+    resultado = {"destino": destino, "generados": 0, "sin_imagen": sin_imagen,
+                 "fallidos": [], "cancelado": False}
+    total = len(tareas)
+    if progreso_callback:
+        progreso_callback(0, total)
+    if not tareas:
+        return resultado
+
+    if como_zip:
+        os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+        # PNG ya viene comprimido: ZIP_STORED evita gastar CPU en recomprimir
+        zip_out = zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(destino, exist_ok=True)
+        zip_out = None
+
+    workers = workers or min(os.cpu_count() or 1, total)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futuros = [pool.submit(_renderizar_en_proceso, t) for t in tareas]
+            for hechos, futuro in enumerate(as_completed(futuros), start=1):
+                try:
+                    nombre, png, error = futuro.result()
+                except Exception as e:  # El proceso murió (p.ej. sin memoria)
+                    nombre, png, error = "?", None, str(e)
+
+                if png is None:
+                    resultado["fallidos"].append((nombre, error))
+                elif zip_out is not None:
+                    zip_out.writestr(nombre, png)
+                    resultado["generados"] += 1
+                else:
+                    with open(os.path.join(destino, nombre), 'wb') as f:
+                        f.write(png)
+                    resultado["generados"] += 1
+
+                if progreso_callback:
+                    progreso_callback(hechos, total)
+                if debe_cancelar and debe_cancelar():
+                    resultado["cancelado"] = True
+                    for pendiente in futuros:
+                        pendiente.cancel()
+                    break
+    finally:
+        if zip_out is not None:
+            zip_out.close()
+
+    return resultado
+
+
+def generar_flyers_hoja(sheets: Dict[str, pd.DataFrame], hoja_nombre: str, destino: str, **kwargs) -> Dict:
+    """Atajo: todos los productos de una hoja del catálogo (ver generar_flyers_lote)."""
+    from logic.catalogo_service import obtener_df_por_hoja
+    return generar_flyers_lote(obtener_df_por_hoja(sheets, hoja_nombre), destino, **kwargs)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Genera los flyers de todos los productos de una hoja.")
+    parser.add_argument("hoja", help='Nombre de la hoja del catálogo, ej: "2 PLAZAS"')
+    parser.add_argument("destino", help="Carpeta de salida (o archivo .zip con --zip)")
+    parser.add_argument("--zip", action="store_true", help="Guardar todo en un único ZIP")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (default: núcleos)")
+    parser.add_argument("--incluir-sin-imagen", action="store_true", help="Generar también productos sin foto")
+    args = parser.parse_args(argv)
+
+    from logic.data_loader import cargar_hojas, existe_archivo_local
+    if not existe_archivo_local():
+        print("[ERROR] No hay catálogo local descargado (abrí la aplicación al menos una vez).")
+        return 1
+    sheets = cargar_hojas()
+    if args.hoja not in sheets:
+        print(f"[ERROR] La hoja '{args.hoja}' no existe. Hojas: {', '.join(sheets.keys())}")
+        return 1
+
+    def _progreso(hechos, total):
+        print(f"\r  {hechos}/{total} flyers", end="", flush=True)
+
+    res = generar_flyers_hoja(sheets, args.hoja, args.destino, como_zip=args.zip, workers=args.workers,
+                              incluir_sin_imagen=args.incluir_sin_imagen, progreso_callback=_progreso)
+    print(f"\n✅ {res['generados']} flyers en {res['destino']}")
+    if res["sin_imagen"]:
+        print(f"⚠️ {len(res['sin_imagen'])} productos sin imagen (omitidos)")
+    for nombre, error in res["fallidos"]:
+        print(f"❌ {nombre}: {error}")
+    return 0 if not res["fallidos"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+# logic/hojas_cache.py
+
+import os
+import re
+import json
+import shutil
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from logic.data_loader import get_data_dir
+
+# Se incrementa si cambia el formato en disco, para no leer cachés incompatibles
+VERSION_FORMATO = 1
+
+def get_cache_dir() -> str:
+    """Carpeta data/cache/hojas/ donde viven los DataFrames ya parseados."""
+    cache_dir = os.path.join(get_data_dir(), "cache", "hojas")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def _dir_para_hash(hash_xlsx: str) -> str:
+    return os.path.join(get_cache_dir(), hash_xlsx)
+
+def _nombre_archivo_seguro(indice: int, nombre_hoja: str) -> str:
+    # El índice garantiza unicidad aunque dos hojas sanitizadas coincidan
+    base = re.sub(r'[^\w\-]+', "_", str(nombre_hoja), flags=re.UNICODE).strip("_")
+    return f"{indice:03d}_{base or 'hoja'}.pkl"
+
+def leer_indice(hash_xlsx: str) -> Optional[dict]:
+    """Devuelve el index.json de la caché ({'hojas': [{'nombre', 'archivo'}]}) o None."""
+    if not hash_xlsx:
+        return None
+    try:
+        with open(os.path.join(_dir_para_hash(hash_xlsx), "index.json"), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if indice.get("version") != VERSION_FORMATO:
+        return None
+    return indice
+
+def registrar_indice(hash_xlsx: str, nombres_hojas: List[str]) -> dict:
+    """
+    Crea el index.json de la caché con el listado (ordenado) de hojas del libro.
+    Los .pkl de cada hoja se agregan de a uno, a medida que se parsean.
+    """
+    indice = {
+        "version": VERSION_FORMATO,
+        "hojas": [{"nombre": n, "archivo": _nombre_archivo_seguro(i, n)} for i, n in enumerate(nombres_hojas)]
+    }
+    if not hash_xlsx:
+        return indice
+    carpeta = _dir_para_hash(hash_xlsx)
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        temporal = os.path.join(carpeta, "index.json.tmp")
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False, indent=2)
+        os.replace(temporal, os.path.join(carpeta, "index.json"))
+    except OSError as e:
+        print(f"[WARNING] No se pudo guardar el índice de la caché de hojas: {e}")
+    return indice
+
+def cargar_hoja(hash_xlsx: str, archivo: str) -> Optional[pd.DataFrame]:
+    """Lee una hoja desde la caché binaria. None si no está (o está corrupta)."""
+    ruta = os.path.join(_dir_para_hash(hash_xlsx), archivo)
+    if not os.path.exists(ruta):
+        return None
+    try:
+        return pd.read_pickle(ruta)
+    except Exception as e:
+        print(f"[WARNING] Hoja en caché corrupta ({archivo}), se vuelve a parsear: {e}")
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+        return None
+
+def guardar_hoja(hash_xlsx: str, archivo: str, df: pd.DataFrame):
+    """
+    Persiste una hoja como pickle. Se escribe a un temporal y se renombra,
+    así un .pkl a medio escribir nunca es visible para cargar_hoja().
+    """
+    if not hash_xlsx:
+        return
+    carpeta = _dir_para_hash(hash_xlsx)
+    temporal = os.path.join(carpeta, archivo + ".tmp")
+    try:
+        os.makedirs(carpeta, exist_ok=True)
+        df.to_pickle(temporal)
+        os.replace(temporal, os.path.join(carpeta, archivo))
+    except Exception as e:
+        print(f"[WARNING] No se pudo guardar la hoja en caché ({archivo}): {e}")
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+
+def invalidar_cache(hash_xlsx: str = None):
+    """
+    Borra la caché de un hash concreto, o TODA la caché de hojas si no se indica hash.
+    La próxima carga volverá a parsear el Excel.
+    """
+    if hash_xlsx:
+        shutil.rmtree(_dir_para_hash(hash_xlsx), ignore_errors=True)
+    else:
+        shutil.rmtree(get_cache_dir(), ignore_errors=True)
+
+def limpiar_caches_viejas(hash_vigente: str):
+    """Elimina las cachés de versiones anteriores del catálogo (sólo conserva la vigente)."""
+    for nombre in os.listdir(get_cache_dir()):
+        if nombre != hash_vigente:
+            shutil.rmtree(os.path.join(get_cache_dir(), nombre), ignore_errors=True)
+
+
+# Catálogos abiertos (para fijarlos en memoria antes de pisar su .xlsx)
+# (por id: un Mapping no es hasheable, así que no entra en un WeakSet)
+_catalogos_vivos: "weakref.WeakValueDictionary[int, HojasCatalogo]" = weakref.WeakValueDictionary()
+_catalogos_lock = threading.Lock()
+
+def fijar_catalogos_abiertos(ruta_xlsx: str):
+    """
+    Se llama ANTES de reemplazar ruta_xlsx en disco: termina de cargar en memoria
+    las hojas pendientes de cada catálogo abierto que lee de ese archivo.
+    Si no, una hoja abierta por primera vez entre el reemplazo y el hot-swap
+    parsearía el libro nuevo y quedaría guardada bajo el hash viejo.
+    Casi siempre sale de la caché binaria (los .pkl), sin tocar el Excel.
+    """
+    ruta_abs = os.path.abspath(ruta_xlsx)
+    with _catalogos_lock:
+        catalogos = list(_catalogos_vivos.values())
+    for hojas in catalogos:
+        if os.path.abspath(hojas._ruta) != ruta_abs:
+            continue
+        try:
+            hojas.precargar()
+        except Exception as e:
+            print(f"[WARNING] No se pudieron fijar las hojas del catálogo abierto: {e}")
+
+
+class HojasCatalogo(Mapping):
+    """
+    Mapping perezoso {nombre_hoja: DataFrame} sobre el .xlsx del catálogo.
+
+    Cada hoja se parsea recién la primera vez que se accede (desde la caché
+    binaria si existe, si no desde el Excel) y queda memorizada. Se comporta
+    como el Dict[str, DataFrame] de siempre: .get(), [], in, keys(), items()...
+
+    - version: hash del .xlsx. Cambia cuando llega un catálogo nuevo y sirve
+      para invalidar cualquier caché derivada (ver catalogo_service).
+    """
+
+    def __init__(self, ruta_xlsx: str, hash_xlsx: str = None):
+        self._lock = threading.RLock()
+        self._cargar_origen(ruta_xlsx, hash_xlsx)
+        with _catalogos_lock:
+            _catalogos_vivos[id(self)] = self
+
+    def _cargar_origen(self, ruta_xlsx: str, hash_xlsx: str):
+        self._ruta = ruta_xlsx
+        self.version = hash_xlsx
+        self._memo: Dict[str, pd.DataFrame] = {}
+
+        indice = leer_indice(hash_xlsx)
+        if indice is None:
+            # Primera vez con este contenido: sólo leemos los nombres de las hojas
+            with pd.ExcelFile(ruta_xlsx) as xls:
+                indice = registrar_indice(hash_xlsx, list(xls.sheet_names))
+        self._archivos = {e["nombre"]: e["archivo"] for e in indice["hojas"]}
+
+    # --- Interfaz Mapping ---
+
+    def __getitem__(self, nombre_hoja: str) -> pd.DataFrame:
+        with self._lock:
+            if nombre_hoja in self._memo:
+                return self._memo[nombre_hoja]
+            if nombre_hoja not in self._archivos:
+                raise KeyError(nombre_hoja)
+
+            df = cargar_hoja(self.version, self._archivos[nombre_hoja]) if self.version else None
+            if df is None:
+                with pd.ExcelFile(self._ruta) as xls:
+                    df = xls.parse(nombre_hoja)
+                guardar_hoja(self.version, self._archivos[nombre_hoja], df)
+
+            self._memo[nombre_hoja] = df
+            return df
+
+    def __iter__(self):
+        return iter(list(self._archivos))
+
+    def __len__(self) -> int:
+        return len(self._archivos)
+
+    def __contains__(self, nombre_hoja) -> bool:
+        return nombre_hoja in self._archivos
+
+    # --- Extras ---
+
+    def esta_cargada(self, nombre_hoja: str) -> bool:
+        return nombre_hoja in self._memo
+
+    def precargar(self, nombres_hojas: List[str] = None):
+        """
+        Parsea (y guarda en caché) las hojas indicadas, o todas. Pensado para
+        correr en un hilo de fondo; abre el Excel una sola vez para todo el lote.
+        """
+        with self._lock:
+            pendientes = [n for n in (nombres_hojas or list(self._archivos))
+                          if n in self._archivos and n not in self._memo]
+            sin_cache = []
+            for nombre in pendientes:
+                df = cargar_hoja(self.version, self._archivos[nombre]) if self.version else None
+                if df is None:
+                    sin_cache.append(nombre)
+                else:
+                    self._memo[nombre] = df
+
+            if sin_cache:
+                with pd.ExcelFile(self._ruta) as xls:
+                    for nombre in sin_cache:
+                        df = xls.parse(nombre)
+                        guardar_hoja(self.version, self._archivos[nombre], df)
+                        self._memo[nombre] = df
+
+    def reemplazar(self, otras: "HojasCatalogo"):
+        """
+        Hot-swap: adopta el origen y las hojas ya cargadas de otro HojasCatalogo.
+        Las vistas que guardan una referencia a ESTE objeto ven los datos nuevos.
+        """
+        with self._lock, otras._lock:
+            self._ruta = otras._ruta
+            self.version = otras.version
+            self._archivos = dict(otras._archivos)
+            self._memo = dict(otras._memo)
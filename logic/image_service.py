@@ -3,72 +3,285 @@ import pandas as pd
 from PIL import Image, ImageDraw, ImageFont
 from logic.constants import IMG_CATALOGO_DIR, RUTA_FONT_FLYER, RUTA_LOGO_EMPRESA
 from logic.financiero import format_currency # Usamos tu función existente
+from logic.codigos import COL_CODIGO_NORM, SIN_CODIGO, normalizar_codigo
 
+import os
 import re
+import time
+import bisect
+import weakref
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 
-def obtener_ruta_imagen(row: dict):
+# Extensiones aceptadas, en orden de preferencia si hay dos archivos con el mismo nombre
+EXTENSIONES_IMAGEN = ('.png', '.jpg', '.jpeg')
+
+# Cada cuánto (segundos) se vuelve a mirar el mtime de la carpeta como máximo.
+# Agregar/borrar/renombrar un archivo cambia el mtime del directorio.
+_INTERVALO_CHEQUEO_IMAGENES = 2.0
+
+
+class IndiceImagenes:
     """
-    Verifica si existe una imagen asociada al producto. 
+    Índice en memoria de una carpeta de imágenes: {nombre_sin_extension (casefold): ruta}.
+
+    Se arma con UN solo listado del directorio y se reconstruye sólo si cambia el
+    mtime de la carpeta, en lugar de probar N extensiones con exists() por producto.
+    La búsqueda ignora mayúsculas/minúsculas y la extensión.
+
+    - version: sube con cada re-escaneo; sirve para invalidar lo que se haya
+      memorizado a partir de buscar() (ej: la ruta de imagen por fila de la tabla).
+    """
+
+    def __init__(self, carpeta: Path):
+        self.carpeta = Path(carpeta)
+        self._lock = threading.Lock()
+        self._lock_fondo = threading.Lock()  # Tomado mientras hay una revalidación en un hilo aparte
+        self._rutas: Dict[str, Path] = {}
+        self._firmas: Dict[str, Tuple[int, int]] = {}
+        self._mtime = None
+        self._ultimo_chequeo = 0.0
+        self.version = 0
+
+    def _escanear(self) -> Tuple[Dict[str, Path], Dict[str, Tuple[int, int]]]:
+        rutas = {}
+        prioridad = {}
+        try:
+            entradas = list(os.scandir(self.carpeta))
+        except OSError:
+            return rutas, {}
+        for entrada in entradas:
+            nombre, ext = os.path.splitext(entrada.name)
+            ext = ext.lower()
+            if ext not in EXTENSIONES_IMAGEN or not entrada.is_file():
+                continue
+            clave = nombre.strip().casefold()
+            orden = EXTENSIONES_IMAGEN.index(ext)
+            if clave not in rutas or orden < prioridad[clave]:
+                rutas[clave] = (self.carpeta / entrada.name, entrada)
+                prioridad[clave] = orden
+
+        # Firma (mtime, tamaño) de cada imagen elegida: las miniaturas la usan como clave
+        firmas = {}
+        for clave, (ruta, entrada) in list(rutas.items()):
+            rutas[clave] = ruta
+            try:
+                st = entrada.stat()
+                firmas[str(ruta)] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                pass
+        return rutas, firmas
+
+    def _refrescar_si_cambio(self, forzar: bool = False):
+        ahora = time.monotonic()
+        with self._lock:
+            if not forzar and self._mtime is not None and ahora - self._ultimo_chequeo < _INTERVALO_CHEQUEO_IMAGENES:
+                return
+            self._ultimo_chequeo = ahora
+            try:
+                mtime = os.stat(self.carpeta).st_mtime_ns
+            except OSError:
+                mtime = -1  # La carpeta no existe (todavía): índice vacío
+            if forzar or mtime != self._mtime:
+                self._rutas, self._firmas = self._escanear() if mtime != -1 else ({}, {})
+                self._mtime = mtime
+                self.version += 1
+
+    def invalidar(self):
+        """Fuerza un nuevo escaneo (p.ej. después de copiar imágenes desde la app)."""
+        self._refrescar_si_cambio(forzar=True)
+
+    def revalidar_en_segundo_plano(self):
+        """
+        Como _refrescar_si_cambio() pero en un hilo aparte y sin esperar: para el
+        hilo de la UI, donde un stat de la carpeta (disco lento o de red) congela.
+        """
+        if self._mtime is not None and time.monotonic() - self._ultimo_chequeo < _INTERVALO_CHEQUEO_IMAGENES:
+            return
+        if not self._lock_fondo.acquire(blocking=False):
+            return  # Ya hay una en curso
+        threading.Thread(target=self._revalidar_fondo, name="IndiceImagenes", daemon=True).start()
+
+    def _revalidar_fondo(self):
+        try:
+            self._refrescar_si_cambio()
+        except Exception as e:
+            print(f"[WARNING] No se pudo revisar la carpeta de imágenes: {e}")
+        finally:
+            self._lock_fondo.release()
+
+    def buscar(self, nombre: str, revalidar: bool = True) -> Optional[Path]:
+        """
+        Ruta de la imagen con ese nombre (sin extensión), o None.
+        Con revalidar=False sólo se lee el índice en memoria: la revisión de la
+        carpeta, si toca, corre en segundo plano (ver revalidar_en_segundo_plano()).
+        """
+        if revalidar:
+            self._refrescar_si_cambio()
+        else:
+            self.revalidar_en_segundo_plano()
+        return self._rutas.get(str(nombre).strip().casefold())
+
+    def firma(self, ruta) -> Optional[Tuple[int, int]]:
+        """
+        (mtime_ns, tamaño) de una ruta devuelta por buscar(), tomada en el último
+        escaneo (sin tocar el disco). None si la ruta no es de este índice.
+        Ojo: pisar un archivo no cambia el mtime de la carpeta; invalidar() lo relee.
+        """
+        return self._firmas.get(str(ruta))
+
+    def __len__(self) -> int:
+        self._refrescar_si_cambio()
+        return len(self._rutas)
+
+
+# Índice compartido de data/imagenes/ (lo usan el catálogo y los flyers)
+indice_imagenes = IndiceImagenes(IMG_CATALOGO_DIR)
+
+
+def identificador_imagen(row: dict) -> Optional[str]:
+    """
+    Nombre de archivo (sin extensión) esperado para la imagen del producto.
     Busca de forma flexible por CÓDIGO o MODELO, manejando Floats de Pandas.
     """
     
-    # 1. Obtener el valor crudo de CÓDIGO (con tilde), CODIGO, o MODELO
-    val = row.get('CÓDIGO', row.get('CODIGO', row.get('MODELO')))
-    
-    # Checkeamos si es nulo (None o NaN de Pandas)
-    if val is None or pd.isna(val) or str(val).strip() in ['', '-', 'None', 'nan']:
+    # Mismo código canónico que el stock: la fila del catálogo ya lo trae (CODIGO_NORM);
+    # si no, se normaliza CÓDIGO (con tilde), CODIGO, o MODELO (1000.0 -> '1000').
+    identificador = row.get(COL_CODIGO_NORM)
+    if not isinstance(identificador, str):
+        identificador = normalizar_codigo(row.get('CÓDIGO', row.get('CODIGO', row.get('MODELO'))))
+
+    if identificador in (SIN_CODIGO, '0', 'nan', 'None'):
+        return None
+        
+    # Sanitizar nombre para Windows (quitar caracteres prohibidos \/*?:"<>|)
+    return re.sub(r'[\\/*?:"<>|]', "", identificador).strip() or None
+
+
+def obtener_ruta_imagen(row: dict, revalidar: bool = True):
+    """
+    Verifica si existe una imagen asociada al producto. 
+    Consulta el índice de data/imagenes/ (sin tocar el disco por cada fila).
+    Desde el hilo de la UI va con revalidar=False: ver IndiceImagenes.buscar().
+    """
+    nombre_seguro = identificador_imagen(row)
+    if not nombre_seguro:
         return None
+    return indice_imagenes.buscar(nombre_seguro, revalidar)
+
+
+# Anchos de palabras ya medidos, por fuente: {font: {texto: ancho_px}}.
+# WeakKeyDictionary para no mantener vivas fuentes que ya nadie usa.
+_anchos_por_fuente: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+ELIPSIS = "…"
+
 
-    # ---------------------------------------------------------
-    # 🛠️ CORAZÓN DE LA SOLUCIÓN: MANEJO DE TIPOS DE DATOS 🛠️
-    # ---------------------------------------------------------
+def _medidor(font):
+    """Devuelve ancho(texto) con memo por fuente (getlength = avance horizontal en px)."""
     try:
-        if isinstance(val, (float, int)):
-            # --- EL ARREGLO PARA EL BUG DE BÚSQUEDA ---
-            # Si val es 1000.0 (float) -> int(1000.0) es 1000 (int) -> str(1000) es "1000"
-            identificador = str(int(float(val))).strip()
+        cache = _anchos_por_fuente.setdefault(font, {})
+    except TypeError:  # Fuente sin soporte de weakref: medimos sin memo
+        cache = {}
+
+    def ancho(texto: str) -> float:
+        valor = cache.get(texto)
+        if valor is None:
+            valor = font.getlength(texto)
+            cache[texto] = valor
+        return valor
+    return ancho
+
+
+def _borde_derecho(font, texto: str) -> float:
+    """Lo que medía draw.textbbox((0, 0), texto, font=font)[2]."""
+    return font.getbbox(texto)[2]
+
+
+def _partir_palabra(palabra: str, ancho, max_width: float) -> List[str]:
+    """Corta una palabra más ancha que la línea en trozos que entren (búsqueda binaria)."""
+    trozos = []
+    while palabra:
+        lo, hi = 1, len(palabra)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if ancho(palabra[:mid]) <= max_width:
+                lo = mid
+            else:
+                hi = mid - 1
+        trozos.append(palabra[:lo])  # Al menos 1 carácter: siempre avanza
+        palabra = palabra[lo:]
+    return trozos
+
+
+def _elipsar(linea: str, ancho, max_width: float) -> str:
+    """Recorta la línea (por palabras, y si hace falta por caracteres) hasta que entre con '…'."""
+    palabras = linea.split()
+    while palabras and ancho(" ".join(palabras) + ELIPSIS) > max_width:
+        if len(palabras) > 1:
+            palabras.pop()
         else:
-            # Es texto normal (como "GANI-100"), solo limpiamos espacios
-            identificador = str(val).strip()
-    except Exception as e:
-        # Fallback de seguridad si la conversión numérica falla
-        print(f"⚠️ Warning: Error convirtiendo ID '{val}': {e}")
-        identificador = str(val).strip()
-    # ---------------------------------------------------------
+            palabras[0] = palabras[0][:-1]
+            if not palabras[0]:
+                palabras.pop()
+    return (" ".join(palabras) + ELIPSIS) if palabras else ELIPSIS
 
-    if not identificador or identificador in ['0', 'nan']:
-        return None
-        
-    # 2. Sanitizar nombre para Windows (quitar caracteres prohibidos \/*?:"<>|)
-    nombre_seguro = re.sub(r'[\\/*?:"<>|]', "", identificador).strip()
-    
-    #  DIAGNÓSTICO (Opcional, descomenta si sigue fallando)
-    # print(f"🔍 DEBUG FISICO: Buscando '{nombre_seguro}.png' en {IMG_CATALOGO_DIR}")
-    
-    # 3. Buscar soportando varias extensiones comunes
-    for ext in ['.png', '.jpg', '.jpeg', '.PNG', '.JPG']:
-        ruta = IMG_CATALOGO_DIR / f"{nombre_seguro}{ext}"
-        if ruta.exists():
-            return ruta
-            
-    return None
 
+def partir_lineas(text, font, max_width: float, max_lineas: Optional[int] = None) -> List[str]:
+    """
+    Reparte el texto en líneas de a lo sumo max_width px (corte por palabras).
+    - Cada palabra se mide una sola vez por fuente; el corte se busca con anchos
+      acumulados + bisect y se confirma midiendo la línea real (kerning / bbox).
+    - Una palabra más ancha que la línea se corta por caracteres (antes colgaba).
+    - max_lineas: si sobra texto, la última línea termina en '…'.
+    """
+    ancho = _medidor(font)
+    espacio = ancho(" ")
+
+    palabras = []
+    for palabra in str(text).split():
+        if ancho(palabra) > max_width:
+            palabras.extend(_partir_palabra(palabra, ancho, max_width))
+        else:
+            palabras.append(palabra)
+
+    # acumulado[i] = ancho de palabras[:i] unidas con espacios (+ un espacio final)
+    acumulado = [0.0]
+    for palabra in palabras:
+        acumulado.append(acumulado[-1] + ancho(palabra) + espacio)
+
+    lines = []
+    inicio = 0
+    while inicio < len(palabras):
+        # Mayor fin tal que palabras[inicio:fin] entra: acumulado[fin] - acumulado[inicio] - espacio <= max_width
+        fin = bisect.bisect_right(acumulado, acumulado[inicio] + max_width + espacio, lo=inicio + 1) - 1
+        fin = max(fin, inicio + 1)
+        # Confirmación con la misma medida que usaba el corte original (borde derecho
+        # del bbox, no el avance): la suma es sólo una estimación, se corrige para los
+        # dos lados y así las líneas salen idénticas a las de antes.
+        while fin > inicio + 1 and _borde_derecho(font, " ".join(palabras[inicio:fin])) > max_width:
+            fin -= 1
+        while fin < len(palabras) and _borde_derecho(font, " ".join(palabras[inicio:fin + 1])) <= max_width:
+            fin += 1
+        lines.append(" ".join(palabras[inicio:fin]))
+        inicio = fin
+
+        if max_lineas is not None and len(lines) == max_lineas and inicio < len(palabras):
+            lines[-1] = _elipsar(lines[-1] + " " + palabras[inicio], ancho, max_width)
+            break
+
+    return lines
 
-def draw_text_wrapped(draw, text, x, y, font, max_width, fill):
+
+def draw_text_wrapped(draw, text, x, y, font, max_width, fill, max_lineas: Optional[int] = None):
     """
     Dibuja un texto dividiéndolo en múltiples líneas si excede el max_width.
     Retorna la nueva coordenada Y después de dibujar.
     """
-    lines = []
-    words = text.split()
-    
-    while words:
-        line = ''
-        while words and draw.textbbox((0, 0), line + words[0], font=font)[2] <= max_width:
-            line += (words.pop(0) + ' ')
-        lines.append(line.strip())
+    lines = partir_lineas(text, font, max_width, max_lineas)
     
     current_y = y
     for line in lines:
@@ -81,38 +294,132 @@ def draw_text_wrapped(draw, text, x, y, font, max_width, fill):
     return current_y
 
 
-def generar_flyer_producto(row: dict, ruta_imagen: Path, ruta_logo: Path = None) -> io.BytesIO:
+# ============================================================================
+# 🗃️ CACHÉ DE RECURSOS DEL FLYER (por proceso)
+# ============================================================================
+# Columnas de la fila que realmente se dibujan: si ninguna cambia (y la foto
+# tampoco), el flyer renderizado es idéntico y se puede reutilizar.
+CAMPOS_FLYER = ('PROVEEDOR', 'MODELO', 'MEDIDA (LARG-ANCH-ESP)', 'MATERIAL', 'SOPORTA (PORPLAZA)',
+                'EFECTIVO/TRANSF', 'DEBIT/CREDIT', 'LISTA/TARJETA')
+
+_MAX_FLYERS_CACHE = 32
+_flyers_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_flyers_lock = threading.Lock()
+
+
+def _mtime(ruta) -> Optional[int]:
+    try:
+        return os.stat(ruta).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+@lru_cache(maxsize=None)
+def _fuente(font_path: str, tamanio: int):
+    # El fallback también queda en caché: si la fuente no existe no se vuelve
+    # a buscar en disco en cada flyer.
+    try:
+        return ImageFont.truetype(font_path, tamanio)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _fuentes_flyer():
+    """(font_main, font_title, font_price), cargadas una sola vez por proceso."""
+    # Definir tipografía por defecto (puedes usar RUTA_FONT_FLYER si la tienes)
+    # Aquí usaré fuentes genéricas para que no falle, ajústalas a tus .ttf si tienes
+    # Asumiendo que RUTA_FONT_FLYER está definida en constants
+    # font_path = str(RUTA_FONT_FLYER) 
+    # Pero usaré una ruta por defecto por seguridad:
+    font_path = "arial.ttf" # ReportLab/Pillow a veces encuentran arial
+    # Si no hay fuentes instaladas, _fuente() devuelve la de Pillow por defecto
+    return _fuente(font_path, 32), _fuente(font_path, 45), _fuente(font_path, 38)
+
+
+@lru_cache(maxsize=4)
+def _logo_preescalado(ruta_logo: str, mtime: Optional[int], area: tuple):
+    """
+    Logo ya achicado al área del flyer. Devuelve (imagen | None, existe).
+    El mtime es parte de la clave: si reemplazan el archivo se vuelve a leer.
+    """
+    if mtime is None:
+        print(f"⚠️ Warning: No se encontró el logo en {ruta_logo}. Flyer sin branding.")
+        return None, False
+    try:
+        with Image.open(ruta_logo) as logo_img:
+            logo_img.load()
+            logo_img.thumbnail(area, Image.Resampling.LANCZOS)
+            return logo_img.copy(), True
+    except Exception as e:
+        print(f"❌ Error al incrustar el logo: {e}")
+        return None, True
+
+
+@lru_cache(maxsize=32)
+def _imagen_producto(ruta_imagen: str, mtime: Optional[int], area: tuple):
+    """Foto del producto decodificada y achicada al recuadro del flyer (LRU)."""
+    with Image.open(ruta_imagen) as prod_img:
+        prod_img.draft("RGB", area)
+        prod_img.load()
+        prod_img.thumbnail(area, Image.Resampling.LANCZOS)
+        return prod_img.copy()
+
+
+def _clave_flyer(row: dict, ruta_imagen, ruta_logo) -> tuple:
+    # str() para que NaN == NaN dentro de la clave
+    campos = tuple(str(row.get(c)) for c in CAMPOS_FLYER)
+    return (campos, str(ruta_imagen), _mtime(ruta_imagen), str(ruta_logo), _mtime(ruta_logo))
+
+
+def limpiar_cache_flyers():
+    """Descarta flyers renderizados e imágenes decodificadas (fuentes quedan)."""
+    with _flyers_lock:
+        _flyers_cache.clear()
+    _logo_preescalado.cache_clear()
+    _imagen_producto.cache_clear()
+
+
+def generar_flyer_producto(row: dict, ruta_imagen: Path = None, ruta_logo: Path = None) -> io.BytesIO:
     """
     Genera un flyer visual combinando foto del producto, logo de la empresa y texto completo.
+    Si no se indica ruta_imagen, se resuelve con el índice de imágenes.
+    Los flyers ya renderizados se reutilizan mientras la fila y la foto no cambien.
     """
+    if ruta_imagen is None:
+        ruta_imagen = obtener_ruta_imagen(row)
+    if ruta_logo is None:
+        ruta_logo = Path("data/recursos/elgalpon.png")
+
+    clave = _clave_flyer(row, ruta_imagen, ruta_logo)
+    with _flyers_lock:
+        png = _flyers_cache.get(clave)
+        if png is not None:
+            _flyers_cache.move_to_end(clave)
+    if png is None:
+        png = _renderizar_flyer(row, ruta_imagen, Path(ruta_logo))
+        with _flyers_lock:
+            _flyers_cache[clave] = png
+            while len(_flyers_cache) > _MAX_FLYERS_CACHE:
+                _flyers_cache.popitem(last=False)
+
+    # Siempre un BytesIO nuevo: quien lo recibe puede leerlo/moverlo sin afectar la caché
+    return io.BytesIO(png)
+
+
+def _renderizar_flyer(row: dict, ruta_imagen: Path, ruta_logo: Path) -> bytes:
     canvas_width = 1200
     canvas_height = 800
     # Fondo blanco puro
     flyer = Image.new('RGB', (canvas_width, canvas_height), color='white')
     draw = ImageDraw.Draw(flyer)
 
-    # Definir tipografía por defecto (puedes usar RUTA_FONT_FLYER si la tienes)
-    # Aquí usaré fuentes genéricas para que no falle, ajústalas a tus .ttf si tienes
-    try:
-        # Asumiendo que RUTA_FONT_FLYER está definida en constants
-        # font_path = str(RUTA_FONT_FLYER) 
-        # Pero usaré una ruta por defecto por seguridad:
-        font_path = "arial.ttf" # ReportLab/Pillow a veces encuentran arial
-        font_main = ImageFont.truetype(font_path, 32)
-        font_title = ImageFont.truetype(font_path, 45)
-        font_price = ImageFont.truetype(font_path, 38)
-    except Exception:
-        # Fallback si no hay fuentes instaladas
-        font_main = font_title = font_price = ImageFont.load_default()
+    font_main, font_title, font_price = _fuentes_flyer()
 
     text_color = (44, 62, 80) # Azul oscuro elegante
 
     # ------------------------------------------------------------------------
     # 🆕 1.1 LOGO DE LA EMPRESA (Arriba a la derecha) 🆕
     # ------------------------------------------------------------------------
-    if ruta_logo is None:
-        ruta_logo = Path("data/recursos/elgalpon.png")
-
     # Mantenemos el cálculo del tamaño agrandado
     base_logo_width = 200
     base_logo_height = 100
@@ -129,22 +436,15 @@ def generar_flyer_producto(row: dict, ruta_imagen: Path, ruta_logo: Path = None)
     # Y inferior = Coordenada Y superior + Altura del área asignada
     logo_bottom_y = logo_y + logo_area_size[1] 
 
-    if ruta_logo.exists():
-        try:
-            logo_img = Image.open(ruta_logo)
-            logo_img.thumbnail(logo_area_size, Image.Resampling.LANCZOS)
-            
+    logo_img, logo_existe = _logo_preescalado(str(ruta_logo), _mtime(ruta_logo), logo_area_size)
+    if logo_existe:
+        # Si falla el logo (logo_img None), el fallback de logo_bottom_y sigue sirviendo
+        if logo_img is not None:
             if logo_img.mode == 'RGBA':
                 flyer.paste(logo_img, (logo_x, logo_y), logo_img)
             else:
                 flyer.paste(logo_img, (logo_x, logo_y))
-            
-            # print(f"✅ Logo '{ruta_logo.name}' incrustado. Y inferior: {logo_bottom_y}.")
-        except Exception as e:
-            print(f"❌ Error al incrustar el logo: {e}")
-            # Si falla el logo, el fallback de logo_bottom_y sigue sirviendo
     else:
-        print(f"⚠️ Warning: No se encontró el logo en {ruta_logo}. Flyer sin branding.")
         # Fallback de seguridad si no hay logo: simulamos que termina más arriba
         logo_bottom_y = margin_top_logo + 50 # Un margen pequeño
 
@@ -157,9 +457,8 @@ def generar_flyer_producto(row: dict, ruta_imagen: Path, ruta_logo: Path = None)
     image_y_offset = (canvas_height - image_area_size[1]) // 2
 
     try:
-        # Abrimos la ruta exacta que nos pasó el wrapper
-        prod_img = Image.open(ruta_imagen)
-        prod_img.thumbnail(image_area_size, Image.Resampling.LANCZOS)
+        # Abrimos la ruta exacta que nos pasó el wrapper (decodificada una sola vez, ver caché)
+        prod_img = _imagen_producto(str(ruta_imagen), _mtime(ruta_imagen), image_area_size)
         
         # Centrar la imagen en su recuadro
         img_w, img_h = prod_img.size
@@ -242,7 +541,6 @@ def generar_flyer_producto(row: dict, ruta_imagen: Path, ruta_logo: Path = None)
     img_io = io.BytesIO()
     # Usamos PNG para preservar transparencias y calidad
     flyer.save(img_io, format='PNG')
-    img_io.seek(0)
     
-    return img_io
+    return img_io.getvalue()
 
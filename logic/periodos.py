@@ -0,0 +1,57 @@
+# logic/periodos.py
+"""
+Períodos de fechas como rangos semiabiertos [desde, hasta).
+
+Las fechas se guardan en ISO ('2026-10-18T08:32:14' en facturas,
+'2026-10-18' en cuotas), que ordena igual como texto que como fecha: por eso
+`fecha >= desde AND fecha < hasta` filtra bien Y puede usar el índice
+(a diferencia de LIKE '2026-10%' o strftime('%Y-%m', fecha) = ?).
+"""
+import datetime
+from typing import Tuple, Union
+
+Fecha = Union[datetime.date, datetime.datetime, str]
+Rango = Tuple[datetime.date, datetime.date]
+
+
+def rango_mes(mes: int, anio: int) -> Rango:
+    desde = datetime.date(anio, mes, 1)
+    hasta = datetime.date(anio + (mes == 12), mes % 12 + 1, 1)
+    return desde, hasta
+
+
+def rango_semana(dia: datetime.date) -> Rango:
+    """Semana de lunes a domingo que contiene a `dia`."""
+    desde = dia - datetime.timedelta(days=dia.weekday())
+    return desde, desde + datetime.timedelta(days=7)
+
+
+def rango_trimestre(trimestre: int, anio: int) -> Rango:
+    """trimestre: 1..4"""
+    desde, _ = rango_mes(3 * (trimestre - 1) + 1, anio)
+    _, hasta = rango_mes(3 * trimestre, anio)
+    return desde, hasta
+
+
+def rango_dias(desde: datetime.date, hasta_inclusive: datetime.date) -> Rango:
+    """Del día `desde` al día `hasta_inclusive` (ambos incluidos, como se eligen en pantalla)."""
+    if hasta_inclusive < desde:
+        desde, hasta_inclusive = hasta_inclusive, desde
+    return desde, hasta_inclusive + datetime.timedelta(days=1)
+
+
+def rango_de_prefijo(prefijo: str) -> Tuple[str, str]:
+    """
+    Equivalente por rango de LIKE 'prefijo%' sobre fechas ISO:
+    '2026-10' -> ('2026-10', '2026-11'), '2026-10-18' -> ('2026-10-18', '2026-10-19').
+    """
+    if not prefijo:
+        return "", "\uffff"
+    return prefijo, prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+
+
+def a_iso(valor: Fecha) -> str:
+    """date / datetime / str -> texto ISO comparable con lo guardado en la base."""
+    if isinstance(valor, (datetime.date, datetime.datetime)):
+        return valor.isoformat()
+    return str(valor)
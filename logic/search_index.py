@@ -0,0 +1,153 @@
+# logic/search_index.py
+
+import re
+import bisect
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from logic.codigos import COL_CODIGO_NORM, SIN_CODIGO
+
+# Separador entre MODELO y CÓDIGO dentro del texto indexado: nunca aparece en una
+# consulta, así un término no puede "matchear" cruzando de una columna a la otra.
+_SEP = "\x00"
+_RE_TOKENS = re.compile(r"[\s\x00]+")
+
+
+def normalizar_texto(valor) -> str:
+    """Minúsculas, sin tildes y sin espacios extremos ('Colchón ÑANDÚ ' -> 'colchon nandu')."""
+    if valor is None or (isinstance(valor, float) and pd.isna(valor)):
+        return ""
+    texto = unicodedata.normalize("NFKD", str(valor))
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return texto.casefold().strip()
+
+
+def _texto_codigo(valor) -> str:
+    # 1000.0 (float de pandas) se indexa como "1000", igual que se muestra
+    if isinstance(valor, float) and not pd.isna(valor) and valor.is_integer():
+        return str(int(valor))
+    return normalizar_texto(valor)
+
+
+def _trigramas(texto: str):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class _IndiceHoja:
+    """Postings de una sola hoja. Inmutable una vez construido."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df  # Referencia al DataFrame indexado (para detectar cambios)
+
+        modelos = df['MODELO'].tolist() if 'MODELO' in df.columns else [None] * len(df)
+        if COL_CODIGO_NORM in df.columns:
+            # Código canónico de la hoja ('1000', 'S/C'): sólo falta pasarlo a minúsculas
+            codigos = [None if c == SIN_CODIGO else c for c in df[COL_CODIGO_NORM].tolist()]
+        else:
+            col_codigo = 'CÓDIGO' if 'CÓDIGO' in df.columns else ('CODIGO' if 'CODIGO' in df.columns else None)
+            codigos = df[col_codigo].tolist() if col_codigo else [None] * len(df)
+
+        self.textos: List[str] = [
+            f"{normalizar_texto(m)}{_SEP}{_texto_codigo(c)}" for m, c in zip(modelos, codigos)
+        ]
+
+        trigramas = defaultdict(list)
+        tokens = defaultdict(list)
+        for fila, texto in enumerate(self.textos):
+            for g in _trigramas(texto):
+                trigramas[g].append(fila)
+            for tok in set(_RE_TOKENS.split(texto)):
+                if tok:
+                    tokens[tok].append(fila)
+
+        self.trigramas: Dict[str, List[int]] = dict(trigramas)
+        self.tokens: Dict[str, List[int]] = dict(tokens)
+        self.tokens_ordenados: List[str] = sorted(tokens)
+
+    def buscar(self, termino: str) -> List[int]:
+        """Posiciones (iloc) de las filas que matchean, en el orden de la hoja."""
+        if len(termino) >= 3:
+            # Subcadena: intersección de postings de trigramas + verificación final
+            listas = []
+            for g in _trigramas(termino):
+                posting = self.trigramas.get(g)
+                if posting is None:
+                    return []
+                listas.append(posting)
+            listas.sort(key=len)
+            candidatos = set(listas[0])
+            for posting in listas[1:]:
+                candidatos.intersection_update(posting)
+                if not candidatos:
+                    return []
+            return sorted(f for f in candidatos if termino in self.textos[f])
+
+        # 1-2 caracteres: prefijo de palabra (una subcadena tan corta matchearía casi todo)
+        filas = set()
+        i = bisect.bisect_left(self.tokens_ordenados, termino)
+        while i < len(self.tokens_ordenados) and self.tokens_ordenados[i].startswith(termino):
+            filas.update(self.tokens[self.tokens_ordenados[i]])
+            i += 1
+        return sorted(filas)
+
+
+class IndiceBusqueda:
+    """
+    Índice en memoria sobre MODELO y CÓDIGO de varias hojas del catálogo.
+
+    Se actualiza de forma incremental: actualizar() sólo reconstruye las hojas
+    cuyo DataFrame cambió (otro objeto), el resto se reutiliza tal cual.
+    Las consultas son seguras desde otros hilos.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hojas: Dict[str, _IndiceHoja] = {}
+
+    def actualizar(self, frames: Dict[str, pd.DataFrame]):
+        """frames: {nombre_hoja: df_normalizado}. Conserva el orden recibido."""
+        nuevas = {}
+        for nombre, df in frames.items():
+            if df is None or df.empty:
+                continue
+            actual = self._hojas.get(nombre)
+            nuevas[nombre] = actual if (actual is not None and actual.df is df) else _IndiceHoja(df)
+        with self._lock:
+            self._hojas = nuevas
+
+    def _snapshot(self) -> List[Tuple[str, _IndiceHoja]]:
+        with self._lock:
+            return list(self._hojas.items())
+
+    @staticmethod
+    def _buscar_en(hojas, termino: str, limite: Optional[int]) -> List[Tuple[_IndiceHoja, List[int]]]:
+        termino = normalizar_texto(termino)
+        if not termino:
+            return []
+        resultado = []
+        restantes = limite
+        for _nombre, indice in hojas:
+            filas = indice.buscar(termino)
+            if restantes is not None:
+                filas = filas[:restantes]
+                restantes -= len(filas)
+            if filas:
+                resultado.append((indice, filas))
+            if restantes is not None and restantes <= 0:
+                break
+        return resultado
+
+    def contar(self, termino: str) -> int:
+        """Cantidad total de coincidencias (sin materializar filas)."""
+        return sum(len(filas) for _, filas in self._buscar_en(self._snapshot(), termino, None))
+
+    def buscar(self, termino: str, limite: Optional[int] = None) -> pd.DataFrame:
+        """Filas que matchean (de todas las hojas indexadas, concatenadas) como DataFrame."""
+        partes = [indice.df.iloc[filas] for indice, filas in self._buscar_en(self._snapshot(), termino, limite)]
+        if not partes:
+            return pd.DataFrame()
+        return pd.concat(partes, ignore_index=True)
@@ -1,12 +1,18 @@
 import sqlite3
-import json
 from logic.financiero import calcular_comisiones
 from logic.credits_service import _get_connection as get_conn_credits
 from logic.facturas_db_handler import _get_connection as get_conn_invoices
+from logic.periodos import Fecha, a_iso, rango_mes
 
 def obtener_reporte_mensual(mes: int, anio: int) -> dict:
-    
-    mes_str = f"{anio}-{mes:02d}"
+    return obtener_reporte_rango(*rango_mes(mes, anio))
+
+def obtener_reporte_rango(desde: Fecha, hasta: Fecha) -> dict:
+    """
+    Reporte de comisiones para desde <= fecha < hasta (hasta EXCLUSIVO).
+    Ver logic/periodos.py para armar meses, semanas, trimestres, etc.
+    """
+    desde_iso, hasta_iso = a_iso(desde), a_iso(hasta)
 
     reporte = {
         "ventas": [],
@@ -18,57 +24,29 @@ def obtener_reporte_mensual(mes: int, anio: int) -> dict:
         }
     }
     
-    # 1. OBTENER LISTA NEGRA DE IDs (Facturas que son Créditos)
-    ids_excluir = []
-    with get_conn_credits() as con:
-        rows = con.execute("SELECT factura_id FROM creditos").fetchall()
-        ids_excluir = [row['factura_id'] for row in rows]
-
     # A) Ventas DIRECTAS (Efectivo/Tarjeta)
+    # Las facturas que son Créditos se excluyen con NOT EXISTS (usa idx_creditos_factura)
+    # en vez de traer la lista completa de IDs y armar un NOT IN gigante.
+    # Base y costo de cada factura se suman en SQL sobre factura_items (sin parsear items_json).
     with get_conn_invoices() as con:
-        if ids_excluir:
-            placeholders = ','.join(['?'] * len(ids_excluir))
-            sql_condicion_excluir = f"AND id NOT IN ({placeholders})"
-            params = [mes_str] + ids_excluir
-        else:
-            sql_condicion_excluir = ""
-            params = [mes_str]
-            
-        sql_directas = f"""
-            SELECT * FROM facturas 
-            WHERE strftime('%Y-%m', fecha) = ? 
-            {sql_condicion_excluir}
+        sql_directas = """
+            SELECT f.id, f.fecha, f.metodo_pago, f.total,
+                   COALESCE(SUM(i.precio_lista_base * i.cantidad), 0) AS base_efectivo_total,
+                   COALESCE(SUM(i.costo_historico * i.cantidad), 0) AS costo_total_venta
+            FROM facturas f
+            LEFT JOIN factura_items i ON i.factura_id = f.id
+            WHERE f.fecha >= ? AND f.fecha < ?
+              AND NOT EXISTS (SELECT 1 FROM creditos cr WHERE cr.factura_id = f.id)
+            GROUP BY f.id
         """
+        params = (desde_iso, hasta_iso)
         facturas = con.execute(sql_directas, params).fetchall()
         
         for f in facturas:
             f_dict = dict(f)
-            try:
-                items = json.loads(f_dict['items_json'])
-            except:
-                items = []
-            
             total_venta = f_dict['total']
-            
-            # --- CÁLCULO DE BASES Y COSTOS ---
-            base_efectivo_total = 0.0
-            costo_total_venta = 0.0
-            
-            for item in items:
-                cant = int(item.get('cantidad', 1))
-                
-                # Base
-                p_base = item.get('precio_lista_base')
-                if p_base is None or float(p_base) == 0:
-                    p_base = item.get('EFECTIVO/TRANSF')
-                if p_base is None or float(p_base) == 0:
-                    p_base = item.get('precio_unitario', 0)
-                
-                # Costo
-                p_costo = float(item.get('costo_historico', item.get('COSTO', 0)))
-                
-                base_efectivo_total += float(p_base) * cant
-                costo_total_venta += p_costo * cant
+            base_efectivo_total = f_dict['base_efectivo_total']
+            costo_total_venta = f_dict['costo_total_venta']
             
             # Comisiones
             comis = calcular_comisiones(f_dict['metodo_pago'], base_efectivo_total, total_venta)
@@ -98,15 +76,17 @@ def obtener_reporte_mensual(mes: int, anio: int) -> dict:
         sql_cuotas = """
             SELECT c.*, cr.monto_financiado, cr.monto_base, cr.cantidad_cuotas,
                    cl.nombre, cr.id as credito_real_id,
-                   f.items_json 
+                   (SELECT COALESCE(SUM(i.costo_historico * i.cantidad), 0)
+                    FROM factura_items i WHERE i.factura_id = cr.factura_id) AS costo_total_credito
             FROM cuotas c
             JOIN creditos cr ON c.credito_id = cr.id
             JOIN clientes cl ON cr.cliente_id = cl.id
             JOIN facturas f ON cr.factura_id = f.id
-            WHERE c.estado = 'PAGADO' AND strftime('%Y-%m', c.fecha_pago) = ?
+            WHERE c.estado = 'PAGADO' AND c.fecha_pago >= ? AND c.fecha_pago < ?
         """
-        # Ahora pasamos mes_str SOLO UNA VEZ porque hay un solo placeholder (?)
-        cuotas = con.execute(sql_cuotas, (mes_str,)).fetchall()
+        # El JOIN con facturas deja afuera las cuotas de facturas borradas (como siempre)
+        # Rango sobre (estado, fecha_pago): usa idx_cuotas_estado_pago
+        cuotas = con.execute(sql_cuotas, (desde_iso, hasta_iso)).fetchall()
         
         for c in cuotas:
             monto_cuota = c['monto']
@@ -120,17 +100,8 @@ def obtener_reporte_mensual(mes: int, anio: int) -> dict:
             parte_capital = monto_cuota * ratio_base
             parte_interes = monto_cuota - parte_capital
             
-            # Prorrateo de Costos
-            try:
-                items_origen = json.loads(c['items_json'])
-            except:
-                items_origen = []
-            
-            costo_total_credito = 0.0
-            for item in items_origen:
-                p_costo = float(item.get('costo_historico', item.get('COSTO', 0)))
-                cant = int(item.get('cantidad', 1))
-                costo_total_credito += p_costo * cant
+            # Prorrateo de Costos (costo total de la factura, sumado en SQL)
+            costo_total_credito = c['costo_total_credito']
             
             cant_cuotas_total = c['cantidad_cuotas'] if c['cantidad_cuotas'] > 0 else 1
             costo_prorrateado_cuota = costo_total_credito / cant_cuotas_total
@@ -172,6 +143,24 @@ def obtener_reporte_mensual(mes: int, anio: int) -> dict:
             
     return reporte
 
+def obtener_unidades_por_producto(desde: Fecha, hasta: Fecha) -> list:
+    """
+    Unidades e importe vendidos por producto en desde <= fecha < hasta, agregados
+    en SQL sobre factura_items: [{"codigo", "modelo", "unidades", "importe"}, ...]
+    """
+    with get_conn_invoices() as con:
+        rows = con.execute("""
+            SELECT i.codigo, MAX(i.modelo) AS modelo,
+                   SUM(i.cantidad) AS unidades,
+                   SUM(i.cantidad * i.precio_unitario) AS importe
+            FROM factura_items i
+            JOIN facturas f ON f.id = i.factura_id
+            WHERE f.fecha >= ? AND f.fecha < ?
+            GROUP BY i.codigo
+            ORDER BY unidades DESC
+        """, (a_iso(desde), a_iso(hasta))).fetchall()
+    return [dict(r) for r in rows]
+
 def _sumar_totales(reporte, comis, bruto):
     reporte["totales"]["empresa"] += comis["empresa"]
     reporte["totales"]["gerente"] += comis["gerente"]
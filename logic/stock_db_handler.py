@@ -1,10 +1,12 @@
 # logic/stock_db_handler.py
 
 import sqlite3
+from logic.db_manager import get_connection, transaccion
+from logic.db_schema import init_stock
 import datetime
 import sys
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 
 # --- INICIO DE LA BRÚJULA UNIVERSAL (Heredada de tu arquitectura) ---
 def get_base_path():
@@ -20,31 +22,12 @@ DB_PATH = BASE_DIR / "data" / "inventario.db"
 # -------------------------------------------------------------------
 
 def _get_connection() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
-    return con
+    # Conexión persistente (una por hilo, en WAL): ver logic/db_manager.py
+    return get_connection(DB_PATH)
 
 def init_db():
-    schema_stock = """
-    CREATE TABLE IF NOT EXISTS stock_actual (
-        codigo TEXT PRIMARY KEY,
-        cantidad INTEGER NOT NULL
-    )
-    """
-    schema_movimientos = """
-    CREATE TABLE IF NOT EXISTS movimientos_stock (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        fecha TEXT NOT NULL,
-        codigo TEXT NOT NULL,
-        cantidad_alterada INTEGER NOT NULL,
-        tipo_movimiento TEXT NOT NULL, 
-        detalle TEXT
-    )
-    """
-    with _get_connection() as con:
-        con.execute(schema_stock)
-        con.execute(schema_movimientos)
+    # Tablas + migraciones: ver logic/db_schema.py
+    init_stock(DB_PATH)
 
 def obtener_stock_todos() -> Dict[str, int]:
     """
@@ -68,36 +51,59 @@ def registrar_movimiento_stock(codigo: str, cantidad_alterada: int, tipo_movimie
     Ajusta el stock_actual automáticamente y deja un registro en el historial.
     - cantidad_alterada: Positiva para ingresos, Negativa para ventas/salidas.
     - tipo_movimiento: Ej. 'INGRESO', 'VENTA', 'AJUSTE'.
+    Para varios artículos juntos usar registrar_movimientos_stock_lote().
+    """
+    registrar_movimientos_stock_lote([(codigo, cantidad_alterada, tipo_movimiento, detalle)])
+
+def _aplicar_movimientos(con: sqlite3.Connection, movimientos: List[Tuple[str, int, str, str]], esquema: str = "main"):
+    """
+    Aplica los movimientos sobre una conexión YA dentro de una transacción (no hace commit).
+    El upsert suma sobre el valor guardado (cantidad = cantidad + ?), así no hay
+    lectura previa ni carrera entre el SELECT y el UPDATE.
+    - esquema: 'main', o el alias con que se ATTACH-eó inventario.db (ver checkout_service).
     """
     fecha_iso = datetime.datetime.now().replace(microsecond=0).isoformat()
     
-    with _get_connection() as con:
-        # 1. Obtenemos el stock actual (0 si no existe el registro)
-        row = con.execute("SELECT cantidad FROM stock_actual WHERE codigo = ?", (codigo,)).fetchone()
-        stock_previo = row['cantidad'] if row else 0
-        
-        # 2. Calculamos el nuevo stock
-        nuevo_stock = stock_previo + cantidad_alterada
-        
-        # 3. Actualizamos la tabla de stock actual (Upsert)
-        con.execute(
-            """
-            INSERT INTO stock_actual (codigo, cantidad) 
-            VALUES (?, ?)
-            ON CONFLICT(codigo) DO UPDATE SET cantidad = ?
-            """, 
-            (codigo, nuevo_stock, nuevo_stock)
-        )
-        
-        # 4. Guardamos el historial del movimiento
-        con.execute(
-            """
-            INSERT INTO movimientos_stock (fecha, codigo, cantidad_alterada, tipo_movimiento, detalle)
-            VALUES (?, ?, ?, ?, ?)
-            """,
-            (fecha_iso, codigo, cantidad_alterada, tipo_movimiento, detalle)
-        )
-        con.commit()
+    con.executemany(
+        f"""
+        INSERT INTO {esquema}.stock_actual (codigo, cantidad) 
+        VALUES (?, ?)
+        ON CONFLICT(codigo) DO UPDATE SET cantidad = cantidad + excluded.cantidad
+        """, 
+        [(codigo, cantidad) for codigo, cantidad, _tipo, _detalle in movimientos]
+    )
+    con.executemany(
+        f"""
+        INSERT INTO {esquema}.movimientos_stock (fecha, codigo, cantidad_alterada, tipo_movimiento, detalle)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [(fecha_iso, codigo, cantidad, tipo, detalle) for codigo, cantidad, tipo, detalle in movimientos]
+    )
+
+def _stock_de_codigos(con: sqlite3.Connection, codigos: List[str], esquema: str = "main") -> Dict[str, int]:
+    resultado = {}
+    # De a bloques para no pasar el límite de parámetros de SQLite
+    for i in range(0, len(codigos), 500):
+        bloque = codigos[i:i + 500]
+        marcas = ",".join("?" * len(bloque))
+        for row in con.execute(f"SELECT codigo, cantidad FROM {esquema}.stock_actual WHERE codigo IN ({marcas})", bloque):
+            resultado[row['codigo']] = row['cantidad']
+    return resultado
+
+def registrar_movimientos_stock_lote(movimientos: List[Tuple[str, int, str, str]]) -> Dict[str, int]:
+    """
+    Registra muchos movimientos en UNA sola transacción (un solo commit/fsync).
+    - movimientos: [(codigo, cantidad_alterada, tipo_movimiento, detalle), ...]
+      (un mismo código puede repetirse: se suman en orden).
+    Retorna el stock resultante por código: {'1000': 7, ...}
+    """
+    movimientos = [(str(c), int(q), t, d or "") for c, q, t, d in movimientos]
+    if not movimientos:
+        return {}
+
+    with transaccion(DB_PATH) as con:
+        _aplicar_movimientos(con, movimientos)
+        return _stock_de_codigos(con, list(dict.fromkeys(c for c, _q, _t, _d in movimientos)))
 
 # Inicializamos las tablas al cargar el módulo
 init_db()
\ No newline at end of file
@@ -0,0 +1,95 @@
+# logic/stock_repository.py
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QObject, Signal
+
+from logic.stock_db_handler import obtener_stock_todos, registrar_movimientos_stock_lote
+
+
+class StockRepository(QObject):
+    """
+    Stock actual en memoria (tabla stock_actual completa, cargada UNA vez).
+
+    - Las escrituras pasan por acá (write-through): primero la base, después
+      la caché, y se avisa con stock_cambiado(set_de_codigos).
+    - Las lecturas devuelven un snapshot inmutable: cada escritura arma un dict
+      nuevo, así los hilos de búsqueda pueden leer sin lock ni copias.
+    """
+    # set[str] con los códigos cuyo stock cambió
+    stock_cambiado = Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._stock: Optional[Dict[str, int]] = None
+
+    def obtener_todos(self) -> Dict[str, int]:
+        """{'1000': 5, ...}. Snapshot de sólo lectura: NO modificarlo."""
+        stock = self._stock
+        if stock is None:
+            with self._lock:
+                if self._stock is None:
+                    self._stock = obtener_stock_todos()
+                stock = self._stock
+        return stock
+
+    def obtener(self, codigo: str) -> int:
+        return self.obtener_todos().get(str(codigo), 0)
+
+    def registrar_movimientos(self, movimientos: List[Tuple[str, int, str, str]]) -> Dict[str, int]:
+        """Igual que registrar_movimientos_stock_lote() pero mantiene la caché y avisa."""
+        # Con la caché fría la cargamos ANTES de escribir, para comparar contra el stock previo
+        self.obtener_todos()
+        resultado = registrar_movimientos_stock_lote(movimientos)
+        self.aplicar_cambios(resultado)
+        return resultado
+
+    def aplicar_cambios(self, stock_resultante: Dict[str, int]):
+        """
+        Incorpora stock ya escrito en la base por otro camino (ej: el checkout
+        atómico) y emite stock_cambiado con los códigos que realmente cambiaron.
+        """
+        if not stock_resultante:
+            return
+        with self._lock:
+            if self._stock is None:
+                # Caché fría: la base ya tiene la escritura, así que no hay contra qué
+                # comparar. Avisamos por todos los códigos del lote.
+                actual = obtener_stock_todos()
+                cambiados = set(stock_resultante)
+            else:
+                actual = self._stock
+                cambiados = {c for c, q in stock_resultante.items() if actual.get(c) != q}
+            self._stock = {**actual, **stock_resultante}
+        if cambiados:
+            self.stock_cambiado.emit(cambiados)
+
+    def recargar(self) -> set:
+        """Vuelve a leer la tabla completa (p.ej. si otra instancia tocó la base)."""
+        nuevo = obtener_stock_todos()
+        with self._lock:
+            anterior = self._stock or {}
+            self._stock = nuevo
+        cambiados = {c for c in set(anterior) | set(nuevo) if anterior.get(c) != nuevo.get(c)}
+        if cambiados:
+            self.stock_cambiado.emit(cambiados)
+        return cambiados
+
+
+_repositorio: Optional[StockRepository] = None
+_repositorio_lock = threading.Lock()
+
+
+def get_stock_repository() -> StockRepository:
+    """
+    Instancia única del repositorio. La primera llamada debe ser desde el hilo de
+    la UI (MainWindow la crea al arrancar) para que las señales se entreguen ahí.
+    """
+    global _repositorio
+    if _repositorio is None:
+        with _repositorio_lock:
+            if _repositorio is None:
+                _repositorio = StockRepository()
+    return _repositorio
@@ -1,6 +1,10 @@
 import pandas as pd
-from typing import Dict
-from logic.stock_db_handler import obtener_stock_todos, registrar_movimiento_stock
+from typing import Dict, Iterable
+from logic.stock_repository import get_stock_repository
+from logic.codigos import COL_CODIGO_NORM, columna_codigo, codigos_de_df
+
+def _tiene_codigo(df: pd.DataFrame) -> bool:
+    return COL_CODIGO_NORM in df.columns or columna_codigo(df) is not None
 
 def inyectar_stock_a_df(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -13,50 +17,43 @@ def inyectar_stock_a_df(df: pd.DataFrame) -> pd.DataFrame:
     # 1. Hacemos una copia profunda para no alterar el caché del Sheets
     df_con_stock = df.copy()
 
-    # 2. Obtenemos el diccionario completo de stock desde SQLite
+    # 2. Obtenemos el diccionario completo de stock (en memoria, ver StockRepository)
     # Formato: {'1000': 5, '2005': 0, 'S/C': 10}
-    dict_stock_actual = obtener_stock_todos()
+    dict_stock_actual = get_stock_repository().obtener_todos()
 
-    # 3. Limpiamos la columna de códigos del DF para garantizar el match
-    # Aseguramos que CÓDIGO (o CODIGO, o MODELO como fallback) exista.
-    if 'CÓDIGO' in df_con_stock.columns:
-        col_codigo = 'CÓDIGO'
-    elif 'CODIGO' in df_con_stock.columns:
-        col_codigo = 'CODIGO'
-    elif 'MODELO' in df_con_stock.columns:
-        col_codigo = 'MODELO'
-    else:
+    # 3. Códigos canónicos: la columna CODIGO_NORM ya viene calculada con la hoja
+    # (catalogo_service); si no está, se normaliza al vuelo (vectorizado).
+    if not _tiene_codigo(df_con_stock):
         # Si no hay identificador, devolvemos sin stock
         df_con_stock['STOCK_ACTUAL'] = 'N/A'
         return df_con_stock
 
-    # Convertimos la columna a string puro (limpiando '.0' si pandas lo hizo float)
-    def clean_codigo(val):
-        if pd.isna(val) or str(val).strip() in ['', '-']: return "S/C"
-        try:
-            if isinstance(val, (float, int)): return str(int(float(val))).strip()
-            return str(val).strip()
-        except:
-            return str(val).strip()
-
-    # Creamos una columna temporal para mapear de forma segura
-    df_con_stock['_temp_codigo_limpio'] = df_con_stock[col_codigo].apply(clean_codigo)
-
     # 4. Mapeo Rápido (Pandas Map)
     # Si el código no existe en dict_stock_actual, fillna le asigna 0 por defecto.
-    df_con_stock['STOCK_ACTUAL'] = df_con_stock['_temp_codigo_limpio'].map(dict_stock_actual).fillna(0).astype(int)
-
-    # Limpiamos la columna temporal
-    df_con_stock.drop(columns=['_temp_codigo_limpio'], inplace=True)
+    df_con_stock['STOCK_ACTUAL'] = codigos_de_df(df_con_stock).map(dict_stock_actual).fillna(0).astype(int)
 
     return df_con_stock
 
-def procesar_descuento_por_venta(items_vendidos: list, id_factura: int):
+def actualizar_stock_en_df(df: pd.DataFrame, stock: Dict[str, int], codigos: Iterable[str]) -> pd.Series:
     """
-    Recibe la lista de ítems de una venta y descuenta el stock.
-    - items_vendidos: Lista de diccionarios (el mismo JSON que va a facturas)
-    - id_factura: Para dejar registro en el historial.
+    Pisa STOCK_ACTUAL (in place) sólo en las filas de los códigos indicados.
+    Devuelve la máscara booleana de filas afectadas (para refrescar sólo esas).
     """
+    if df.empty or not _tiene_codigo(df) or 'STOCK_ACTUAL' not in df.columns:
+        return pd.Series(False, index=df.index)
+
+    codigos_limpios = codigos_de_df(df)
+    mask = codigos_limpios.isin(set(codigos))
+    if mask.any():
+        df.loc[mask, 'STOCK_ACTUAL'] = codigos_limpios[mask].map(stock).fillna(0).astype(int)
+    return mask
+
+def movimientos_de_venta(items_vendidos: list, id_factura: int) -> list:
+    """
+    Arma los movimientos (codigo, -cantidad, 'VENTA', detalle) de una venta.
+    Los ítems sin código ('S/C') no se descuentan.
+    """
+    movimientos = []
     for item in items_vendidos:
         # Obtenemos el código y cantidad (garantizando fallback)
         codigo = str(item.get("codigo", item.get("CÓDIGO", "S/C"))).strip()
@@ -70,4 +67,14 @@ def procesar_descuento_por_venta(items_vendidos: list, id_factura: int):
 
         # Al registrar una venta, la alteración es NEGATIVA
         detalle = f"Venta - Factura #{id_factura} ({modelo_nombre})"
-        registrar_movimiento_stock(codigo, -cantidad_vendida, "VENTA", detalle)
\ No newline at end of file
+        movimientos.append((codigo, -cantidad_vendida, "VENTA", detalle))
+    return movimientos
+
+def procesar_descuento_por_venta(items_vendidos: list, id_factura: int) -> Dict[str, int]:
+    """
+    Recibe la lista de ítems de una venta y descuenta el stock (una sola transacción).
+    - items_vendidos: Lista de diccionarios (el mismo JSON que va a facturas)
+    - id_factura: Para dejar registro en el historial.
+    Retorna el stock resultante de cada código afectado.
+    """
+    return get_stock_repository().registrar_movimientos(movimientos_de_venta(items_vendidos, id_factura))
\ No newline at end of file
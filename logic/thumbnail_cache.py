@@ -0,0 +1,198 @@
+# logic/thumbnail_cache.py
+
+import os
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from PIL import Image
+
+from logic.constants import MINIATURAS_CONFIG
+from logic.data_loader import get_data_dir
+
+# Miniaturas en disco, una por (imagen original + mtime + lado). Si la foto se
+# reemplaza cambia el mtime y por lo tanto la clave: nunca se sirve una vieja.
+_EXT_OPACA = ".jpg"
+_EXT_ALFA = ".png"
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pendientes: Dict[str, Future] = {}
+_pendientes_lock = threading.Lock()
+
+# Miniaturas que ya se sabe que están en disco: {(clave_origen, lado): ruta}.
+# La llenan los workers (al generarlas o al encontrarlas), así el hilo de la UI
+# consulta sólo memoria.
+_generadas: Dict[Tuple[str, int], Path] = {}
+_generadas_lock = threading.Lock()
+
+_thumbs_dir: Optional[str] = None
+
+
+def get_thumbs_dir() -> str:
+    """Carpeta data/cache/thumbs/ donde se guardan las miniaturas generadas (se crea una vez)."""
+    global _thumbs_dir
+    if _thumbs_dir is None:
+        thumbs_dir = os.path.join(get_data_dir(), "cache", "thumbs")
+        os.makedirs(thumbs_dir, exist_ok=True)
+        _thumbs_dir = thumbs_dir
+    return _thumbs_dir
+
+
+def lados_por_defecto():
+    return (MINIATURAS_CONFIG["lado_preview"], MINIATURAS_CONFIG["lado_tooltip"])
+
+
+@lru_cache(maxsize=4096)
+def _hash_origen(ruta_abs: str, mtime_ns: int, tamanio: int) -> str:
+    return hashlib.sha1(f"{ruta_abs}|{mtime_ns}|{tamanio}".encode("utf-8")).hexdigest()
+
+
+def _clave_origen(ruta: Path, permitir_stat: bool = True) -> Optional[str]:
+    """
+    Clave de la imagen original. Si la ruta viene del índice de imágenes se usa
+    su firma (mtime, tamaño) ya en memoria; si no, hace falta un stat (sólo
+    cuando permitir_stat, es decir, fuera del hilo de la UI).
+    """
+    from logic.image_service import indice_imagenes
+
+    firma = indice_imagenes.firma(ruta)
+    if firma is None:
+        if not permitir_stat:
+            return None
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            return None
+        firma = (st.st_mtime_ns, st.st_size)
+    return _hash_origen(os.path.abspath(ruta), *firma)
+
+
+def _rutas_candidatas(clave: str, lado: int):
+    nombre = os.path.join(get_thumbs_dir(), f"{clave}_{lado}")
+    return nombre + _EXT_OPACA, nombre + _EXT_ALFA
+
+
+def _buscar_en_disco(clave: str, lado: int) -> Optional[Path]:
+    for candidata in _rutas_candidatas(clave, lado):
+        if os.path.exists(candidata):
+            ruta = Path(candidata)
+            with _generadas_lock:
+                _generadas[(clave, lado)] = ruta
+            return ruta
+    return None
+
+
+def obtener_miniatura(ruta_imagen, lado: int, verificar_disco: bool = False) -> Optional[Path]:
+    """
+    Ruta de la miniatura ya generada (lado = máximo ancho/alto), o None si todavía
+    no se sabe de ella. Por defecto sólo mira memoria (apto para data() del modelo);
+    con verificar_disco=True también la busca en data/cache/thumbs (p.ej. al abrir el visor).
+    """
+    if ruta_imagen is None:
+        return None
+    clave = _clave_origen(ruta_imagen, permitir_stat=verificar_disco)
+    if clave is None:
+        return None
+    with _generadas_lock:
+        ruta = _generadas.get((clave, lado))
+    if ruta is None and verificar_disco:
+        ruta = _buscar_en_disco(clave, lado)
+    return ruta
+
+
+def generar_miniaturas(ruta_imagen, lados: Iterable[int] = None) -> Dict[int, Path]:
+    """
+    Decodifica la imagen original UNA vez y guarda todas las miniaturas pedidas
+    (de la más grande a la más chica). Devuelve {lado: ruta}. Bloqueante.
+    """
+    lados = sorted(set(lados or lados_por_defecto()), reverse=True)
+    clave = _clave_origen(ruta_imagen)
+    if clave is None:
+        return {}
+
+    resultado = {}
+    faltantes = []
+    for lado in lados:
+        existente = _buscar_en_disco(clave, lado)
+        if existente is not None:
+            resultado[lado] = existente
+        else:
+            faltantes.append(lado)
+    if not faltantes:
+        return resultado
+
+    try:
+        with Image.open(ruta_imagen) as img:
+            # En JPEG, draft() decodifica directamente a una escala reducida (mucho más rápido)
+            img.draft("RGB", (faltantes[0], faltantes[0]))
+            con_alfa = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            img = img.convert("RGBA" if con_alfa else "RGB")
+
+            for lado in faltantes:
+                img.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+                destino = _rutas_candidatas(clave, lado)[1 if con_alfa else 0]
+                temporal = destino + ".tmp"
+                if con_alfa:
+                    img.save(temporal, format="PNG", optimize=False)
+                else:
+                    img.save(temporal, format="JPEG", quality=88)
+                os.replace(temporal, destino)
+                resultado[lado] = Path(destino)
+                with _generadas_lock:
+                    _generadas[(clave, lado)] = resultado[lado]
+    except Exception as e:
+        print(f"[WARNING] No se pudo generar la miniatura de {ruta_imagen}: {e}")
+    return resultado
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MINIATURAS_CONFIG["workers"],
+                                           thread_name_prefix="miniaturas")
+        return _executor
+
+
+def solicitar_miniaturas(ruta_imagen, lados: Iterable[int] = None) -> Optional[Future]:
+    """
+    Encola la generación en segundo plano (sin duplicar trabajos ya encolados).
+    No toca el disco: si ya están en disco lo descubre el worker.
+    Devuelve el Future, o None si no hay nada que hacer.
+    """
+    if ruta_imagen is None:
+        return None
+    lados = tuple(sorted(set(lados or lados_por_defecto()), reverse=True))
+    if all(obtener_miniatura(ruta_imagen, lado) is not None for lado in lados):
+        return None
+
+    clave = f"{ruta_imagen}|{lados}"
+    with _pendientes_lock:
+        futuro = _pendientes.get(clave)
+        if futuro is not None and not futuro.done():
+            return futuro
+        futuro = _get_executor().submit(generar_miniaturas, ruta_imagen, lados)
+        _pendientes[clave] = futuro
+
+    def _liberar(_f, clave=clave):
+        with _pendientes_lock:
+            if _pendientes.get(clave) is _f:
+                del _pendientes[clave]
+    futuro.add_done_callback(_liberar)
+    return futuro
+
+
+def limpiar_miniaturas():
+    """Borra todas las miniaturas (se regeneran a demanda)."""
+    carpeta = get_thumbs_dir()
+    with _generadas_lock:
+        _generadas.clear()
+    for nombre in os.listdir(carpeta):
+        try:
+            os.remove(os.path.join(carpeta, nombre))
+        except OSError:
+            pass
@@ -1,8 +1,12 @@
 import sys
 import traceback
-from PySide6.QtWidgets import QApplication, QMessageBox
+import multiprocessing
+from PySide6.QtWidgets import QApplication, QMessageBox, QSplashScreen
+from PySide6.QtGui import QPixmap, QColor
+from PySide6.QtCore import Qt
 from ui.main_window import MainWindow
-from logic.data_loader import descargar_archivo, cargar_hojas
+from ui.workers import CatalogSyncWorker
+from logic.data_loader import cargar_hojas, existe_archivo_local
 from logic.constants import messages
 from logic.cart_service import CartService
 
@@ -17,6 +21,20 @@ def show_critical_error(title: str, message: str):
     QMessageBox.critical(None, title, message)
     print(f"[CRITICAL] {message}")
 
+def _crear_splash() -> QSplashScreen:
+    """Splash simple (sin recursos externos) para el primer arranque sin copia local."""
+    pixmap = QPixmap(480, 160)
+    pixmap.fill(QColor("#2c3e50"))
+    splash = QSplashScreen(pixmap)
+    splash.showMessage(messages["logs"]["splash_descargando"], Qt.AlignCenter, QColor("white"))
+    return splash
+
+def _texto_progreso(recibido: int, total: int) -> str:
+    base = messages["logs"]["splash_descargando"]
+    if total > 0:
+        return f"{base} {int(recibido * 100 / total)}%"
+    return f"{base} {recibido // 1024} KB"
+
 def main():
     print(f"[INFO] {messages['logs']['inicio_aplicacion']}")
     
@@ -24,31 +42,66 @@ def main():
     app = QApplication(sys.argv)
 
     try:
-        # 1. Fase de Sincronización (Red)
-        # TODO: Mover esto a un QThread + Splash Screen para no congelar la UI
-        ok_descarga, usando_local = descargar_archivo()
-
-        if not ok_descarga:
-            error_msg = messages["errors"].get("fallo_descarga", "Error desconocido en descarga.")
-            QMessageBox.critical(None, "Error de Inicialización", error_msg)
-            print(f"[ERROR] {error_msg}")
-            sys.exit(1)
-
-        if usando_local:
-            warn_msg = messages["logs"].get("usando_local", "Usando archivo local.")
-            # Sugerencia: Considerar quitar este popup bloqueante en el futuro y usar una barra de estado.
-            QMessageBox.warning(None, "Aviso de Conexión", warn_msg)
-            print(f"[WARNING] {warn_msg}")
-
-        # 2. Fase de Carga de Datos (I/O)
-        sheets = cargar_hojas()
         cart_service = CartService()
+        worker = CatalogSyncWorker()
+        estado = {"window": None}  # Mantiene viva la referencia a la ventana
+
+        # 1. Fase de Carga Local (I/O): si ya tenemos catálogo, arrancamos con él
+        sheets = None
+        if existe_archivo_local():
+            try:
+                sheets = cargar_hojas()
+            except Exception as e:
+                print(f"[WARNING] No se pudo leer la copia local, se esperará la descarga: {e}")
+
+        if sheets is not None:
+            # 2a. Lanzamiento inmediato + sincronización en segundo plano
+            window = MainWindow(sheets, cart_service)
+            window.conectar_sincronizacion(worker)
+            window.show()
+            estado["window"] = window
+        else:
+            # 2b. Primer arranque: no hay nada local, mostramos splash mientras descarga
+            splash = _crear_splash()
+            splash.show()
+
+            def _on_progreso(recibido: int, total: int):
+                splash.showMessage(_texto_progreso(recibido, total), Qt.AlignCenter, QColor("white"))
+
+            def _on_primera_carga(hojas, _estado: str):
+                if hojas is None:
+                    try:
+                        hojas = cargar_hojas()
+                    except Exception as e:
+                        # Un slot de Qt no propaga la excepción al try del arranque
+                        print(f"[ERROR] No se pudo leer el catálogo local: {e}")
+                        _on_fallo(str(e))
+                        return
+                window = MainWindow(hojas, cart_service)
+                window.show()
+                splash.finish(window)
+                estado["window"] = window
+
+            def _on_fallo(_motivo: str):
+                splash.close()
+                error_msg = messages["errors"].get("descarga", "Error desconocido en descarga.")
+                QMessageBox.critical(None, "Error de Inicialización", error_msg)
+                print(f"[ERROR] {error_msg}")
+                app.exit(1)
+
+            worker.progreso.connect(_on_progreso)
+            worker.finalizado.connect(_on_primera_carga)
+            worker.fallo.connect(_on_fallo)
+
+        # 3. Fase de Sincronización (Red) fuera del hilo de la UI
+        worker.start()
 
-        # 3. Inyección y Lanzamiento
-        window = MainWindow(sheets,cart_service)
-        window.show()
-        
-        sys.exit(app.exec())
+        codigo_salida = app.exec()
+        # Cortamos la descarga (si sigue) y esperamos a que el hilo termine:
+        # destruir un QThread en ejecución aborta el proceso.
+        worker.requestInterruption()
+        worker.wait()
+        sys.exit(codigo_salida)
 
     except Exception as e:
         # Captura cualquier error no controlado durante el arranque
@@ -58,4 +111,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Necesario en el .exe (PyInstaller) para los procesos del lote de flyers
+    multiprocessing.freeze_support()
+    main()
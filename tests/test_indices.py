@@ -0,0 +1,59 @@
+# tests/test_indices.py
+"""
+Las consultas calientes (logic.db_migrations.CONSULTAS_CALIENTES) tienen que
+usar su índice. El esquema se arma con las migraciones reales sobre bases
+temporales: no se toca data/.
+"""
+import pytest
+
+from logic.db_manager import cerrar_conexiones, get_connection
+from logic.db_migrations import CONSULTAS_CALIENTES, plan_de_consulta, usa_indice, version_actual
+from logic.db_schema import (
+    MIGRACIONES_CREDITOS, MIGRACIONES_FACTURAS, MIGRACIONES_STOCK,
+    init_creditos, init_facturas, init_stock,
+)
+
+
+@pytest.fixture
+def bases(tmp_path):
+    rutas = {"ventas": tmp_path / "ventas.db", "inventario": tmp_path / "inventario.db"}
+    init_facturas(rutas["ventas"])
+    init_creditos(rutas["ventas"])
+    init_stock(rutas["inventario"])
+    yield rutas
+    cerrar_conexiones()
+
+
+@pytest.mark.parametrize("base, sql, params, indice", CONSULTAS_CALIENTES,
+                         ids=[c[3] for c in CONSULTAS_CALIENTES])
+def test_consulta_caliente_usa_indice(bases, base, sql, params, indice):
+    con = get_connection(bases[base])
+    assert usa_indice(con, sql, params, indice), plan_de_consulta(con, sql, params)
+
+
+def test_migraciones_quedan_en_la_ultima_version_y_no_se_repiten(bases):
+    # Volver a inicializar (como en cada arranque) no debe correr nada de nuevo
+    init_facturas(bases["ventas"])
+    init_creditos(bases["ventas"])
+    init_stock(bases["inventario"])
+
+    con_ventas = get_connection(bases["ventas"])
+    con_inventario = get_connection(bases["inventario"])
+    assert version_actual(con_ventas, "facturas") == MIGRACIONES_FACTURAS[-1][0]
+    assert version_actual(con_ventas, "creditos") == MIGRACIONES_CREDITOS[-1][0]
+    assert version_actual(con_inventario, "stock") == MIGRACIONES_STOCK[-1][0]
+
+
+@pytest.mark.parametrize("where, params", [
+    ("", ()),
+    ("WHERE (fecha, id) < (?, ?)", ("2026-10-18T12:00:00", 500)),
+    ("WHERE fecha >= ? AND fecha < ?", ("2026-10-01", "2026-11-01")),
+    ("WHERE fecha >= ? AND fecha < ? AND (fecha, id) < (?, ?)",
+     ("2026-10-01", "2026-11-01", "2026-10-18T12:00:00", 500)),
+], ids=["todo", "siguiente", "rango", "rango_siguiente"])
+def test_historial_paginado_ordena_por_el_indice(bases, where, params):
+    # Mismo SQL que facturas_db_handler.obtener_pagina_historial
+    sql = f"SELECT * FROM facturas {where} ORDER BY fecha DESC, id DESC LIMIT ?"
+    plan = plan_de_consulta(get_connection(bases["ventas"]), sql, (*params, 200))
+    assert any("idx_facturas_fecha_id" in detalle for detalle in plan), plan
+    assert not any("TEMP B-TREE" in detalle for detalle in plan), plan
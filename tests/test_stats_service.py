@@ -0,0 +1,135 @@
+# tests/test_stats_service.py
+"""
+El reporte de comisiones agregado en SQL (factura_items) tiene que dar lo mismo
+que la versión anterior, que parseaba items_json y unía cuotas con facturas.
+Base temporal: no se toca data/.
+"""
+import json
+
+import pytest
+
+from logic import credits_service, facturas_db_handler
+from logic.db_manager import cerrar_conexiones, get_connection
+from logic.db_schema import init_creditos, init_facturas
+from logic.financiero import calcular_comisiones
+from logic.stats_service import obtener_reporte_rango
+
+DESDE, HASTA = "2026-10-01", "2026-11-01"
+
+
+def _factura(con, fecha, metodo, items, total):
+    factura_id = facturas_db_handler._insertar_factura(con, items, metodo, total)
+    con.execute("UPDATE facturas SET fecha = ? WHERE id = ?", (fecha, factura_id))
+    return factura_id
+
+
+def _credito(con, factura_id, cliente_id, financiado, base, pagos):
+    cur = con.execute(
+        "INSERT INTO creditos (factura_id, cliente_id, monto_financiado, monto_base, cantidad_cuotas, fecha_otorgamiento) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (factura_id, cliente_id, financiado, base, len(pagos), "2026-09-15")
+    )
+    for numero, fecha_pago in enumerate(pagos, start=1):
+        con.execute(
+            "INSERT INTO cuotas (credito_id, numero_cuota, fecha_vencimiento, monto, fecha_pago, estado) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (cur.lastrowid, numero, "2026-10-10", financiado / len(pagos), fecha_pago,
+             "PAGADO" if fecha_pago else "PENDIENTE")
+        )
+
+
+@pytest.fixture
+def ventas(tmp_path, monkeypatch):
+    ruta = tmp_path / "ventas.db"
+    init_facturas(ruta)
+    init_creditos(ruta)
+    monkeypatch.setattr(facturas_db_handler, "DB_PATH", ruta)
+    monkeypatch.setattr(credits_service, "DB_PATH", ruta)
+
+    item = {"CÓDIGO": "1000", "MODELO": "Piero", "cantidad": 2,
+            "precio_venta_final": 150.0, "COSTO": 60.0, "precio_lista_base": 120.0}
+    otro = {"CÓDIGO": "2000", "MODELO": "Sonno", "cantidad": 1,
+            "precio_venta_final": 80.0, "COSTO": 30.0, "EFECTIVO/TRANSF": 70.0}
+    con = get_connection(ruta)
+    _factura(con, "2026-10-05T10:00:00", "Efectivo", [item, otro], 380.0)
+    _factura(con, "2026-10-06T11:00:00", "Tarjeta de Crédito", [otro], 80.0)
+    _factura(con, "2026-09-30T18:00:00", "Efectivo", [item], 300.0)  # Fuera del rango
+    cliente = con.execute("INSERT INTO clientes (dni, nombre) VALUES ('1', 'Ana')").lastrowid
+
+    con_factura = _factura(con, "2026-09-20T09:00:00", "Crédito de la Casa", [item], 400.0)
+    _credito(con, con_factura, cliente, 400.0, 300.0, ["2026-10-12T10:00:00", "2026-10-20T10:00:00", None])
+
+    # Crédito cuya factura se borró: sus cuotas no cuentan
+    borrada = _factura(con, "2026-09-21T09:00:00", "Crédito de la Casa", [otro], 100.0)
+    _credito(con, borrada, cliente, 100.0, 80.0, ["2026-10-15T10:00:00"])
+    con.execute("DELETE FROM factura_items WHERE factura_id = ?", (borrada,))
+    con.execute("DELETE FROM facturas WHERE id = ?", (borrada,))
+    con.commit()
+
+    yield con
+    cerrar_conexiones()
+
+
+def _reporte_anterior(con, desde, hasta):
+    """Totales como los calculaba obtener_reporte_rango antes de factura_items."""
+    totales = {"empresa": 0.0, "gerente": 0.0, "vendedor": 0.0, "total_bruto": 0.0, "filas": 0}
+
+    def sumar(comis, bruto):
+        for clave in ("empresa", "gerente", "vendedor"):
+            totales[clave] += comis[clave]
+        totales["total_bruto"] += bruto
+        totales["filas"] += 1
+
+    facturas = con.execute("""
+        SELECT * FROM facturas f
+        WHERE f.fecha >= ? AND f.fecha < ?
+          AND NOT EXISTS (SELECT 1 FROM creditos cr WHERE cr.factura_id = f.id)
+    """, (desde, hasta)).fetchall()
+    for f in facturas:
+        base = costo = 0.0
+        for item in json.loads(f['items_json']):
+            cant = int(item.get('cantidad', 1))
+            p_base = item.get('precio_lista_base')
+            if p_base is None or float(p_base) == 0:
+                p_base = item.get('EFECTIVO/TRANSF')
+            if p_base is None or float(p_base) == 0:
+                p_base = item.get('precio_unitario', 0)
+            base += float(p_base) * cant
+            costo += float(item.get('costo_historico', item.get('COSTO', 0))) * cant
+        comis = calcular_comisiones(f['metodo_pago'], base, f['total'])
+        comis["empresa"] -= costo
+        sumar(comis, f['total'])
+
+    cuotas = con.execute("""
+        SELECT c.*, cr.monto_financiado, cr.monto_base, cr.cantidad_cuotas, f.items_json
+        FROM cuotas c
+        JOIN creditos cr ON c.credito_id = cr.id
+        JOIN clientes cl ON cr.cliente_id = cl.id
+        JOIN facturas f ON cr.factura_id = f.id
+        WHERE c.estado = 'PAGADO' AND c.fecha_pago >= ? AND c.fecha_pago < ?
+    """, (desde, hasta)).fetchall()
+    for c in cuotas:
+        base = c['monto_base'] or c['monto_financiado']
+        capital = c['monto'] * base / c['monto_financiado']
+        interes = c['monto'] - capital
+        costo = sum(float(i.get('costo_historico', i.get('COSTO', 0))) * int(i.get('cantidad', 1))
+                    for i in json.loads(c['items_json']))
+        gerente = capital * 0.04 + interes * 0.10
+        vendedor = capital * 0.03 + interes * 0.08
+        empresa = c['monto'] - (gerente + vendedor) - costo / max(c['cantidad_cuotas'], 1)
+        sumar({"empresa": empresa, "gerente": gerente, "vendedor": vendedor}, c['monto'])
+    return totales
+
+
+def test_reporte_rango_coincide_con_la_version_anterior(ventas):
+    esperado = _reporte_anterior(ventas, DESDE, HASTA)
+    reporte = obtener_reporte_rango(DESDE, HASTA)
+
+    assert len(reporte["ventas"]) == esperado["filas"] == 4
+    for clave in ("empresa", "gerente", "vendedor", "total_bruto"):
+        assert reporte["totales"][clave] == pytest.approx(esperado[clave])
+
+
+def test_cuotas_de_facturas_borradas_no_cuentan(ventas):
+    cuotas = [v for v in obtener_reporte_rango(DESDE, HASTA)["ventas"] if v["tipo_origen"] == "CREDITO"]
+    assert sorted(v["fecha"] for v in cuotas) == ["2026-10-12", "2026-10-20"]
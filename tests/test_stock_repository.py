@@ -0,0 +1,49 @@
+# tests/test_stock_repository.py
+"""
+StockRepository.stock_cambiado tiene que avisar también la primera escritura
+después de arrancar (caché todavía sin cargar). Base temporal: no se toca data/.
+"""
+import pytest
+
+from logic import stock_db_handler
+from logic.db_manager import cerrar_conexiones
+from logic.db_schema import init_stock
+from logic.stock_repository import StockRepository
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    ruta = tmp_path / "inventario.db"
+    init_stock(ruta)
+    monkeypatch.setattr(stock_db_handler, "DB_PATH", ruta)
+    yield StockRepository()
+    cerrar_conexiones()
+
+
+def _avisos(repo):
+    recibidos = []
+    repo.stock_cambiado.connect(recibidos.append)
+    return recibidos
+
+
+def test_registrar_movimientos_con_cache_fria_avisa(repo):
+    recibidos = _avisos(repo)
+    repo.registrar_movimientos([("1000", 5, "INGRESO", ""), ("2000", 3, "INGRESO", "")])
+    assert recibidos == [{"1000", "2000"}]
+    assert repo.obtener("1000") == 5
+
+
+def test_aplicar_cambios_con_cache_fria_avisa(repo):
+    # Escritura hecha por otro camino (ej: el checkout atómico) antes de tocar la caché
+    resultado = stock_db_handler.registrar_movimientos_stock_lote([("1000", 2, "INGRESO", "")])
+    recibidos = _avisos(repo)
+    repo.aplicar_cambios(resultado)
+    assert recibidos == [{"1000"}]
+    assert repo.obtener("1000") == 2
+
+
+def test_sin_cambio_real_no_avisa(repo):
+    repo.registrar_movimientos([("1000", 4, "INGRESO", "")])
+    recibidos = _avisos(repo)
+    repo.aplicar_cambios({"1000": 4})
+    assert recibidos == []
@@ -11,11 +11,9 @@ import os # Para abrir el PDF automáticamente
 # Imports Lógica
 from logic.constants import METODOS_PAGO, ESTILOS, TASA_INTERES_MENSUAL
 from logic.cart_service import CartService
-from logic.facturas_db_handler import registrar_venta
+from logic.checkout_service import confirmar_venta
 from logic.financiero import format_currency, calcular_plan_credito
-from logic.credits_service import registrar_plan_credito
 from logic.pdf_service import generar_documentacion_credito
-from logic.stock_service import procesar_descuento_por_venta
 
 # --- Diálogo para pedir Datos del Cliente ---
 class ClienteFormDialog(QDialog):
@@ -269,6 +267,10 @@ class CartWindow(QWidget):
             
             # --- Recolección de Datos ---
             if metodo == "Crédito de la Casa":
+                if not self.plan_credito_actual:
+                    QMessageBox.warning(self, "Plan de Cuotas", "Elegí un plan de cuotas válido antes de confirmar la venta a crédito.")
+                    if sender: sender.setEnabled(True)
+                    return
                 dlg = ClienteFormDialog(self)
                 if dlg.exec() == QDialog.Accepted:
                     cliente_data = dlg.datos
@@ -314,17 +316,15 @@ class CartWindow(QWidget):
                 return
 
             # --- Procesamiento ---
-            factura_id = registrar_venta(items_checkout, metodo, total_venta)
-
-            # ¡NUEVA LÓGICA DE STOCK! Descontamos lo vendido.
-            # Envolvemos en un try-except para que un fallo en stock no arruine la venta
-            try:
-                procesar_descuento_por_venta(items_checkout, factura_id)
-            except Exception as e:
-                print(f"❌ Error crítico descontando stock: {e}")
-
-            if metodo == "Crédito de la Casa":
-                registrar_plan_credito(factura_id, cliente_data, self.plan_credito_actual)
+            # Factura + descuento de stock + crédito en UNA transacción (todo o nada)
+            es_credito = metodo == "Crédito de la Casa"
+            confirmar_venta(
+                items_checkout, metodo, total_venta,
+                cliente_data=cliente_data if es_credito else None,
+                plan_credito=self.plan_credito_actual if es_credito else None
+            )
+
+            if es_credito:
                 path_contrato = generar_documentacion_credito(cliente_data, items_checkout, self.plan_credito_actual)
                 
                 QMessageBox.information(self, "Éxito", 
@@ -103,6 +103,21 @@ class CatalogoView(QWidget):
             self._add_view("busqueda", view)
         self.show_view("busqueda")
 
+    def actualizar_datos(self, nuevas_hojas: Dict[str, Any]):
+        """
+        Hot-swap del catálogo: mutamos el MISMO objeto de hojas (las vistas ya construidas
+        y el gestor de stock guardan una referencia a él) y refrescamos lo abierto.
+        """
+        if hasattr(self.data_context, 'reemplazar'):
+            self.data_context.reemplazar(nuevas_hojas)  # HojasCatalogo (perezoso)
+        else:
+            self.data_context.clear()
+            self.data_context.update(nuevas_hojas)
+
+        for vista in self.active_views.values():
+            if hasattr(vista, 'refrescar'):
+                vista.refrescar()
+
     def _add_view(self, name: str, widget: QWidget):
         self.active_views[name] = widget
         self.stack.addWidget(widget)
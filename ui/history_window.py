@@ -3,14 +3,14 @@ from PySide6.QtWidgets import (
     QPushButton, QLabel, QHeaderView, QAbstractItemView, QMessageBox,
     QDialog, QFormLayout, QDialogButtonBox
 )
-from PySide6.QtGui import QStandardItemModel, QStandardItem
 from PySide6.QtCore import Qt
 
 # Lógica
-from logic.facturas_db_handler import obtener_historial, buscar_por_fecha
+from logic.facturas_db_handler import totales_historial, obtener_factura_por_id
 from logic.financiero import format_currency
 from logic.credits_service import obtener_id_credito_por_factura
 from ui.widgets import MonthYearSelector
+from ui.tabla_historial import HistorialTableModel, COL_RESUMEN
 
 # Diálogos
 from ui.credits_window import CreditDetailDialog
@@ -128,7 +128,7 @@ class HistoryWindow(QMainWindow):
 
         # Filtros
         filter_layout = QHBoxLayout()
-        filter_layout.addWidget(QLabel("Filtrar por Mes:"))
+        filter_layout.addWidget(QLabel("Filtrar por Período:"))
         self.selector_fecha = MonthYearSelector()
         self.selector_fecha.dateChanged.connect(self.cargar_datos) 
         filter_layout.addWidget(self.selector_fecha)
@@ -144,12 +144,11 @@ class HistoryWindow(QMainWindow):
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         
-        self.model = QStandardItemModel()
-        # --- CAMBIO: Quitamos 'Ganancia' ---
-        self.model.setHorizontalHeaderLabels(["ID", "Fecha", "Método", "Total", "Items Resumen"])
+        # Modelo paginado: trae las facturas de a páginas a medida que se scrollea
+        self.model = HistorialTableModel(self)
         self.table.setModel(self.model)
         
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(COL_RESUMEN, QHeaderView.Stretch)
         self.table.setColumnWidth(0, 50)
         
         # Conectar Doble Click
@@ -172,55 +171,33 @@ class HistoryWindow(QMainWindow):
         layout.addWidget(self.lbl_total_mes)
         # -------------------------------------
 
-        self.datos_actuales = [] # Para guardar referencia de objetos completos
         self.cargar_datos()
 
-    def _llenar_tabla(self, facturas):
-        self.datos_actuales = facturas # Guardamos la lista cruda para usarla en el detalle
-        self.model.removeRows(0, self.model.rowCount())
-        
-        for f in facturas:
-            item_id = QStandardItem(str(f['id']))
-            item_fecha = QStandardItem(f['fecha'])
-            item_metodo = QStandardItem(f['metodo_pago'])
-            item_total = QStandardItem(format_currency(f['total']))
-            
-            # Resumen de items
-            items_str = ", ".join([f"{i.get('cantidad',1)}x {i.get('modelo','')}" for i in f.get('items', [])])
-            item_resumen = QStandardItem(items_str)
-            
-            self.model.appendRow([item_id, item_fecha, item_metodo, item_total, item_resumen])
-
     def cargar_datos(self):
-        mes, anio = self.selector_fecha.get_date()
-        fecha_filtro = f"{anio}-{mes:02d}"
-        
-        # 1. Obtener datos
-        facturas = buscar_por_fecha(fecha_filtro)
-        self.datos_actuales = facturas # Guardamos referencia
+        desde, hasta = self.selector_fecha.get_rango()
         
-        # 2. Llenar tabla
-        self._llenar_tabla(facturas)
+        # 1. Primera página del período (rango por índice de fecha, hasta exclusivo)
+        self.model.cargar(desde, hasta)
 
-        # 3. Calcular y mostrar Total del Mes
-        total_mes = sum(float(f.get('total', 0)) for f in facturas)
-        self.lbl_total_mes.setText(f"Total ({mes}/{anio}): {format_currency(total_mes)}")
+        # 2. Total del Período calculado en SQL (no depende de las páginas cargadas)
+        totales = totales_historial(desde, hasta)
+        self.lbl_total_mes.setText(f"Total ({self.selector_fecha.descripcion()}): {format_currency(totales['total'])}")
 
     def cargar_todos(self):
-        # 1. Obtener datos
-        facturas = obtener_historial()
-        self.datos_actuales = facturas # Guardamos referencia
-        
-        # 2. Llenar tabla
-        self._llenar_tabla(facturas)
+        # 1. Primera página del historial completo
+        self.model.cargar()
 
-        # 3. Calcular y mostrar Total Histórico
-        total_hist = sum(float(f.get('total', 0)) for f in facturas)
-        self.lbl_total_mes.setText(f"Total Histórico: {format_currency(total_hist)}")
+        # 2. Total Histórico calculado en SQL
+        totales = totales_historial()
+        self.lbl_total_mes.setText(f"Total Histórico: {format_currency(totales['total'])}")
 
     def abrir_detalle(self, index):
         row = index.row()
-        factura = self.datos_actuales[row] # Obtenemos el objeto completo
+        # Factura completa por ID (mismo camino y caché que Estadísticas y Créditos)
+        factura = obtener_factura_por_id(self.model.id_factura(row))
+        if factura is None:
+            QMessageBox.warning(self, "Error", "No se encontró la factura.")
+            return
         metodo = factura['metodo_pago']
         
         # --- CAMBIO: Lógica de Derivación ---
@@ -28,6 +28,16 @@ class MainWindow(QMainWindow):
         
         self.proveedores_service = ProveedoresService()
 
+        # Repositorio de stock en memoria: se crea acá (hilo de la UI) para que sus
+        # señales de "stock cambiado" se entreguen en el hilo de la UI.
+        from logic.stock_repository import get_stock_repository
+        get_stock_repository()
+
+        # El índice de data/imagenes/ se arma en segundo plano: la tabla del
+        # catálogo sólo lo lee de memoria (ver IndiceImagenes.buscar()).
+        from logic.image_service import indice_imagenes
+        indice_imagenes.revalidar_en_segundo_plano()
+
         # --- CONEXIÓN DE SEÑAL AUTOMÁTICA ---
         # Cada vez que el servicio diga "cambié", ejecutamos _on_cart_update
         self.cart_service.cart_updated.connect(self._on_cart_update)
@@ -69,6 +79,11 @@ class MainWindow(QMainWindow):
         action_prov.triggered.connect(self.abrir_proveedores)
         toolbar.addAction(action_prov)
 
+        # Acción: Flyers de una hoja completa (lote)
+        action_flyers = QAction("🖼️ Flyers por Hoja", self)
+        action_flyers.triggered.connect(self.generar_flyers_hoja)
+        toolbar.addAction(action_flyers)
+
         # --- Stack Central (Catálogo) ---
         self.stack = QStackedWidget()
         self.catalogo_view = CatalogoView(data_context,cart_service) # Le pasamos data
@@ -82,6 +97,52 @@ class MainWindow(QMainWindow):
         self.stack.addWidget(self.catalogo_view)
         self.setCentralWidget(self.stack)
 
+        # --- Barra de Estado (avisos no bloqueantes, ej: sincronización) ---
+        self.setStatusBar(QStatusBar())
+        self._sync_worker = None
+        self._flyer_worker = None
+
+    # --- SINCRONIZACIÓN DEL CATÁLOGO EN SEGUNDO PLANO ---
+
+    def conectar_sincronizacion(self, worker):
+        """
+        Engancha el CatalogSyncWorker a la barra de estado y al hot-swap del catálogo.
+        La ventana ya está usable con la copia local mientras el worker descarga.
+        """
+        from logic.constants import messages
+        self._sync_worker = worker  # Evita que el GC se lleve el hilo
+        self.statusBar().showMessage(messages["logs"]["sync_en_curso"])
+        worker.progreso.connect(self._on_sync_progreso)
+        worker.finalizado.connect(self._on_sync_finalizado)
+        worker.fallo.connect(self._on_sync_fallo)
+
+    def _on_sync_progreso(self, recibido: int, total: int):
+        from logic.constants import messages
+        if total > 0:
+            detalle = f"{int(recibido * 100 / total)}%"
+        else:
+            detalle = f"{recibido // 1024} KB"
+        self.statusBar().showMessage(f"{messages['logs']['sync_en_curso']} {detalle}")
+
+    def _on_sync_finalizado(self, hojas_nuevas, estado: str):
+        from logic.constants import messages
+        from logic.data_loader import SYNC_OFFLINE, SYNC_SIN_CAMBIOS
+        if hojas_nuevas is not None:
+            self.actualizar_catalogo(hojas_nuevas)
+            self.statusBar().showMessage(messages["logs"]["sync_actualizado"], 10000)
+        elif estado == SYNC_SIN_CAMBIOS:
+            self.statusBar().showMessage(messages["logs"]["sync_sin_cambios"], 10000)
+        elif estado == SYNC_OFFLINE:
+            self.statusBar().showMessage(messages["logs"]["sync_offline"])
+
+    def _on_sync_fallo(self, _motivo: str):
+        from logic.constants import messages
+        self.statusBar().showMessage(messages["logs"]["sync_offline"])
+
+    def actualizar_catalogo(self, hojas_nuevas: Dict[str, Any]):
+        """Reemplaza los datos del catálogo en caliente (mismo objeto compartido por las vistas)."""
+        self.catalogo_view.actualizar_datos(hojas_nuevas)
+
     def _on_cart_update(self):
         """
         Reacciona a cambios en el carrito.
@@ -160,19 +221,80 @@ class MainWindow(QMainWindow):
             
             dialog = StockManagerDialog(self, self.data_context, MENU_CONFIG)
             
-            # El programa se queda "esperando" aquí mientras el Gestor de Stock esté abierto
+            # El programa se queda "esperando" aquí mientras el Gestor de Stock esté abierto.
+            # No hace falta refrescar nada al cerrar: cada ingreso avisa por
+            # StockRepository.stock_cambiado y las vistas abiertas actualizan sólo esas filas.
             dialog.exec()
-            
-            # 🆕 CORRECCIÓN: Al cerrarse el Gestor (con la X o tecla Esc), 
-            # forzamos el refresco de las tablas sin preguntar si fue "Accepted".
-            for vista_cacheada in self.catalogo_view.active_views.values():
-                if hasattr(vista_cacheada, 'refrescar'):
-                    vista_cacheada.refrescar()
                 
         except Exception as e:
             from PySide6.QtWidgets import QMessageBox
             QMessageBox.warning(self, "Error", f"No se pudo abrir el gestor de stock:\n{e}")
 
+    def generar_flyers_hoja(self):
+        """Genera los flyers de todos los productos de una hoja (carpeta o ZIP) en segundo plano."""
+        from PySide6.QtWidgets import QFileDialog, QProgressDialog
+        from PySide6.QtCore import Qt
+        from logic.catalogo_service import obtener_df_por_hoja
+        from ui.workers import FlyerBatchWorker
+
+        if self._flyer_worker is not None and self._flyer_worker.isRunning():
+            QMessageBox.information(self, "Flyers", "Ya hay una generación de flyers en curso.")
+            return
+
+        hoja, ok = QInputDialog.getItem(self, "Flyers por Hoja", "Hoja del catálogo:", list(self.data_context.keys()), 0, False)
+        if not ok or not hoja:
+            return
+        formato, ok = QInputDialog.getItem(self, "Flyers por Hoja", "Guardar como:", ["Carpeta con imágenes", "Archivo ZIP"], 0, False)
+        if not ok:
+            return
+
+        como_zip = formato == "Archivo ZIP"
+        if como_zip:
+            destino, _ = QFileDialog.getSaveFileName(self, "Guardar flyers", f"Flyers {hoja}.zip", "ZIP (*.zip)")
+        else:
+            destino = QFileDialog.getExistingDirectory(self, "Carpeta de destino para los flyers")
+        if not destino:
+            return
+
+        df = obtener_df_por_hoja(self.data_context, hoja)
+        if df.empty:
+            QMessageBox.warning(self, "Flyers", f"La hoja '{hoja}' no tiene productos.")
+            return
+
+        dialogo = QProgressDialog(f"Generando flyers de '{hoja}'...", "Cancelar", 0, 0, self)
+        dialogo.setWindowTitle("Flyers por Hoja")
+        dialogo.setWindowModality(Qt.WindowModal)
+        dialogo.setMinimumDuration(0)
+
+        worker = FlyerBatchWorker(df, destino, como_zip, self)
+        self._flyer_worker = worker
+
+        def _on_progreso(hechos, total):
+            dialogo.setMaximum(total)
+            dialogo.setValue(hechos)
+
+        def _on_finalizado(res):
+            dialogo.close()
+            lineas = [f"✅ {res['generados']} flyers generados en:\n{res['destino']}"]
+            if res["cancelado"]:
+                lineas.append("⏹️ Cancelado antes de terminar.")
+            if res["sin_imagen"]:
+                lineas.append(f"⚠️ {len(res['sin_imagen'])} productos sin imagen (omitidos).")
+            if res["fallidos"]:
+                detalle = "\n".join(f"• {n}: {e}" for n, e in res["fallidos"][:10])
+                lineas.append(f"❌ {len(res['fallidos'])} con error:\n{detalle}")
+            QMessageBox.information(self, "Flyers por Hoja", "\n\n".join(lineas))
+
+        def _on_fallo(error):
+            dialogo.close()
+            QMessageBox.critical(self, "Flyers por Hoja", f"No se pudieron generar los flyers:\n{error}")
+
+        worker.progreso.connect(_on_progreso)
+        worker.finalizado.connect(_on_finalizado)
+        worker.fallo.connect(_on_fallo)
+        dialogo.canceled.connect(worker.cancelar)
+        worker.start()
+
     def abrir_proveedores(self):
         if self.w_proveedores is None:
             self.w_proveedores = ProveedoresWindow(self.proveedores_service, self)
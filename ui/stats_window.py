@@ -5,13 +5,13 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QStandardItemModel, QStandardItem
 from PySide6.QtCore import Qt, QDate
 from logic.financiero import format_currency
-from logic.stats_service import obtener_reporte_mensual
+from logic.stats_service import obtener_reporte_rango
 from ui.widgets import MonthYearSelector
 
 # Imports de detalle
 from ui.history_window import DetalleFacturaDialog 
 from ui.credits_window import CreditDetailDialog   
-from logic.facturas_db_handler import obtener_historial, buscar_por_fecha
+from logic.facturas_db_handler import obtener_factura_por_id
 from logic.credits_service import obtener_id_credito_por_factura
 from logic.pdf_service import generar_comprobante_venta
 
@@ -48,7 +48,7 @@ class StatsWindow(QMainWindow):
         layout.addLayout(cards_layout)
         
         # 3. Tabla
-        layout.addWidget(QLabel("<b>Detalle de Movimientos del Mes (Doble click para ver detalle):</b>"))
+        layout.addWidget(QLabel("<b>Detalle de Movimientos del Período (Doble click para ver detalle):</b>"))
         self.table = QTableView()
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
@@ -96,8 +96,8 @@ class StatsWindow(QMainWindow):
         lbl.setText(format_currency(valor))
 
     def generar_reporte(self):
-        mes, anio = self.selector_fecha.get_date()
-        data = obtener_reporte_mensual(mes, anio)
+        desde, hasta = self.selector_fecha.get_rango()
+        data = obtener_reporte_rango(desde, hasta)
         
         totales = data["totales"]
         self._update_card(self.card_empresa, totales["empresa"])
@@ -133,10 +133,8 @@ class StatsWindow(QMainWindow):
         # -------------------------------
         
         if tipo_origen == "FACTURA":
-            # Obtener objeto factura completo (Buscamos en historial general)
-            # Esto es ineficiente pero simple. Idealmente 'obtener_por_id'
-            historial = obtener_historial()
-            factura = next((f for f in historial if f['id'] == id_origen), None)
+            # Factura completa por ID (sin recorrer el historial)
+            factura = obtener_factura_por_id(id_origen)
             
             if factura:
                 dlg = DetalleFacturaDialog(factura, self)
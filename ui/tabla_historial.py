@@ -0,0 +1,106 @@
+# ui/tabla_historial.py
+
+from typing import Dict, List, Optional
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from logic.facturas_db_handler import (
+    TAMANIO_PAGINA_HISTORIAL, cargar_items, obtener_pagina_historial
+)
+from logic.financiero import format_currency
+from logic.periodos import Fecha
+
+COLUMNAS_HISTORIAL = ["ID", "Fecha", "Método", "Total", "Items Resumen"]
+COL_RESUMEN = COLUMNAS_HISTORIAL.index("Items Resumen")
+
+
+class HistorialTableModel(QAbstractTableModel):
+    """
+    Historial de facturas paginado: arranca con una página y la vista pide las
+    siguientes (canFetchMore / fetchMore) a medida que se scrollea hasta el final.
+    El items_json de cada fila se parsea recién cuando la fila se dibuja o se
+    abre su detalle, no al cargar la página.
+    """
+
+    def __init__(self, parent=None, tamanio_pagina: int = TAMANIO_PAGINA_HISTORIAL):
+        super().__init__(parent)
+        self._tamanio_pagina = tamanio_pagina
+        self._filas: List[dict] = []
+        self._resumenes: Dict[int, str] = {}
+        self._desde: Optional[Fecha] = None
+        self._hasta: Optional[Fecha] = None
+        self._hay_mas = False
+
+    # --- API propia ---
+
+    def cargar(self, desde: Optional[Fecha] = None, hasta: Optional[Fecha] = None):
+        """Reinicia el modelo con el rango [desde, hasta) (None = todo el historial)."""
+        self.beginResetModel()
+        self._filas = []
+        self._resumenes = {}
+        self._desde, self._hasta = desde, hasta
+        self._hay_mas = True
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def id_factura(self, fila: int) -> int:
+        return self._filas[fila]['id']
+
+    def factura(self, fila: int) -> dict:
+        """La factura completa de esa fila (con 'items' ya parseados)."""
+        return cargar_items(self._filas[fila])
+
+    def _resumen(self, fila: int) -> str:
+        if fila not in self._resumenes:
+            items = self.factura(fila).get('items', [])
+            self._resumenes[fila] = ", ".join(f"{i.get('cantidad', 1)}x {i.get('modelo', '')}" for i in items)
+        return self._resumenes[fila]
+
+    # --- Paginación ---
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._hay_mas
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._hay_mas:
+            return
+        ultima = self._filas[-1] if self._filas else None
+        cursor = (ultima['fecha'], ultima['id']) if ultima else None
+        pagina = obtener_pagina_historial(self._desde, self._hasta, cursor, self._tamanio_pagina)
+        self._hay_mas = len(pagina) == self._tamanio_pagina
+        if not pagina:
+            return
+        inicio = len(self._filas)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(pagina) - 1)
+        self._filas.extend(pagina)
+        self.endInsertRows()
+
+    # --- Interfaz Qt ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._filas)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNAS_HISTORIAL)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNAS_HISTORIAL[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        fila = self._filas[index.row()]
+        columna = index.column()
+        if columna == 0:
+            return str(fila['id'])
+        if columna == 1:
+            return fila['fecha']
+        if columna == 2:
+            return fila['metodo_pago']
+        if columna == 3:
+            return format_currency(fila['total'])
+        if columna == COL_RESUMEN:
+            return self._resumen(index.row())
+        return None
@@ -0,0 +1,254 @@
+# ui/tabla_productos.py
+
+import numbers
+from typing import Callable, Dict, List
+
+import pandas as pd
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent
+from PySide6.QtGui import QColor, QFont
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle
+
+from logic.constants import ESTILOS, CATALOGO_ANCHOS, MINIATURAS_CONFIG
+from logic.financiero import format_currency
+from logic.image_service import indice_imagenes, obtener_ruta_imagen
+from logic.thumbnail_cache import obtener_miniatura, solicitar_miniaturas
+
+# --- Columnas de acción (fijas a los costados de los campos de datos) ---
+ACCION_FOTO = "FOTO"
+ACCION_COPIAR = "COPIAR"
+ACCION_CARRITO = "CARRITO"
+ACCION_CUOTAS = "CUOTAS"
+
+_ACCIONES_IZQ = [ACCION_FOTO, ACCION_COPIAR]
+_ACCIONES_DER = [ACCION_CARRITO, ACCION_CUOTAS]
+
+_ACCIONES_INFO = {
+    ACCION_FOTO: {"texto": "👁️", "tooltip": "Click para ver imagen grande", "ancho": 40, "color": "#3498db"},
+    ACCION_COPIAR: {"texto": "📋", "tooltip": "Copiar texto del producto", "ancho": CATALOGO_ANCHOS.get("COPIAR", 30), "color": "#000000"},
+    ACCION_CARRITO: {"texto": "🛒", "tooltip": "Agregar al Carrito", "ancho": 40, "color": "#000000"},
+    ACCION_CUOTAS: {"texto": "⋯", "tooltip": "Calcular Cuotas", "ancho": 40, "color": "#000000"},
+}
+
+# Traducción de los estilos CSS de celda (ESTILOS["celda_*"]) a fuente/color/alineación
+# para el modelo: (tamaño_px, negrita, color, alineación)
+_ESTILO_TEXTO = (16, False, "#2c3e50", Qt.AlignLeft)
+_ESTILO_MODELO = (16, True, "#2c3e50", Qt.AlignLeft)
+_ESTILO_NUMERO = (18, False, "#7f8c8d", Qt.AlignRight)
+_ESTILO_EFECTIVO = (19, True, "#27ae60", Qt.AlignRight)
+_ESTILO_STOCK = (18, True, "#34495e", Qt.AlignHCenter)
+
+
+def _es_numero(valor) -> bool:
+    # numbers.Number incluye los escalares de numpy (np.int64 no hereda de int)
+    return isinstance(valor, numbers.Number) and not isinstance(valor, bool)
+
+
+class ProductosTableModel(QAbstractTableModel):
+    """
+    Modelo de sólo lectura respaldado directamente por el DataFrame del catálogo.
+    La vista pide datos únicamente de las filas visibles; los diccionarios por
+    fila y la ruta de imagen se calculan recién cuando hacen falta y se memorizan.
+    """
+
+    def __init__(self, df: pd.DataFrame, campos: List[str], parent=None):
+        super().__init__(parent)
+        self._df = df.reset_index(drop=True)
+        self._campos = list(campos)
+        self._columnas = _ACCIONES_IZQ + self._campos + _ACCIONES_DER
+        self._filas_dict: Dict[int, dict] = {}
+        # fila -> (versión del índice de imágenes, ruta | None)
+        self._rutas_img: Dict[int, tuple] = {}
+        self._fuentes: Dict[tuple, QFont] = {}
+
+    # --- API propia ---
+
+    def columnas(self) -> List[str]:
+        return self._columnas
+
+    def dataframe(self) -> pd.DataFrame:
+        return self._df
+
+    def fila_dict(self, fila: int) -> dict:
+        if fila not in self._filas_dict:
+            self._filas_dict[fila] = self._df.iloc[fila].to_dict()
+        return self._filas_dict[fila]
+
+    def ruta_imagen(self, fila: int):
+        # Se llama desde data()/paint(): sólo memoria. La carpeta se revisa en otro
+        # hilo y, si cambió, la versión del índice invalida lo memorizado acá.
+        version, ruta = self._rutas_img.get(fila, (None, None))
+        version_actual = indice_imagenes.version
+        if version != version_actual:
+            ruta = obtener_ruta_imagen(self.fila_dict(fila), revalidar=False)
+            self._rutas_img[fila] = (version_actual, ruta)
+            # La fila se está mostrando: encargamos (en segundo plano) sólo la del tooltip.
+            # La de pantalla completa se pide al pasar el mouse o al abrir el visor.
+            solicitar_miniaturas(ruta, (MINIATURAS_CONFIG["lado_tooltip"],))
+        else:
+            indice_imagenes.revalidar_en_segundo_plano()
+        return ruta
+
+    def actualizar_stock(self, stock: Dict[str, int], codigos) -> bool:
+        """
+        Pisa STOCK_ACTUAL sólo en las filas de esos códigos y repinta esas celdas.
+        Devuelve True si alguna fila de esta tabla estaba afectada.
+        """
+        from logic.stock_service import actualizar_stock_en_df
+
+        mask = actualizar_stock_en_df(self._df, stock, codigos)
+        filas = [int(f) for f in mask.to_numpy().nonzero()[0]]
+        if not filas:
+            return False
+        for fila in filas:
+            self._filas_dict.pop(fila, None)
+        if "STOCK_ACTUAL" in self._columnas:
+            col = self._columnas.index("STOCK_ACTUAL")
+            self.dataChanged.emit(self.index(min(filas), col), self.index(max(filas), col))
+        return True
+
+    def accion_habilitada(self, fila: int, accion: str) -> bool:
+        if accion == ACCION_FOTO:
+            return self.ruta_imagen(fila) is not None
+        return True
+
+    # --- Interfaz Qt ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._df)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._columnas)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal:
+            return None
+        if role == Qt.DisplayRole:
+            columna = self._columnas[section]
+            if columna in _ACCIONES_INFO:
+                return "Acciones" if columna == ACCION_CARRITO else ""
+            return "STOCK" if columna == "STOCK_ACTUAL" else columna
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        fila, columna = index.row(), self._columnas[index.column()]
+
+        if columna in _ACCIONES_INFO:
+            info = _ACCIONES_INFO[columna]
+            if role == Qt.DisplayRole:
+                return info["texto"]
+            if role == Qt.ToolTipRole:
+                if not self.accion_habilitada(fila, columna):
+                    return "Producto sin imagen disponible"
+                if columna == ACCION_FOTO:
+                    return self._tooltip_foto(fila, info["tooltip"])
+                return info["tooltip"]
+            if role == Qt.BackgroundRole:
+                return self._color_fondo(fila)
+            return None
+
+        if role == Qt.DisplayRole:
+            return self._texto_celda(fila, columna)
+        if role == Qt.BackgroundRole:
+            return self._color_fondo(fila)
+
+        estilo = self._estilo_celda(fila, columna)
+        if role == Qt.FontRole:
+            return self._fuente(estilo[0], estilo[1])
+        if role == Qt.ForegroundRole:
+            return QColor(estilo[2])
+        if role == Qt.TextAlignmentRole:
+            return int(estilo[3] | Qt.AlignVCenter)
+        if role == Qt.ToolTipRole and columna in ("MODELO", "CARACTERISTICAS"):
+            return self._texto_celda(fila, columna)
+        return None
+
+    def _tooltip_foto(self, fila: int, texto: str) -> str:
+        # Vista previa sólo si la miniatura ya está hecha (consulta en memoria, sin disco)
+        ruta = self.ruta_imagen(fila)
+        miniatura = obtener_miniatura(ruta, MINIATURAS_CONFIG["lado_tooltip"])
+        # Mouse encima de la foto: probablemente la abran, adelantamos la de pantalla completa
+        solicitar_miniaturas(ruta, (MINIATURAS_CONFIG["lado_preview"],))
+        if miniatura is None:
+            return texto
+        return f'<img src="{miniatura.as_posix()}"><br>{texto}'
+
+    # --- Helpers de presentación (mismas reglas que la tabla de widgets anterior) ---
+
+    def _valor(self, fila: int, columna: str):
+        return self._df.iat[fila, self._df.columns.get_loc(columna)] if columna in self._df.columns else ""
+
+    def _texto_celda(self, fila: int, columna: str) -> str:
+        valor = self._valor(fila, columna)
+        if columna == "STOCK_ACTUAL" or columna == "MODELO":
+            return str(valor)
+        if _es_numero(valor):
+            return format_currency(valor)
+        return str(valor)
+
+    def _estilo_celda(self, fila: int, columna: str) -> tuple:
+        if columna == "MODELO":
+            return _ESTILO_MODELO
+        if columna == "EFECTIVO/TRANSF":
+            return _ESTILO_EFECTIVO
+        if columna == "STOCK_ACTUAL":
+            return _ESTILO_STOCK
+        if _es_numero(self._valor(fila, columna)):
+            return _ESTILO_NUMERO
+        return _ESTILO_TEXTO
+
+    def _color_fondo(self, fila: int) -> QColor:
+        return QColor(ESTILOS.get("fila_par", "#ffffff") if fila % 2 == 0 else ESTILOS.get("fila_impar", "#f9f9f9"))
+
+    def _fuente(self, px: int, negrita: bool) -> QFont:
+        clave = (px, negrita)
+        if clave not in self._fuentes:
+            fuente = QFont("Segoe UI")
+            fuente.setPixelSize(px)
+            fuente.setBold(negrita)
+            self._fuentes[clave] = fuente
+        return self._fuentes[clave]
+
+
+class AccionDelegate(QStyledItemDelegate):
+    """
+    Pinta una columna de acción como un botón plano y dispara el callback al hacer
+    click. Reemplaza a los QPushButton por fila: no se crea ningún widget.
+    - callback(fila: int)
+    """
+
+    def __init__(self, accion: str, callback: Callable[[int], None], parent=None):
+        super().__init__(parent)
+        self.accion = accion
+        self.callback = callback
+        self._info = _ACCIONES_INFO[accion]
+
+    def paint(self, painter, option, index):
+        modelo = index.model()
+        habilitada = modelo.accion_habilitada(index.row(), self.accion)
+
+        painter.save()
+        painter.fillRect(option.rect, modelo.data(index, Qt.BackgroundRole))
+        if habilitada and option.state & QStyle.State_MouseOver:
+            painter.fillRect(option.rect, QColor(ESTILOS.get("fila_hover", "#f1f3f5")))
+        fuente = QFont(option.font)
+        fuente.setPixelSize(18)
+        fuente.setBold(True)
+        painter.setFont(fuente)
+        painter.setPen(QColor(self._info["color"] if habilitada else "#bdc3c7"))
+        painter.drawText(option.rect, Qt.AlignCenter, self._info["texto"])
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            if option.rect.contains(event.position().toPoint()) and model.accion_habilitada(index.row(), self.accion):
+                self.callback(index.row())
+                return True
+        return False
+
+
+def ancho_columna(columna: str) -> int:
+    if columna in _ACCIONES_INFO:
+        return _ACCIONES_INFO[columna]["ancho"]
+    return CATALOGO_ANCHOS.get(columna, 100)
@@ -5,15 +5,16 @@ from functools import partial
 import pandas as pd
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QScrollArea, 
-    QFrame, QSizePolicy, QLineEdit, QMessageBox, QInputDialog, QApplication, QCheckBox
+    QWidget, QVBoxLayout, QLabel, QPushButton,
+    QFrame, QLineEdit, QMessageBox, QInputDialog, QApplication, QCheckBox,
+    QTableView, QHeaderView, QAbstractItemView
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, QThreadPool
 
 from PySide6.QtGui import QClipboard, QImage, QPixmap
 
 # Imports Propios
-from logic.constants import ESTILOS, CAMPOS_CATALOGO, CATALOGO_ANCHOS, MAPEO_CLIPBOARD
+from logic.constants import ESTILOS, CAMPOS_CATALOGO, MAPEO_CLIPBOARD, BUSQUEDA_CONFIG
 from logic import catalogo_service
 from logic.catalogo_service import formatear_producto_para_clipboard
 # Importamos la nueva lógica financiera
@@ -21,8 +22,12 @@ from logic.financiero import calcular_plan_cuotas, format_currency, generar_text
 from logic.cart_service import CartService
 
 # Importamos las lógicas
-from logic.image_service import generar_flyer_producto, obtener_ruta_imagen
 from ui.widgets import ImageViewerDialog
+from ui.workers import BusquedaSignals, BusquedaTask
+from ui.tabla_productos import (
+    ProductosTableModel, AccionDelegate, ancho_columna,
+    ACCION_FOTO, ACCION_COPIAR, ACCION_CARRITO, ACCION_CUOTAS
+)
 
 from functools import partial
 
@@ -128,224 +133,86 @@ def copiar_callback(info_fila):
         print(f"Error al copiar: {e}")
 
 def build_tabla_productos(parent_window, df, campos, copiar_callback, ver_imagen_callback, cart_service: CartService):
-    """Construye la tabla con botón de Carrito incluido."""
-    contenedor = QWidget()
-    layout_principal = QVBoxLayout(contenedor)
-    contenedor.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
-    layout_principal.setContentsMargins(0, 0, 0, 0)
-    layout_principal.setSpacing(0)
-
-    # --- Header ---
-    header_widget = QWidget()
-    header_widget.setStyleSheet(f"background-color: {ESTILOS.get('header_fondo', '#404040')}; border-radius: 4px;")
-    header_layout = QHBoxLayout(header_widget)
-    header_layout.setContentsMargins(0, 0, 0, 0)
-    
-    # Columna Ver Foto
-    lbl_foto_header = QLabel("")
-    lbl_foto_header.setFixedWidth(40) # Ancho pequeño
-    lbl_foto_header.setStyleSheet(ESTILOS.get("titulo_columna", ""))
-    lbl_foto_header.setFixedHeight(ESTILOS["altura_encabezado"])
-    header_layout.addWidget(lbl_foto_header)
-    # ---------------------------------
-
-    # Columna Copiar (Vacia en header)
-    lbl_copiar = QLabel("")
-    lbl_copiar.setFixedWidth(CATALOGO_ANCHOS.get("COPIAR", 30))
-    header_layout.addWidget(lbl_copiar)
-
-    for campo in campos:
-        label = QLabel("STOCK" if campo == "STOCK_ACTUAL" else campo)
-
-        # 1. Mantenemos el ancho fijo por columna
-        label.setFixedWidth(CATALOGO_ANCHOS.get(campo, 100))
-
-        # 2. ACTIVAMOS EL WRAPPING (Multilínea)
-        label.setWordWrap(True) 
-
-        # 3. Alineación centrada (se ve mejor en títulos de dos líneas)
-        label.setAlignment(Qt.AlignCenter)
+    """
+    Construye la tabla con botón de Carrito incluido.
+    Es un QTableView sobre ProductosTableModel (respaldado por el DataFrame):
+    sólo se pintan las filas visibles y las acciones son delegates, no widgets.
+    """
+    modelo = ProductosTableModel(df, campos)
+    tabla = QTableView()
+    tabla.setModel(modelo)
 
-        # 4. Estilos
-        label.setStyleSheet(ESTILOS.get("titulo_columna", ""))
+    # --- Callbacks de acciones (reciben el número de fila del modelo) ---
+    def _ver_foto(fila: int):
+        ver_imagen_callback(modelo.fila_dict(fila), modelo.ruta_imagen(fila))
 
-        # 5. Usamos 'setMinimumHeight'
-        # Esto permite que la celda crezca si el texto necesita 2 o 3 renglones.
-        label.setMinimumHeight(ESTILOS["altura_encabezado"]) 
-        
-        header_layout.addWidget(label)
-
-    # Columna Ver Más (Vacia en header)
-    lbl_acciones = QLabel("Acciones") # O dejalo vacío si prefieres
-    lbl_acciones.setFixedWidth(80) # 40px para carrito + 40px para ver más
-    lbl_acciones.setStyleSheet(ESTILOS.get("titulo_columna", ""))
-    lbl_acciones.setFixedHeight(ESTILOS["altura_encabezado"])
-    header_layout.addWidget(lbl_acciones)
-    
-    layout_principal.addWidget(header_widget)
+    def _copiar(fila: int):
+        copiar_callback(modelo.fila_dict(fila))
 
-    # --- Helper para agregar al carrito con feedback ---
-    def _agregar_click(fila_series):
-        # Convertimos la Serie de Pandas a Diccionario para el servicio
-        producto_dict = fila_series.to_dict()
+    def _agregar_click(fila: int):
+        producto_dict = modelo.fila_dict(fila)
         cart_service.agregar_producto(producto_dict)
-        
         # Feedback Visual Rápido (Opcional: puedes usar un Toast o StatusBar)
         print(f"[CARRITO] Agregado: {producto_dict.get('MODELO')}")
 
-    # --- Filas ---
-    for i, fila in df.iterrows():
-        layout_fila = QHBoxLayout()
-
-        # --- NUEVA LÓGICA DE COLORES ---
-        
-        COLOR_PAR = ESTILOS.get("fila_par", "#ffffff")
-        COLOR_IMPAR = ESTILOS.get("fila_impar", "#f9f9f9")
-        estilo_fondo = COLOR_PAR if i % 2 == 0 else COLOR_IMPAR
-        
-        fila_widget = QWidget()
-        
-        # Aplicamos el estilo con un hover sutil y bordes
-        fila_widget.setStyleSheet(f"""
-            QWidget {{ 
-                background-color: {estilo_fondo}; 
-                border-bottom: 1px solid #e0e0e0; 
-            }}
-            QWidget:hover {{ 
-                background-color: {ESTILOS.get('fila_hover', '#f1f3f5')};
-            }} 
-        """)
-
-        #-------------------------------------------------------------------------------------------
-        
-        # 1. AJUSTE DE SEPARACIÓN VERTICAL (Márgenes)
-        # Antes: (0, 2, 0, 2). Ahora: (0, 8, 0, 8) para dar más aire entre filas.
-        layout_fila.setContentsMargins(0, 8, 0, 8) 
-
-        # 2. DEFINIR ALTURA MEJORADA
-        # Sumamos 10px a la altura base definida en constantes para hacer la fila "más ancha/alta"
-        altura_fila_mejorada = ESTILOS.get("altura_celda", 30) + 12
-
-        row_dict = fila.to_dict() # Convertimos a dict para usar los detectores
-        
-        # --- A. NUEVO: BOTÓN VER FOTO (👁️) ---
-        ruta_img = obtener_ruta_imagen(row_dict)
-        btn_ver_foto = QPushButton("👁️") # Puedes usar icono cámara 📷 si prefieres
-        #btn_ver_foto.setIcon(QIcon("ruta/a/icono_ojo.png")) # Opcional con QIcon
-        
-        # Definir estilo del botón (pequeño, sin bordes raros)
-        btn_ver_foto.setFixedWidth(40)
-        btn_ver_foto.setFixedHeight(altura_fila_mejorada)
-        btn_ver_foto.setCursor(Qt.PointingHandCursor)
-        
-        # DETECCIÓN DE IMAGEN: Si no hay, deshabilitamos el botón
-        ruta_img = obtener_ruta_imagen(row_dict)
-        if not ruta_img:
-            btn_ver_foto.setEnabled(False)
-            btn_ver_foto.setToolTip("Producto sin imagen disponible")
-            # Estilo deshabilitado sutil
-            btn_ver_foto.setStyleSheet("color: #bdc3c7; background-color: transparent; border: none; font-size: 18px;")
-        else:
-            btn_ver_foto.setToolTip("Click para ver imagen grande")
-            btn_ver_foto.setStyleSheet("color: #3498db; background-color: transparent; border: none; font-size: 18px; font-weight: bold;")
-            # Conectamos al nuevo callback pasando los datos necesarios
-            btn_ver_foto.clicked.connect(partial(ver_imagen_callback, row_dict, ruta_img))
-        
-        layout_fila.addWidget(btn_ver_foto)
-        # --------------------------------------
-
-        # --- BOTÓN COPIAR (MODIFICADO) ---
-        btn_copiar = QPushButton("📋")
-        btn_copiar.setStyleSheet(ESTILOS.get('boton_copiar', ''))
-        btn_copiar.setFixedWidth(CATALOGO_ANCHOS.get("COPIAR", 30))
-        btn_copiar.setFixedHeight(altura_fila_mejorada)
-        
-        # ERROR ANTERIOR: Le pasábamos 'info_fila' (formateada con $)
-        # SOLUCIÓN: Le pasamos 'row_dict' (la data pura del DataFrame)
-        btn_copiar.clicked.connect(partial(copiar_callback, row_dict)) 
-        
-        layout_fila.addWidget(btn_copiar)
-        
-        # --- Celdas de Datos ---
-        for campo in campos:
-            valor_raw = fila.get(campo, "")
-            texto_celda = str(valor_raw)
-            
-            # Jerarquía Tipográfica
-            if campo == "MODELO":
-                estilo_celda = ESTILOS.get("celda_modelo", "")
-            elif campo == "EFECTIVO/TRANSF":
-                if isinstance(valor_raw, (int, float)):
-                    texto_celda = format_currency(valor_raw)
-                estilo_celda = ESTILOS.get("celda_precio_efectivo", "")
-            elif isinstance(valor_raw, (int, float)) and campo != "STOCK_ACTUAL":
-                texto_celda = format_currency(valor_raw)
-                estilo_celda = ESTILOS.get("celda_numero", "")
-            elif campo == "STOCK_ACTUAL":
-                texto_celda = str(valor_raw)
-                estilo_celda = "padding: 0 4px; font-size: 18px; font-weight: bold; color: #34495e; qproperty-alignment: 'AlignCenter';"
-            else:
-                estilo_celda = ESTILOS.get("celda_texto", "")
-            
-            label = QLabel(texto_celda)
-            label.setFixedWidth(CATALOGO_ANCHOS.get(campo, 100))
-            label.setStyleSheet(estilo_celda)
-            
-            # Ajuste de texto para las celdas también (importante si crecen)
-            label.setWordWrap(True) 
-            
-            # Usamos setMinimumHeight para que nunca sean más chicas que nuestra altura mejorada
-            label.setMinimumHeight(altura_fila_mejorada)
-            
-            # Alineación vertical centrada es clave ahora que son más altas
-            label.setAlignment(Qt.AlignVCenter | (Qt.AlignRight if isinstance(valor_raw, (int, float)) else Qt.AlignLeft))
-            
-            layout_fila.addWidget(label)
-
-        # --- SECCIÓN DE ACCIONES ---
-        
-        # Contenedor para agrupar botones a la derecha
-        acciones_container = QWidget()
-        acciones_layout = QHBoxLayout(acciones_container)
-        acciones_layout.setContentsMargins(0, 0, 0, 0)
-        acciones_layout.setSpacing(2) # Pegaditos
-
-        # 1. BOTÓN AGREGAR AL CARRITO (NUEVO)
-        btn_cart = QPushButton("🛒")
-        btn_cart.setToolTip("Agregar al Carrito")
-        btn_cart.setFixedWidth(35)
-        # Reutilizamos estilo de "ver_mas" o creamos uno nuevo
-        btn_cart.setStyleSheet(ESTILOS.get("boton_ver_mas", "background-color: #DDD;"))
-        btn_cart.setFixedHeight(altura_fila_mejorada) # Usar la variable de altura que definimos antes
-        
-        # Conexión
-        btn_cart.clicked.connect(partial(_agregar_click, fila))
-        acciones_layout.addWidget(btn_cart)
-
-        # 2. BOTÓN VER MÁS (EXISTENTE)
-        btn_mas = QPushButton("⋯")
-        btn_mas.setToolTip("Calcular Cuotas")
-        btn_mas.setFixedWidth(35)
-        btn_mas.setStyleSheet(ESTILOS.get("boton_ver_mas", ""))
-        btn_mas.setFixedHeight(altura_fila_mejorada)
-        
-        btn_mas.clicked.connect(partial(_handle_calculo_cuotas, parent_window, fila.to_dict()))
-        acciones_layout.addWidget(btn_mas)
-
-        # Añadimos el contenedor de acciones al layout de la fila
-        acciones_container.setFixedWidth(80) # Asegurar ancho fijo total
-        layout_fila.addWidget(acciones_container)
-
-        fila_widget.setLayout(layout_fila)
-        layout_principal.addWidget(fila_widget)
-
-    layout_principal.addStretch()
+    def _cuotas(fila: int):
+        _handle_calculo_cuotas(parent_window, modelo.fila_dict(fila))
+
+    callbacks = {
+        ACCION_FOTO: _ver_foto,
+        ACCION_COPIAR: _copiar,
+        ACCION_CARRITO: _agregar_click,
+        ACCION_CUOTAS: _cuotas,
+    }
+
+    # Los delegates se guardan en la tabla para que el GC no se los lleve
+    tabla.delegates_acciones = []
+    for col, nombre in enumerate(modelo.columnas()):
+        if nombre in callbacks:
+            delegate = AccionDelegate(nombre, callbacks[nombre], tabla)
+            tabla.setItemDelegateForColumn(col, delegate)
+            tabla.delegates_acciones.append(delegate)
+        tabla.setColumnWidth(col, ancho_columna(nombre))
+
+    # --- Aspecto (equivalente a la tabla de widgets anterior) ---
+    altura_fila = ESTILOS.get("altura_celda", 30) + 12
+    tabla.verticalHeader().setVisible(False)
+    tabla.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    tabla.verticalHeader().setDefaultSectionSize(altura_fila)
+    tabla.horizontalHeader().setFixedHeight(ESTILOS["altura_encabezado"])
+    tabla.horizontalHeader().setHighlightSections(False)
+    tabla.setSelectionMode(QAbstractItemView.NoSelection)
+    tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    tabla.setFocusPolicy(Qt.NoFocus)
+    tabla.setWordWrap(True)
+    tabla.setMouseTracking(True)
+    tabla.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+    tabla.setFrameShape(QFrame.NoFrame)
+    tabla.setStyleSheet(f"""
+        QTableView {{ gridline-color: #e0e0e0; }}
+        QHeaderView::section {{
+            background-color: {ESTILOS.get('header_fondo', '#404040')};
+            {ESTILOS.get('titulo_columna', '')}
+            border: none;
+        }}
+    """)
+    return tabla
+
+def _escuchar_cambios_stock(vista: QWidget, callback: Callable):
+    """
+    Conecta la vista a StockRepository.stock_cambiado(codigos) y la desconecta
+    cuando el widget se destruye (el repositorio vive toda la sesión).
+    """
+    from logic.stock_repository import get_stock_repository
+    repo = get_stock_repository()
+    repo.stock_cambiado.connect(callback)
 
-    scroll = QScrollArea()
-    scroll.setWidgetResizable(True)
-    scroll.setWidget(contenedor)
-    scroll.setFrameShape(QFrame.NoFrame)
-    return scroll
+    def _desconectar(*_):
+        try:
+            repo.stock_cambiado.disconnect(callback)
+        except (RuntimeError, TypeError):
+            pass
+    vista.destroyed.connect(_desconectar)
 
 # --- Funciones Router (Sin cambios mayores, solo limpieza) ---
 
@@ -371,6 +238,7 @@ def build_categoria_view(parent_window: QWidget, key: str, sheets: dict, volver_
     # 🆕 NUEVO: Contenedor dinámico para la tabla
     tabla_container = QVBoxLayout()
     layout.addLayout(tabla_container)
+    tabla_actual = {"tabla": None}  # Para actualizar celdas de stock sin redibujar
     
     # 1. Definimos la nueva función de lógica (Handler)
     def mostrar_imagen_handler(row_dict, ruta_img_path):
@@ -398,6 +266,7 @@ def build_categoria_view(parent_window: QWidget, key: str, sheets: dict, volver_
             widget_to_remove = tabla_container.itemAt(i).widget()
             if widget_to_remove:
                 widget_to_remove.setParent(None)
+        tabla_actual["tabla"] = None
                 
         df_filtrado = df_original.copy()
         
@@ -415,6 +284,7 @@ def build_categoria_view(parent_window: QWidget, key: str, sheets: dict, volver_
         else:
             tabla = build_tabla_productos(parent_window, df_filtrado, campos_visibles, copiar_solo_texto, mostrar_imagen_handler, cart_service)
             tabla_container.addWidget(tabla)
+            tabla_actual["tabla"] = tabla
 
     # Conectamos el checkbox para que redibuje la tabla al hacer clic
     chk_en_stock.stateChanged.connect(render_tabla)
@@ -440,6 +310,20 @@ def build_categoria_view(parent_window: QWidget, key: str, sheets: dict, volver_
     # Le "pegamos" este método al widget para poder llamarlo desde afuera
     vista.refrescar = refrescar_datos 
 
+    # Cambios de stock (ventas, ingresos): sólo se tocan las filas afectadas
+    def on_stock_cambiado(codigos):
+        from logic.stock_repository import get_stock_repository
+        from logic.stock_service import actualizar_stock_en_df
+        stock = get_stock_repository().obtener_todos()
+        if not actualizar_stock_en_df(df_original, stock, codigos).any():
+            return  # Ningún producto de esta categoría
+        if chk_en_stock.isChecked() or tabla_actual["tabla"] is None:
+            render_tabla()  # Con el filtro activo pueden aparecer/desaparecer filas
+        else:
+            tabla_actual["tabla"].model().actualizar_stock(stock, codigos)
+
+    _escuchar_cambios_stock(vista, on_stock_cambiado)
+
     return vista
 
 def build_menu_view(opciones: dict, on_click: Callable, estilo_boton: str, volver_callback: Callable = None) -> QWidget:
@@ -462,11 +346,22 @@ def build_menu_view(opciones: dict, on_click: Callable, estilo_boton: str, volve
 
 def build_busqueda_view(parent_window: QWidget, on_buscar: Callable, volver_callback: Callable, 
                         cart_service: CartService) -> QWidget:
+    """
+    Vista de búsqueda "mientras se escribe": cada tecla reinicia un debounce y,
+    al vencer, la consulta corre en un QThreadPool propio. Cada consulta lleva un
+    número de generación; si llega tarde (hubo otra tecla después) se descarta.
+    Primero se dibujan los N mejores resultados y el resto queda a un click.
+    """
+    debounce_ms = BUSQUEDA_CONFIG.get("debounce_ms", 250)
+    min_caracteres = BUSQUEDA_CONFIG.get("min_caracteres", 2)
+    resultados_iniciales = BUSQUEDA_CONFIG.get("resultados_iniciales", 50)
+
     vista = QWidget()
     layout = QVBoxLayout(vista)
 
     input_busqueda = QLineEdit()
     input_busqueda.setPlaceholderText("Ingrese el MODELO / CODIGO del producto...")
+    input_busqueda.setClearButtonEnabled(True)
     layout.addWidget(input_busqueda)
 
     btn_buscar = QPushButton("Buscar")
@@ -478,31 +373,74 @@ def build_busqueda_view(parent_window: QWidget, on_buscar: Callable, volver_call
     chk_en_stock.setStyleSheet("font-size: 13px; font-weight: bold; color: #27ae60; margin-bottom: 5px;")
     layout.addWidget(chk_en_stock)
 
+    lbl_estado = QLabel("")
+    lbl_estado.setStyleSheet("font-style: italic; color: #7f8c8d;")
+    layout.addWidget(lbl_estado)
+
     resultados_layout = QVBoxLayout()
     resultados_container = QWidget()
     resultados_container.setLayout(resultados_layout)
     layout.addWidget(resultados_container)
 
-    def ejecutar_busqueda():
-        termino = input_busqueda.text().strip()
-        if not termino: return
-        
-        # Limpiar resultados previos
+    # --- Infraestructura de búsqueda en segundo plano ---
+    pool = QThreadPool(vista)
+    pool.setMaxThreadCount(1)  # Las consultas viejas se descartan, no hace falta paralelismo
+    signals = BusquedaSignals(vista)
+    timer_debounce = QTimer(vista)
+    timer_debounce.setSingleShot(True)
+    timer_debounce.setInterval(debounce_ms)
+
+    estado = {"generacion": 0, "df": pd.DataFrame(), "tabla": None, "completo": False}
+
+    # --- HANDLER 1: COPIADO CLÁSICO ---
+    def copiar_desde_busqueda(fila_datos):
+        try:
+            row_dict = fila_datos.to_dict() if hasattr(fila_datos, 'to_dict') else fila_datos
+            clipboard = QApplication.clipboard()
+            texto = formatear_producto_para_clipboard(row_dict)
+            clipboard.setText(texto)
+            print(f"✅ Texto copiado desde búsqueda: {row_dict.get('MODELO')}")
+        except Exception as e:
+            QMessageBox.warning(parent_window, "Error al copiar", f"{e}")
+
+    # --- HANDLER 2: VISOR DE IMÁGENES ---
+    def mostrar_imagen_handler_busqueda(row_dict, ruta_img_path):
+        try:
+            modelo = row_dict.get('MODELO', 'Producto')
+            viewer = ImageViewerDialog(parent_window, modelo, ruta_img_path, row_dict)
+            viewer.exec() 
+        except Exception as e:
+            QMessageBox.warning(parent_window, "Error", f"No se pudo abrir la imagen:\n{e}")
+
+    def limpiar_resultados():
         for i in reversed(range(resultados_layout.count())): 
             resultados_layout.itemAt(i).widget().setParent(None)
 
-        df = on_buscar(termino)
-        
-        # 🆕 NUEVA LÓGICA: Interceptamos el DF y aplicamos el filtro de stock
+    def mostrar_resultados(completo: bool = False):
+        limpiar_resultados()
+        estado["tabla"] = None
+        estado["completo"] = completo
+        df = estado["df"]
+
+        # Interceptamos el DF y aplicamos el filtro de stock
         if chk_en_stock.isChecked() and not df.empty:
             if 'STOCK_ACTUAL' in df.columns:
                 mask = pd.to_numeric(df['STOCK_ACTUAL'], errors='coerce').fillna(0) > 0
                 df = df[mask]
 
         if df.empty:
-            resultados_layout.addWidget(QLabel("No se encontraron resultados (o no hay stock disponible)."))
+            if input_busqueda.text().strip():
+                resultados_layout.addWidget(QLabel("No se encontraron resultados (o no hay stock disponible)."))
+            lbl_estado.setText("")
             return
 
+        total = len(df)
+        if not completo and total > resultados_iniciales:
+            df = df.head(resultados_iniciales)
+            lbl_estado.setText(f"Mostrando {resultados_iniciales} de {total} resultados.")
+        else:
+            lbl_estado.setText(f"{total} resultado(s).")
+
         # Lógica de columnas visibles
         all_cols = []
         for tipo in ["colchones", "otros"]:
@@ -512,26 +450,6 @@ def build_busqueda_view(parent_window: QWidget, on_buscar: Callable, volver_call
         master_list = [x for x in all_cols if not (x in seen or seen.add(x))]
         campos_visibles = [c for c in master_list if c in df.columns]
 
-        # --- HANDLER 1: COPIADO CLÁSICO ---
-        def copiar_desde_busqueda(fila_datos):
-            try:
-                row_dict = fila_datos.to_dict() if hasattr(fila_datos, 'to_dict') else fila_datos
-                clipboard = QApplication.clipboard()
-                texto = formatear_producto_para_clipboard(row_dict)
-                clipboard.setText(texto)
-                print(f"✅ Texto copiado desde búsqueda: {row_dict.get('MODELO')}")
-            except Exception as e:
-                QMessageBox.warning(parent_window, "Error al copiar", f"{e}")
-
-        # --- HANDLER 2: VISOR DE IMÁGENES ---
-        def mostrar_imagen_handler_busqueda(row_dict, ruta_img_path):
-            try:
-                modelo = row_dict.get('MODELO', 'Producto')
-                viewer = ImageViewerDialog(parent_window, modelo, ruta_img_path, row_dict)
-                viewer.exec() 
-            except Exception as e:
-                QMessageBox.warning(parent_window, "Error", f"No se pudo abrir la imagen:\n{e}")
-
         # Construimos la tabla del buscador
         tabla = build_tabla_productos(
             parent_window, 
@@ -541,14 +459,53 @@ def build_busqueda_view(parent_window: QWidget, on_buscar: Callable, volver_call
             mostrar_imagen_handler_busqueda, 
             cart_service                     
         )
-        
         resultados_layout.addWidget(tabla)
+        estado["tabla"] = tabla
+
+        if len(df) < total:
+            btn_todos = QPushButton(f"Mostrar los {total} resultados")
+            btn_todos.setStyleSheet(ESTILOS.get("boton_ver_mas", ""))
+            btn_todos.clicked.connect(lambda: mostrar_resultados(completo=True))
+            resultados_layout.addWidget(btn_todos)
+
+    def lanzar_busqueda():
+        timer_debounce.stop()
+        estado["generacion"] += 1
+        pool.clear()  # Descarta las consultas en cola que ya quedaron viejas
 
-    btn_buscar.clicked.connect(ejecutar_busqueda)
-    input_busqueda.returnPressed.connect(ejecutar_busqueda)
+        termino = input_busqueda.text().strip()
+        if not termino:
+            estado["df"] = pd.DataFrame()
+            limpiar_resultados()
+            lbl_estado.setText("")
+            return
+
+        lbl_estado.setText("🔎 Buscando...")
+        pool.start(BusquedaTask(signals, estado["generacion"], on_buscar, termino))
+
+    def on_resultado(generacion: int, df):
+        if generacion != estado["generacion"]:
+            return  # Respuesta de una tecla anterior: ya no interesa
+        estado["df"] = df
+        mostrar_resultados()
+
+    def on_texto_cambiado(texto: str):
+        texto = texto.strip()
+        if not texto:
+            lanzar_busqueda()  # Limpia la tabla al borrar todo
+        elif len(texto) >= min_caracteres:
+            timer_debounce.start()  # Reinicia la cuenta en cada tecla
+        else:
+            timer_debounce.stop()
+
+    signals.resultado.connect(on_resultado)
+    timer_debounce.timeout.connect(lanzar_busqueda)
+    input_busqueda.textChanged.connect(on_texto_cambiado)
+    btn_buscar.clicked.connect(lanzar_busqueda)
+    input_busqueda.returnPressed.connect(lanzar_busqueda)
     
-    # 🆕 Conectamos el checkbox para que vuelva a buscar/filtrar automáticamente
-    chk_en_stock.stateChanged.connect(ejecutar_busqueda)
+    # El checkbox sólo vuelve a filtrar lo que ya tenemos (no hace falta re-consultar)
+    chk_en_stock.stateChanged.connect(lambda *_: mostrar_resultados())
 
     btn_volver = QPushButton("Volver al Menú")
     btn_volver.setStyleSheet(ESTILOS.get('boton_volver', ''))
@@ -557,9 +514,26 @@ def build_busqueda_view(parent_window: QWidget, on_buscar: Callable, volver_call
 
     # 🆕 NUEVA LÓGICA DE REFRESCO 🆕
     def refrescar_datos():
-        # Simplemente forzamos a que busque de nuevo con el texto que ya está escrito
-        ejecutar_busqueda()
+        # Forzamos a que busque de nuevo (stock/catálogo frescos) con el texto ya escrito
+        lanzar_busqueda()
 
     vista.refrescar = refrescar_datos
 
+    # Cambios de stock: se actualizan las celdas en el lugar, sin volver a buscar
+    def on_stock_cambiado(codigos):
+        from logic.stock_repository import get_stock_repository
+        from logic.stock_service import actualizar_stock_en_df
+        df = estado["df"]
+        if df is None or df.empty:
+            return
+        stock = get_stock_repository().obtener_todos()
+        if not actualizar_stock_en_df(df, stock, codigos).any():
+            return
+        if chk_en_stock.isChecked() or estado["tabla"] is None:
+            mostrar_resultados(completo=estado["completo"])
+        else:
+            estado["tabla"].model().actualizar_stock(stock, codigos)
+
+    _escuchar_cambios_stock(vista, on_stock_cambiado)
+
     return vista
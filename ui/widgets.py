@@ -1,20 +1,35 @@
-from PySide6.QtWidgets import QWidget, QSizePolicy, QHBoxLayout, QComboBox, QSpinBox, QLabel, QDialog, QVBoxLayout, QPushButton, QApplication, QMessageBox, QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QListWidget, QInputDialog, QComboBox, QCheckBox
+from PySide6.QtWidgets import QWidget, QSizePolicy, QHBoxLayout, QComboBox, QSpinBox, QLabel, QDialog, QVBoxLayout, QPushButton, QApplication, QMessageBox, QLineEdit, QTableWidget, QTableWidgetItem, QHeaderView, QListWidget, QInputDialog, QComboBox, QCheckBox, QDateEdit
 from PySide6.QtCore import QDate, Signal, Qt
 import os
+import datetime
 from PySide6.QtGui import QPixmap, QIcon, QImage
 from pathlib import Path
 import pandas as pd
 # Importamos el actualizador de la DB
-from logic.stock_db_handler import registrar_movimiento_stock
+from logic.stock_repository import get_stock_repository
+from logic.codigos import COL_CODIGO_NORM, normalizar_codigo
+from logic import periodos
 
 class MonthYearSelector(QWidget):
+    """
+    Selector de período: Mes (por defecto), Semana, Trimestre o Personalizado.
+    get_rango() devuelve (desde, hasta) como datetime.date con hasta EXCLUSIVO,
+    listo para buscar_por_rango() / obtener_reporte_rango().
+    """
     # Señal para avisar a la ventana padre que cambió la fecha
     dateChanged = Signal() 
 
+    MODOS = ["Mes", "Semana", "Trimestre", "Personalizado"]
+
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
+        hoy = QDate.currentDate()
+
+        # Tipo de período
+        self.combo_modo = QComboBox()
+        self.combo_modo.addItems(self.MODOS)
         
         # Selector de Mes
         self.combo_mes = QComboBox()
@@ -23,26 +38,95 @@ class MonthYearSelector(QWidget):
             "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"
         ]
         self.combo_mes.addItems(self.meses)
+
+        # Selector de Trimestre
+        self.combo_trimestre = QComboBox()
+        self.combo_trimestre.addItems(["1° Trim. (Ene-Mar)", "2° Trim. (Abr-Jun)", "3° Trim. (Jul-Sep)", "4° Trim. (Oct-Dic)"])
         
-        # Selector de Año
+        # Selector de Año (compartido por Mes y Trimestre)
         self.spin_anio = QSpinBox()
         self.spin_anio.setRange(2020, 2040)
+
+        # Semana: cualquier día de la semana (de lunes a domingo)
+        self.date_semana = self._crear_date_edit(hoy)
+
+        # Personalizado: desde / hasta (ambos incluidos)
+        self.date_desde = self._crear_date_edit(hoy.addDays(1 - hoy.day()))
+        self.date_hasta = self._crear_date_edit(hoy)
+        self.lbl_hasta = QLabel("al")
         
         # Setear fecha actual por defecto
-        hoy = QDate.currentDate()
         self.combo_mes.setCurrentIndex(hoy.month() - 1)
+        self.combo_trimestre.setCurrentIndex((hoy.month() - 1) // 3)
         self.spin_anio.setValue(hoy.year())
         
         # Conectar señales
+        self.combo_modo.currentIndexChanged.connect(self._on_modo_cambiado)
         self.combo_mes.currentIndexChanged.connect(lambda: self.dateChanged.emit())
+        self.combo_trimestre.currentIndexChanged.connect(lambda: self.dateChanged.emit())
         self.spin_anio.valueChanged.connect(lambda: self.dateChanged.emit())
+        for date_edit in (self.date_semana, self.date_desde, self.date_hasta):
+            date_edit.dateChanged.connect(lambda _fecha: self.dateChanged.emit())
         
+        layout.addWidget(self.combo_modo)
         layout.addWidget(self.combo_mes)
+        layout.addWidget(self.combo_trimestre)
+        layout.addWidget(self.date_semana)
+        layout.addWidget(self.date_desde)
+        layout.addWidget(self.lbl_hasta)
+        layout.addWidget(self.date_hasta)
         layout.addWidget(self.spin_anio)
+        self._actualizar_visibles()
+
+    def _crear_date_edit(self, fecha: QDate) -> QDateEdit:
+        date_edit = QDateEdit(fecha)
+        date_edit.setCalendarPopup(True)
+        date_edit.setDisplayFormat("dd/MM/yyyy")
+        return date_edit
+
+    def modo(self) -> str:
+        return self.combo_modo.currentText()
+
+    def _actualizar_visibles(self):
+        modo = self.modo()
+        self.combo_mes.setVisible(modo == "Mes")
+        self.combo_trimestre.setVisible(modo == "Trimestre")
+        self.spin_anio.setVisible(modo in ("Mes", "Trimestre"))
+        self.date_semana.setVisible(modo == "Semana")
+        for w in (self.date_desde, self.lbl_hasta, self.date_hasta):
+            w.setVisible(modo == "Personalizado")
+
+    def _on_modo_cambiado(self):
+        self._actualizar_visibles()
+        self.dateChanged.emit()
 
     def get_date(self):
         """Devuelve (mes, anio) como enteros."""
         return self.combo_mes.currentIndex() + 1, self.spin_anio.value()
+
+    def get_rango(self):
+        """(desde, hasta) como datetime.date, hasta EXCLUSIVO, según el modo elegido."""
+        modo = self.modo()
+        if modo == "Semana":
+            return periodos.rango_semana(self.date_semana.date().toPython())
+        if modo == "Trimestre":
+            return periodos.rango_trimestre(self.combo_trimestre.currentIndex() + 1, self.spin_anio.value())
+        if modo == "Personalizado":
+            return periodos.rango_dias(self.date_desde.date().toPython(), self.date_hasta.date().toPython())
+        mes, anio = self.get_date()
+        return periodos.rango_mes(mes, anio)
+
+    def descripcion(self) -> str:
+        """Texto corto del período para títulos y totales (ej: '10/2026', '3° Trim. 2026')."""
+        modo = self.modo()
+        if modo == "Mes":
+            mes, anio = self.get_date()
+            return f"{mes}/{anio}"
+        if modo == "Trimestre":
+            return f"{self.combo_trimestre.currentIndex() + 1}° Trim. {self.spin_anio.value()}"
+        desde, hasta = self.get_rango()
+        ultimo = hasta - datetime.timedelta(days=1)
+        return f"{desde:%d/%m/%Y} al {ultimo:%d/%m/%Y}"
     
 class SuccessDialog(QDialog):
     def __init__(self, titulo, mensaje, ruta_archivo=None, parent=None):
@@ -122,7 +206,8 @@ class ImageViewerDialog(QDialog):
         layout.addWidget(self.lbl_imagen)
 
         self.ruta_imagen = str(ruta_imagen)
-        self.original_pixmap = QPixmap(self.ruta_imagen)
+        self.original_pixmap = self._cargar_pixmap_preview(self.ruta_imagen)
+        self._ultimo_tamanio = None
         
         # ---------------------------------------------------------
         # 2. NUEVA ZONA DE BOTONES (Copiar Flyer + Cerrar)
@@ -164,6 +249,13 @@ class ImageViewerDialog(QDialog):
         button_layout.addStretch()
         layout.addLayout(button_layout)
 
+        # Pre-generamos el flyer en segundo plano: cuando el vendedor hace click ya está listo
+        self._flyer_png = None
+        self._flyer_en_curso = False
+        self._copiar_al_terminar = False
+        self._flyer_signals = None
+        self._iniciar_flyer()
+
         # 3. MAXIMIZAR Y CARGAR CON RETRASO
         self.showMaximized()
                 
@@ -171,6 +263,22 @@ class ImageViewerDialog(QDialog):
         from PySide6.QtCore import QTimer
         QTimer.singleShot(100, self.actualizar_imagen_escalada)
 
+    def _cargar_pixmap_preview(self, ruta: str) -> QPixmap:
+        """
+        Usa la miniatura de pantalla completa de data/cache/thumbs/ si ya existe.
+        Si no, cae a la original (como antes) y deja encargada la miniatura para la próxima.
+        """
+        from logic.constants import MINIATURAS_CONFIG
+        from logic.thumbnail_cache import obtener_miniatura, solicitar_miniaturas
+
+        preview = obtener_miniatura(ruta, MINIATURAS_CONFIG["lado_preview"], verificar_disco=True)
+        if preview is not None:
+            pixmap = QPixmap(str(preview))
+            if not pixmap.isNull():
+                return pixmap
+        solicitar_miniaturas(ruta)
+        return QPixmap(ruta)
+
     def keyPressEvent(self, event):
         # Si presionan Esc, cerramos (por si el FramelessWindowHint quita el comportamiento por defecto)
         if event.key() == Qt.Key_Escape:
@@ -192,6 +300,9 @@ class ImageViewerDialog(QDialog):
 
         if ancho <= 10 or alto <= 10:
             return
+        # Mismo tamaño que el último escalado: no hace falta volver a escalar
+        if self._ultimo_tamanio == (ancho, alto):
+            return
         
         if hasattr(self, 'original_pixmap') and not self.original_pixmap.isNull():
             # Escalado suave a pantalla completa
@@ -202,21 +313,57 @@ class ImageViewerDialog(QDialog):
                 Qt.SmoothTransformation
             )
             self.lbl_imagen.setPixmap(scaled_pixmap)
+            self._ultimo_tamanio = (ancho, alto)
+
+    def _iniciar_flyer(self):
+        """Lanza (una sola vez) el render del flyer en el QThreadPool."""
+        from PySide6.QtCore import QThreadPool
+        from ui.workers import FlyerSignals, FlyerTask
+
+        if self._flyer_en_curso or self._flyer_png is not None:
+            return
+        self._flyer_en_curso = True
+        self._flyer_signals = FlyerSignals()
+        self._flyer_signals.listo.connect(self._on_flyer_listo)
+        self._flyer_signals.fallo.connect(self._on_flyer_fallo)
+        QThreadPool.globalInstance().start(FlyerTask(self._flyer_signals, self.row_dict, self.ruta_imagen))
+
+    def _on_flyer_listo(self, png: bytes):
+        self._flyer_en_curso = False
+        self._flyer_png = png
+        if self._copiar_al_terminar:
+            self._copiar_flyer_al_portapapeles()
+
+    def _on_flyer_fallo(self, error: str):
+        self._flyer_en_curso = False
+        if self._copiar_al_terminar:
+            self._copiar_al_terminar = False
+            self.btn_copiar_flyer.setEnabled(True)
+            self.btn_copiar_flyer.setText("❌ Error al copiar")
+            print(f"Error crítico en copiado de flyer: {error}")
+            from PySide6.QtCore import QTimer
+            QTimer.singleShot(3000, self._restaurar_boton_flyer)
 
     def generar_y_copiar_flyer(self):
-        """Genera el flyer on-demand y lo manda al portapapeles."""
+        """
+        Copia el flyer al portapapeles. Normalmente ya está pre-generado desde que se
+        abrió el visor; si no, se espera a la tarea de fondo sin bloquear la ventana.
+        """
+        if self._flyer_png is not None:
+            self._copiar_flyer_al_portapapeles()
+            return
+
+        # Cambiamos temporalmente el texto para dar feedback al vendedor
+        self._copiar_al_terminar = True
+        self.btn_copiar_flyer.setEnabled(False)
+        self.btn_copiar_flyer.setText("⏳ Generando Flyer...")
+        self._iniciar_flyer()
+
+    def _copiar_flyer_al_portapapeles(self):
+        self._copiar_al_terminar = False
+        self.btn_copiar_flyer.setEnabled(True)
         try:
-            QApplication.setOverrideCursor(Qt.WaitCursor)
-            
-            # Cambiamos temporalmente el texto para dar feedback al vendedor
-            self.btn_copiar_flyer.setText("⏳ Generando Flyer...")
-            self.btn_copiar_flyer.repaint() # Forzamos a que se dibuje el cambio de texto
-            
-            # Importación diferida para evitar referencias circulares
-            from logic.image_service import generar_flyer_producto 
-            
-            img_bytes_io = generar_flyer_producto(self.row_dict, self.ruta_imagen) 
-            q_image = QImage.fromData(img_bytes_io.getvalue())
+            q_image = QImage.fromData(self._flyer_png)
             
             if not q_image.isNull():
                 QApplication.clipboard().setImage(q_image)
@@ -234,7 +381,6 @@ class ImageViewerDialog(QDialog):
             self.btn_copiar_flyer.setText("❌ Error al copiar")
             print(f"Error crítico en copiado de flyer: {e}")
         finally:
-            QApplication.restoreOverrideCursor()
             # Restauramos el texto original después de 3 segundos
             from PySide6.QtCore import QTimer
             QTimer.singleShot(3000, self._restaurar_boton_flyer)
@@ -409,8 +555,8 @@ class StockManagerDialog(QDialog):
             row_idx = self.tabla_busqueda.rowCount()
             self.tabla_busqueda.insertRow(row_idx)
             
-            codigo = str(fila.get(col_codigo, 'S/C')).strip()
-            if codigo.endswith('.0'): codigo = codigo[:-2] 
+            # Código canónico (el mismo con el que se guarda el stock)
+            codigo = fila.get(COL_CODIGO_NORM) or normalizar_codigo(fila.get(col_codigo))
             
             proveedor = str(fila.get('PROVEEDOR', ''))
             if proveedor == 'nan': proveedor = ''
@@ -510,10 +656,11 @@ class StockManagerDialog(QDialog):
             return
 
         try:
-            for codigo, datos in self.ingresos_pendientes.items():
-                detalle = f"Ingreso manual ({datos['modelo']})"
-                # Registramos con cantidad positiva (INGRESO)
-                registrar_movimiento_stock(codigo, datos['cantidad'], "INGRESO", detalle)
+            # Todo el ingreso en una sola transacción (cantidad positiva = INGRESO)
+            get_stock_repository().registrar_movimientos([
+                (codigo, datos['cantidad'], "INGRESO", f"Ingreso manual ({datos['modelo']})")
+                for codigo, datos in self.ingresos_pendientes.items()
+            ])
 
             QMessageBox.information(self, "Éxito", "¡Mercadería ingresada correctamente al inventario!")
             
@@ -0,0 +1,135 @@
+# ui/workers.py
+
+from PySide6.QtCore import QThread, QObject, QRunnable, Signal
+
+from logic.data_loader import sincronizar_archivo, cargar_hojas, SYNC_ACTUALIZADO
+
+
+class CatalogSyncWorker(QThread):
+    """
+    Descarga el catálogo de Google Sheets y parsea las hojas fuera del hilo de la UI.
+    La ventana principal puede estar abierta (con la copia local) mientras esto corre.
+    """
+    # (bytes_recibidos, bytes_totales). Totales = 0 si el servidor no lo informa.
+    progreso = Signal(int, int)
+    # (hojas_nuevas | None, estado). estado es SYNC_SIN_CAMBIOS / SYNC_ACTUALIZADO / SYNC_OFFLINE.
+    # hojas_nuevas es None cuando no hay datos nuevos que parsear.
+    finalizado = Signal(object, str)
+    # Mensaje de error cuando no hay ni descarga ni copia local.
+    fallo = Signal(str)
+
+    def run(self):
+        try:
+            # Entre bloques de la descarga se mira si pidieron cortar (cierre de la app)
+            resultado = sincronizar_archivo(progreso_callback=self.progreso.emit,
+                                            cancelado=self.isInterruptionRequested)
+            if self.isInterruptionRequested():
+                return
+            ruta = resultado["ruta"]
+            if not ruta:
+                self.fallo.emit("fallo_total")
+                return
+
+            # Sólo parseamos si el contenido realmente cambió: en "sin cambios" u
+            # "offline" quien nos lanzó ya tiene (o cargará) esas mismas hojas.
+            hojas = None
+            if resultado["estado"] == SYNC_ACTUALIZADO:
+                hojas = cargar_hojas(ruta)
+                # Ya estamos fuera del hilo de la UI: dejamos todas las hojas
+                # parseadas (y en caché) para que el hot-swap no congele nada.
+                hojas.precargar()
+            self.finalizado.emit(hojas, resultado["estado"])
+        except Exception as e:
+            print(f"[ERROR] Fallo en la sincronización del catálogo: {e}")
+            self.fallo.emit(str(e))
+
+
+class BusquedaSignals(QObject):
+    """
+    Señales de las tareas de búsqueda. Se crea UNA por vista (en el hilo de la UI)
+    y se comparte entre tareas, así la entrega queda siempre en el hilo de la UI.
+    """
+    # (generacion, df_resultados)
+    resultado = Signal(int, object)
+
+
+class BusquedaTask(QRunnable):
+    """Ejecuta una búsqueda del catálogo en el QThreadPool, fuera del hilo de la UI."""
+
+    def __init__(self, signals: BusquedaSignals, generacion: int, funcion_busqueda, termino: str):
+        super().__init__()
+        self.signals = signals
+        self.generacion = generacion
+        self.funcion_busqueda = funcion_busqueda
+        self.termino = termino
+
+    def run(self):
+        import pandas as pd
+        try:
+            df = self.funcion_busqueda(self.termino)
+        except Exception as e:
+            print(f"[ERROR] Fallo en búsqueda en segundo plano: {e}")
+            df = pd.DataFrame()
+        self.signals.resultado.emit(self.generacion, df)
+
+
+class FlyerSignals(QObject):
+    """Señales de FlyerTask. Igual que BusquedaSignals: se crea en el hilo de la UI."""
+    # PNG del flyer listo
+    listo = Signal(bytes)
+    fallo = Signal(str)
+
+
+class FlyerTask(QRunnable):
+    """Renderiza el flyer de un producto en el QThreadPool y entrega los bytes PNG por señal."""
+
+    def __init__(self, signals: FlyerSignals, row_dict: dict, ruta_imagen):
+        super().__init__()
+        self.signals = signals  # Referencia fuerte: la señal sobrevive aunque cierren el visor
+        self.row_dict = row_dict
+        self.ruta_imagen = ruta_imagen
+
+    def run(self):
+        from logic.image_service import generar_flyer_producto
+        try:
+            png = generar_flyer_producto(self.row_dict, self.ruta_imagen).getvalue()
+        except Exception as e:
+            print(f"[ERROR] Fallo al generar el flyer en segundo plano: {e}")
+            self.signals.fallo.emit(str(e))
+            return
+        self.signals.listo.emit(png)
+
+
+class FlyerBatchWorker(QThread):
+    """
+    Corre logic.flyer_batch fuera del hilo de la UI (el pool de procesos lo
+    administra este hilo). Se puede cancelar con cancelar().
+    """
+    # (hechos, total)
+    progreso = Signal(int, int)
+    # dict de resultado de generar_flyers_lote
+    finalizado = Signal(object)
+    fallo = Signal(str)
+
+    def __init__(self, df, destino: str, como_zip: bool = False, parent=None):
+        super().__init__(parent)
+        self.df = df
+        self.destino = destino
+        self.como_zip = como_zip
+        self._cancelado = False
+
+    def cancelar(self):
+        self._cancelado = True
+
+    def run(self):
+        from logic.flyer_batch import generar_flyers_lote
+        try:
+            resultado = generar_flyers_lote(
+                self.df, self.destino, como_zip=self.como_zip,
+                progreso_callback=self.progreso.emit,
+                debe_cancelar=lambda: self._cancelado
+            )
+            self.finalizado.emit(resultado)
+        except Exception as e:
+            print(f"[ERROR] Fallo en la generación de flyers: {e}")
+            self.fallo.emit(str(e))